@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark SwarmController connect wall time and resident memory versus drone count.
+
+Connects N drones that are emulated by a local MAVLink heartbeat stand-in, either
+with one mavsdk_server per System (the default) or with a MavsdkServerPool, then
+disconnects and connects again to measure reconnects. The sim mode connects to the
+in-process simulated backend instead and measures only the controller's own overhead.
+
+Usage (from src/):
+    python3 -m benchmarks.bench_connect [--counts 4 16] [--mode per-system pooled sim]
+"""
+
+import argparse
+import asyncio
+import functools
+import os
+import time
+
+from benchmarks.bench_utils import emit, make_controller
+from benchmarks.mavlink_standin import MavlinkStandin
+from controller.mavsdk_server_pool import process_resident_memory_kb
+from controller.swarm_controller import SwarmController
+from model.drone import Drone
+
+
+def servers_resident_memory_kb(controller: SwarmController) -> int:
+    if controller.mavsdk_server_pool is not None:
+        return controller.mavsdk_server_pool.resident_memory_kb()
+    total = 0
+    for drone in controller.get_all_drones():
+        process = getattr(drone.mavsdk_system, "_server_process", None)
+        if process is not None:
+            total += process_resident_memory_kb(process.pid) or 0
+    return total
+
+
+async def run(drone_count: int, mode: str, base_udp_port: int, max_concurrency: int) -> dict:
+    controller = make_controller(0)
+    for i in range(drone_count):
+        drone = Drone(
+            drone_id=f"standin{i:03d}", connection_url=f"udp://0.0.0.0:{base_udp_port + i}"
+        )
+        controller.add_drone(drone)
+    controller.configure_connection(
+        wait_for_health=False, max_concurrency=max_concurrency, discovery_timeout_sec=15.0
+    )
+    # the stand-in emits no position, so don't wait for an initial state
+    controller.connection_pipeline.connect_fn = functools.partial(
+        controller.connect_drone, initialize_state=False
+    )
+    if mode == "pooled":
+        controller.enable_mavsdk_server_pool(max_servers=drone_count, base_port=51051)
+    elif mode == "sim":
+        controller.enable_sim_backend()
+
+    standin = None
+    if mode != "sim":
+        standin = MavlinkStandin([base_udp_port + i for i in range(drone_count)])
+        standin.start()
+    drones = controller.get_all_drones()
+
+    try:
+        start = time.perf_counter()
+        first = await controller.connect_drones(drones)
+        connect_sec = time.perf_counter() - start
+        rss_servers_kb = servers_resident_memory_kb(controller)
+
+        for drone in drones:
+            await drone.disconnect()
+        start = time.perf_counter()
+        second = await controller.connect_drones(drones)
+        reconnect_sec = time.perf_counter() - start
+    finally:
+        for drone in drones:
+            await drone.disconnect()
+        if controller.mavsdk_server_pool is not None:
+            await controller.mavsdk_server_pool.shutdown()
+        if controller.sim_world is not None:
+            controller.sim_world.stop()
+        if standin is not None:
+            standin.stop()
+
+    return {
+        "benchmark": "connect",
+        "variant": mode,
+        "drones": drone_count,
+        "connected": len(first.connected),
+        "reconnected": len(second.connected),
+        "connect_wall_sec": connect_sec,
+        "reconnect_wall_sec": reconnect_sec,
+        "phases": first.phase_stats(),
+        "reconnect_phases": second.phase_stats(),
+        "rss_controller_kb": process_resident_memory_kb(os.getpid()),
+        "rss_servers_kb": rss_servers_kb,
+    }
+
+
+async def main_async(args) -> None:
+    for count in args.counts:
+        for mode in args.mode:
+            emit(await run(count, mode, args.base_udp_port, args.max_concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[4, 16])
+    parser.add_argument(
+        "--mode", nargs="+", choices=["per-system", "pooled", "sim"], default=["per-system", "pooled"]
+    )
+    parser.add_argument("--base-udp-port", type=int, default=14600)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Benchmark DemoController.drone_goto step latency on the simulated backend.
+
+N simulated drones take off and fly a series of short gotos concurrently. Reports the
+goto duration and the latency from the telemetry sample that satisfied the arrival
+check to drone_goto returning, which is what the controller adds to every mission step,
+and how many of the telemetry samples received during the gotos were checked.
+
+Usage (from src/):
+    python3 -m benchmarks.bench_drone_goto [--counts 1 50] [--gotos 3]
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+
+from benchmarks.bench_utils import emit, make_controller, summarize_ms
+from model.drone import Drone
+
+
+async def fly(controller, drone: Drone, gotos: int, rng: random.Random, results: dict) -> None:
+    system = drone.mavsdk_system
+    await system.action.arm()
+    await system.action.takeoff()
+    await system.action.set_current_speed(12.0)
+    position = await drone.get_one_position()
+    for _ in range(gotos):
+        # 10-20 m away in a random direction, at 10-20 m altitude
+        bearing = rng.uniform(0.0, 2 * math.pi)
+        distance = rng.uniform(10.0, 20.0)
+        lat = position.latitude_deg + math.degrees(distance * math.cos(bearing) / 6_378_137.0)
+        lon = position.longitude_deg + math.degrees(
+            distance * math.sin(bearing) / (6_378_137.0 * math.cos(math.radians(lat)))
+        )
+        called = time.monotonic()
+        elapsed = await controller.demo_controller.drone_goto(
+            drone, latitude_deg=lat, longitude_deg=lon, altitude_m=rng.uniform(10.0, 20.0)
+        )
+        returned = time.monotonic()
+        results["goto_sec"].append(elapsed)
+        # upper bound: also counts the awaits before the goto is sent
+        results["return_latency_sec"].append(returned - called - elapsed)
+        position = await drone.get_one_position()
+
+
+async def run(drone_count: int, gotos: int) -> dict:
+    controller = make_controller(drone_count)
+    world = controller.enable_sim_backend(rate_hz=50.0)
+    drones = controller.get_all_drones()
+    metrics = controller.enable_metrics()
+    report = await controller.connect_drones(drones)
+
+    rng = random.Random(5)
+    results = {"goto_sec": [], "return_latency_sec": []}
+    try:
+        await asyncio.gather(*(fly(controller, d, gotos, rng, results) for d in drones))
+    finally:
+        samples = sum(sum(d.telemetry.sample_counts.values()) for d in drones if d.telemetry)
+        controller.disable_metrics()
+        for drone in drones:
+            await drone.disconnect()
+        world.stop()
+
+    result = {
+        "benchmark": "drone_goto",
+        "drones": drone_count,
+        "connected": len(report.connected),
+        "gotos": len(results["goto_sec"]),
+        "goto_mean_sec": sum(results["goto_sec"]) / len(results["goto_sec"]),
+        "arrival_checks_per_goto": metrics.goto_arrival_checks.value / len(results["goto_sec"]),
+        "samples_per_goto": samples / len(results["goto_sec"]),
+    }
+    result.update(
+        {
+            f"return_latency_{key}": value
+            for key, value in summarize_ms(results["return_latency_sec"]).items()
+        }
+    )
+    return result
+
+
+async def main_async(args) -> None:
+    for count in args.counts:
+        emit(await run(count, args.gotos))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 50])
+    parser.add_argument("--gotos", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Benchmark fan-out commands on the simulated backend.
+
+N simulated drones are armed one after another, as the missions do, and with
+SwarmController.command_drones, with and without a concurrency cap. Simulated
+actions complete at once, so each command first waits --ack-ms to stand in for a
+MAVLink command acknowledgement. Then all drones take off and emergency RTL is
+timed on the plain simulated actions.
+
+Usage (from src/):
+    python3 -m benchmarks.bench_fleet_commands [--counts 10 100] [--ack-ms 20]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.bench_utils import emit, make_controller
+
+
+def acknowledged(action: str, ack_sec: float):
+    async def command(drone):
+        await asyncio.sleep(ack_sec)
+        await getattr(drone.mavsdk_system.action, action)()
+
+    command.__name__ = action
+    return command
+
+
+async def run(drone_count: int, ack_ms: float, variant: str) -> dict:
+    controller = make_controller(drone_count)
+    world = controller.enable_sim_backend(rate_hz=10.0)
+    drones = controller.get_all_drones()
+    await controller.connect_drones(drones)
+    arm = acknowledged("arm", ack_ms / 1000.0)
+    result = {"benchmark": "fleet_commands", "variant": variant, "drones": drone_count}
+    try:
+        start = time.monotonic()
+        if variant == "sequential":
+            for drone in drones:
+                await arm(drone)
+            result["arm_wall_ms"] = (time.monotonic() - start) * 1000.0
+            return result
+        report = await controller.command_drones(
+            arm, max_concurrency=8 if variant == "capped" else None
+        )
+        result["arm_wall_ms"] = report.wall_time_sec * 1000.0
+        result["arm_latency_max_ms"] = report.latency_stats()["max_sec"] * 1000.0
+        result["failed"] = len(report.failed)
+        if variant == "fan-out":
+            await controller.command_drones("takeoff")
+            await asyncio.sleep(0.5)
+            report = await controller.emergency_return_to_launch()
+            result["rtl_wall_ms"] = report.wall_time_sec * 1000.0
+            result["rtl_latency_mean_ms"] = report.latency_stats()["mean_sec"] * 1000.0
+            result["failed"] += len(report.failed)
+        return result
+    finally:
+        for drone in drones:
+            await drone.disconnect()
+        world.stop()
+
+
+async def main_async(args) -> None:
+    for count in args.counts:
+        for variant in ("sequential", "capped", "fan-out"):
+            emit(await run(count, args.ack_ms, variant))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--ack-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark geo_tools lat/lon <-> image transform throughput.
+
+Compares the module-level functions (which build NumPy vectors per call) with the
+scalar and batch paths of GeoTransform.
+
+Usage (from src/):
+    python3 -m benchmarks.bench_geo_transform [--points 100000]
+"""
+
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from benchmarks.bench_utils import (
+    CENTER_LAT,
+    CENTER_LON,
+    DEFAULT_SCENARIO_FILE,
+    SPREAD_DEG,
+    emit,
+)
+from utils.file_utils import resolve_file_path
+from utils.geo_tools import GeoTransform, compute_affine_transform, latlon_to_img_x_y
+
+
+def run(points: int) -> dict:
+    with open(resolve_file_path(DEFAULT_SCENARIO_FILE)) as f:
+        pt_pairs = json.load(f)["pixel to lat/lon mapping"]["point_pairs"]
+    matrix = compute_affine_transform(pt_pairs)
+    transform = GeoTransform(matrix)
+
+    rng = random.Random(4)
+    lats = [CENTER_LAT + rng.uniform(-SPREAD_DEG, SPREAD_DEG) for _ in range(points)]
+    lons = [CENTER_LON + rng.uniform(-SPREAD_DEG, SPREAD_DEG) for _ in range(points)]
+
+    # the legacy path is ~100x slower, so time it on a slice
+    legacy_points = max(1, points // 20)
+    start = time.perf_counter()
+    for lat, lon in zip(lats[:legacy_points], lons[:legacy_points]):
+        latlon_to_img_x_y(matrix, lat, lon)
+    legacy_sec = time.perf_counter() - start
+
+    to_img = transform.latlon_to_img_x_y
+    start = time.perf_counter()
+    for lat, lon in zip(lats, lons):
+        to_img(lat, lon)
+    scalar_sec = time.perf_counter() - start
+
+    lat_array = np.array(lats)
+    lon_array = np.array(lons)
+    start = time.perf_counter()
+    transform.latlon_to_img_x_y_batch(lat_array, lon_array)
+    batch_sec = time.perf_counter() - start
+
+    return {
+        "benchmark": "geo_transform",
+        "points": points,
+        "legacy_points_per_sec": legacy_points / legacy_sec,
+        "scalar_points_per_sec": points / scalar_sec,
+        "batch_points_per_sec": points / batch_sec,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=100_000)
+    args = parser.parse_args()
+    emit(run(args.points))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Benchmark MapWidget drone marker frame time versus drone count.
+
+Each frame moves every drone, runs the batched marker update and repaints the
+viewport synchronously. Use --legacy to measure the previous destroy-and-recreate
+marker update for a before/after comparison, and --zoom to set the view scale
+(below MapWidget.CLUSTER_BELOW_ZOOM drones are drawn as cluster badges).
+
+Usage (from src/):
+    python3 -m benchmarks.bench_map_markers [--counts 10 100 500 1000] [--frames 60]
+        [--zoom 1.0] [--legacy]
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from PySide6.QtCore import QPointF
+from PySide6.QtWidgets import QApplication
+
+from benchmarks.bench_utils import (
+    emit,
+    jitter_drones,
+    make_controller,
+    make_qt_app,
+    summarize_ms,
+)
+from model.drone import Drone
+
+
+def legacy_place_drone_marker(map_widget, drone: Drone, pt: QPointF) -> None:
+    """The marker update used before markers were reused, kept for comparison."""
+    from PySide6.QtCore import Qt
+    from PySide6.QtGui import QBrush, QColor, QPen
+    from PySide6.QtWidgets import QGraphicsEllipseItem, QGraphicsTextItem
+
+    if drone.drone_id in map_widget.drones_items:
+        old_ellipse, old_label = map_widget.drones_items[drone.drone_id]
+        map_widget.scene.removeItem(old_ellipse)
+        map_widget.scene.removeItem(old_label)
+
+    ellipse = QGraphicsEllipseItem(pt.x() - 6, pt.y() - 6, 12, 12)
+    ellipse.setBrush(QBrush(QColor("#2b8cbe")))
+    ellipse.setPen(QPen(Qt.black))
+    label = QGraphicsTextItem()
+    label.setHtml(
+        f'<div style="color: black; font-size: 12px; background-color: white;">{drone.drone_id}</div>'
+    )
+    label.setPos(pt.x() + 8, pt.y() - 8)
+    map_widget.scene.addItem(ellipse)
+    map_widget.scene.addItem(label)
+    map_widget.drones_items[drone.drone_id] = (ellipse, label)
+
+
+def legacy_update_drone_markers(map_widget, drones: List[Drone]) -> None:
+    for drone in drones:
+        pt = map_widget.latlon_to_point(drone.lat, drone.lon)
+        legacy_place_drone_marker(map_widget, drone, pt)
+
+
+def run(drone_count: int, frames: int, legacy: bool = False, zoom: float = 1.0) -> dict:
+    from gui.map_widget import MapWidget
+
+    controller = make_controller(drone_count)
+    map_widget = MapWidget(controller)
+    map_widget.resize(1270, 806)
+    map_widget.scale(zoom, zoom)
+    map_widget.show()
+    # let the window be exposed, otherwise repaint() draws nothing
+    QApplication.processEvents()
+    if legacy:
+        map_widget.update_drone_markers = lambda drones: legacy_update_drone_markers(
+            map_widget, drones
+        )
+
+    drones = controller.get_all_drones()
+    rng = random.Random(1)
+    # first frame creates the markers
+    map_widget.update_drone_markers(drones)
+    map_widget.viewport().repaint()
+
+    frame_times = []
+    for _ in range(frames):
+        jitter_drones(drones, rng)
+        start = time.perf_counter()
+        map_widget.update_drone_markers(drones)
+        map_widget.viewport().repaint()
+        frame_times.append(time.perf_counter() - start)
+
+    map_widget.close()
+    map_widget.deleteLater()
+    result = {
+        "benchmark": "map_markers",
+        "variant": "legacy" if legacy else "current",
+        "drones": drone_count,
+        "zoom": zoom,
+        "frames": frames,
+    }
+    result.update(summarize_ms(frame_times))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 500, 1000])
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--zoom", type=float, default=1.0)
+    parser.add_argument("--legacy", action="store_true")
+    args = parser.parse_args()
+
+    make_qt_app()
+    for count in args.counts:
+        emit(run(count, args.frames, legacy=args.legacy, zoom=args.zoom))
+
+
+if __name__ == "__main__":
+    main()
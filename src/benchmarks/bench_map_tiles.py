@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark map startup, memory and pan/zoom frame time versus map image size.
+
+Synthetic JPEG orthophotos of each size are written to a temporary directory. The
+pixmap variant loads the image into one QPixmap as MapWidget did before tiling; the
+tiled variant draws it from a TilePyramid. Pyramids are built before timing (the
+one-off build time is reported as build_sec), so startup is what every later start
+costs. Frames alternate panning and zooming and repaint the viewport synchronously,
+with the tiles they need already decoded, as after the first pass over an area.
+
+Usage (from src/):
+    python3 -m benchmarks.bench_map_tiles [--sizes 2048 8192 16384] [--frames 40]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_utils import emit, make_controller, make_qt_app, summarize_ms
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def make_image(directory: str, size: int) -> str:
+    from PySide6.QtGui import QColor, QImage, QLinearGradient, QPainter
+
+    path = os.path.join(directory, f"ortho_{size}.jpg")
+    if os.path.exists(path):
+        return path
+    image = QImage(size, size * 3 // 4, QImage.Format_RGB32)
+    painter = QPainter(image)
+    gradient = QLinearGradient(0, 0, image.width(), image.height())
+    gradient.setColorAt(0, QColor("#204060"))
+    gradient.setColorAt(1, QColor("#80c040"))
+    painter.fillRect(image.rect(), gradient)
+    painter.setPen(QColor("white"))
+    for x in range(0, image.width(), 512):
+        painter.drawLine(x, 0, x, image.height())
+    for y in range(0, image.height(), 512):
+        painter.drawLine(0, y, image.width(), y)
+    painter.end()
+    image.save(path, None, 85)
+    return path
+
+
+def run(image_path: str, variant: str, frames: int, cache_dir: str) -> dict:
+    from PySide6.QtGui import QImageReader, QPixmap
+
+    from gui.map_tiles import TilePyramid
+    from gui.map_widget import MapWidget
+
+    app = make_qt_app()
+    size = QImageReader(image_path).size()
+    build_sec = 0.0
+    if variant == "tiled":
+        pyramid = TilePyramid(image_path, cache_dir=cache_dir)
+        if not pyramid.is_built():
+            start = time.perf_counter()
+            pyramid.build()
+            build_sec = time.perf_counter() - start
+
+    map_widget = MapWidget(make_controller(0))
+    map_widget.resize(1270, 806)
+    map_widget.show()
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    item = None
+    if variant == "tiled":
+        item = map_widget.set_tiled_map(image_path, cache_dir=cache_dir)
+        loaded = True
+    else:
+        # Qt refuses to decode images over its 256 MB allocation limit
+        pixmap = QPixmap(image_path)
+        loaded = not pixmap.isNull()
+        map_widget.set_pixmap(pixmap)
+    map_widget.viewport().repaint()
+    startup_sec = time.perf_counter() - start
+
+    def settle() -> None:
+        # let requested tiles arrive so frames measure drawing, not decoding
+        if item is not None:
+            item._pool.waitForDone()
+        app.processEvents()
+
+    settle()
+    scroll = map_widget.horizontalScrollBar()
+    frame_times = []
+    for frame in range(frames):
+        if frame % 10 == 5:
+            factor = 0.5 if (frame // 10) % 2 == 0 else 2.0
+            map_widget.scale(factor, factor)
+        else:
+            scroll.setValue(scroll.value() + 150)
+        map_widget.viewport().repaint()
+        settle()
+        start = time.perf_counter()
+        map_widget.viewport().repaint()
+        frame_times.append(time.perf_counter() - start)
+
+    result = {
+        "benchmark": "map_tiles",
+        "variant": variant,
+        "points": size.width() * size.height(),
+        "image": f"{size.width()}x{size.height()}",
+        "loaded": loaded,
+        "build_sec": build_sec,
+        "startup_ms": startup_sec * 1000.0,
+        "rss_delta_mb": current_rss_mb() - rss_before,
+    }
+    result.update(summarize_ms(frame_times))
+    if item is not None:
+        item.stop()
+    map_widget.close()
+    map_widget.deleteLater()
+    app.processEvents()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2048, 8192, 16384])
+    parser.add_argument("--frames", type=int, default=40)
+    parser.add_argument(
+        "--variant", nargs="+", choices=["pixmap", "tiled"], default=["pixmap", "tiled"]
+    )
+    args = parser.parse_args()
+
+    make_qt_app()
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            image_path = make_image(directory, size)
+            for variant in args.variant:
+                emit(run(image_path, variant, args.frames, os.path.join(directory, "tiles")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark the overhead of SwarmMetrics on the simulated backend.
+
+N simulated drones are connected and stream telemetry for a few seconds, with metrics
+off and on. With metrics on, the loop lag monitor runs and the HTTP endpoint is scraped
+once a second from another thread, as Prometheus would. Reports process CPU use and
+the time to render one scrape.
+
+Usage (from src/):
+    python3 -m benchmarks.bench_metrics [--counts 10 100] [--seconds 3]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+import urllib.request
+
+from benchmarks.bench_utils import emit, make_controller
+
+
+def scrape_every(url: str, interval_sec: float, stop: threading.Event, sizes: list) -> None:
+    while not stop.wait(interval_sec):
+        with urllib.request.urlopen(url) as response:
+            sizes.append(len(response.read()))
+
+
+async def run(drone_count: int, seconds: float, enabled: bool) -> dict:
+    controller = make_controller(drone_count)
+    world = controller.enable_sim_backend(rate_hz=20.0)
+    drones = controller.get_all_drones()
+    metrics = controller.enable_metrics(port=0) if enabled else None
+    await controller.connect_drones(drones)
+
+    stop = threading.Event()
+    sizes = []
+    scraper = None
+    if metrics is not None:
+        url = f"http://127.0.0.1:{metrics.server.port}/metrics"
+        scraper = threading.Thread(target=scrape_every, args=(url, 1.0, stop, sizes))
+        scraper.start()
+
+    samples_before = sum(sum(d.telemetry.sample_counts.values()) for d in drones)
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    samples = sum(sum(d.telemetry.sample_counts.values()) for d in drones) - samples_before
+
+    result = {
+        "benchmark": "metrics",
+        "variant": "on" if enabled else "off",
+        "drones": drone_count,
+        "cpu_fraction": cpu / wall,
+        "samples_per_sec": samples / wall,
+    }
+    if metrics is not None:
+        stop.set()
+        scraper.join()
+        start = time.perf_counter()
+        rounds = 10
+        for _ in range(rounds):
+            metrics.render()
+        result["render_ms"] = (time.perf_counter() - start) / rounds * 1000.0
+        result["scrape_bytes"] = max(sizes) if sizes else 0
+        result["loop_lag_mean_ms"] = metrics.loop_lag.mean * 1000.0
+        controller.disable_metrics()
+    for drone in drones:
+        await drone.disconnect()
+    world.stop()
+    return result
+
+
+async def main_async(args) -> None:
+    for count in args.counts:
+        for enabled in (False, True):
+            emit(await run(count, args.seconds, enabled))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Benchmark the separation monitor against the 1000 drones at 10 Hz target.
+
+grid times SeparationMonitor.check() on a swarm flying a few metres apart.
+pairwise times a brute-force O(n²) NumPy check of the same swarm for comparison
+(and asserts both find the same pairs). live runs the monitor as in flight: every
+drone gets set_state at --rate on an asyncio loop for --seconds, and the result
+shows the checks actually run and the CPU share of the whole process.
+
+Usage (from src/):
+    python3 -m benchmarks.bench_separation [--counts 100 1000] [--rate 10] [--seconds 3]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+import numpy as np
+
+from benchmarks.bench_utils import CENTER_LAT, CENTER_LON, emit, make_controller, summarize_ms
+from controller.separation_monitor import find_close_pairs
+from model.drone import DroneStatus
+from utils.geo_tools import latlon_to_local_m_batch
+
+MIN_HORIZONTAL_M = 5.0
+MIN_VERTICAL_M = 3.0
+# the swarm is dense on purpose; don't time hundreds of conflict warnings
+logging.getLogger("controller.separation_monitor").setLevel(logging.ERROR)
+
+# 0.0008 deg of spread puts 1000 drones about 5 m apart, so conflicts do happen
+SPREAD_DEG = 0.0008
+
+
+def make_swarm(drone_count: int):
+    controller = make_controller(drone_count)
+    rng = random.Random(3)
+    for drone in controller.get_all_drones():
+        drone.set_state(None, None, 20.0 + rng.uniform(-5.0, 5.0), None)
+        drone.set_status(DroneStatus.AIRBORNE)
+    return controller
+
+
+def pairwise(east, north, up) -> set:
+    horizontal = np.hypot(east[:, None] - east[None, :], north[:, None] - north[None, :])
+    vertical = np.abs(up[:, None] - up[None, :])
+    close = np.triu((horizontal < MIN_HORIZONTAL_M) & (vertical < MIN_VERTICAL_M), k=1)
+    return set(zip(*(index.tolist() for index in np.nonzero(close))))
+
+
+def run(drone_count: int, variant: str, rounds: int = 50) -> dict:
+    controller = make_swarm(drone_count)
+    monitor = controller.enable_separation_monitor(
+        min_horizontal_m=MIN_HORIZONTAL_M, min_vertical_m=MIN_VERTICAL_M
+    )
+    arrays = controller.state_arrays()
+    east, north = latlon_to_local_m_batch(arrays.lat, arrays.lon, CENTER_LAT, CENTER_LON)
+    up = np.array(arrays.alt)
+
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        if variant == "grid":
+            conflicts = len(monitor.check())
+        else:
+            conflicts = len(pairwise(east, north, up))
+        samples.append(time.perf_counter() - start)
+
+    i, j, _, _ = find_close_pairs(east, north, up, MIN_HORIZONTAL_M, MIN_VERTICAL_M)
+    assert set(zip(i.tolist(), j.tolist())) == pairwise(east, north, up)
+    return {
+        "benchmark": "separation",
+        "variant": variant,
+        "drones": drone_count,
+        "conflicts": conflicts,
+        **summarize_ms(samples),
+    }
+
+
+async def run_live(drone_count: int, rate_hz: float, seconds: float) -> dict:
+    controller = make_swarm(drone_count)
+    monitor = controller.enable_separation_monitor(
+        min_horizontal_m=MIN_HORIZONTAL_M, min_vertical_m=MIN_VERTICAL_M, rate_hz=rate_hz
+    )
+    drones = controller.get_all_drones()
+    rng = random.Random(4)
+    period = 1.0 / rate_hz
+    step_deg = 0.000005
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    next_tick = time.perf_counter()
+    ticks = late_ticks = 0
+    while time.perf_counter() - wall_start < seconds:
+        for drone in drones:
+            drone.set_state(
+                drone.lat + rng.uniform(-step_deg, step_deg),
+                drone.lon + rng.uniform(-step_deg, step_deg),
+                None,
+                None,
+            )
+        ticks += 1
+        next_tick += period
+        delay = next_tick - time.perf_counter()
+        if delay < 0:
+            late_ticks += 1
+        await asyncio.sleep(max(0.0, delay))
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    controller.disable_separation_monitor()
+    return {
+        "benchmark": "separation",
+        "variant": "live",
+        "drones": drone_count,
+        "rate_hz": rate_hz,
+        "telemetry_ticks": ticks,
+        "late_ticks": late_ticks,
+        "checks_per_sec": monitor.check_count / wall,
+        "check_mean_ms": monitor.check_sec_total / max(1, monitor.check_count) * 1000.0,
+        "cpu_fraction": cpu / wall,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--rate", type=float, default=10.0)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    for count in args.counts:
+        for variant in ("grid", "pairwise"):
+            emit(run(count, variant))
+        emit(asyncio.run(run_live(count, args.rate, args.seconds)))
+
+
+if __name__ == "__main__":
+    main()
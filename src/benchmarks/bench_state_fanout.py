@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Benchmark Drone.set_state callback fan-out throughput.
+
+The noop variant attaches a number of empty state callbacks to every drone. The
+threshold variant subscribes them with a 1 m movement threshold, so most jittered
+updates are filtered out. The gui variant attaches the real MapWidget and
+DroneListWidget listeners, so it measures what the controller pays per telemetry
+update before the coalesced redraws run.
+
+Usage (from src/):
+    python3 -m benchmarks.bench_state_fanout [--counts 100 1000] [--variant noop gui]
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.bench_utils import emit, jitter_drones, make_controller, make_qt_app
+
+
+def run(drone_count: int, rounds: int, variant: str, callbacks: int = 4) -> dict:
+    controller = make_controller(drone_count)
+    drones = controller.get_all_drones()
+    widgets = []
+    if variant == "gui":
+        from gui.drone_table_widget import DroneListWidget
+        from gui.map_widget import MapWidget
+
+        widgets = [MapWidget(controller), DroneListWidget(controller)]
+    elif variant == "threshold":
+        for drone in drones:
+            for _ in range(callbacks):
+                drone.subscribe_state(lambda drone: None, min_distance_m=1.0)
+    else:
+        for drone in drones:
+            for _ in range(callbacks):
+                drone.add_state_change_callback(lambda drone: None)
+
+    rng = random.Random(2)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        jitter_drones(drones, rng)
+    elapsed = time.perf_counter() - start
+
+    for widget in widgets:
+        widget.deleteLater()
+    calls = drone_count * rounds
+    return {
+        "benchmark": "state_fanout",
+        "variant": variant,
+        "drones": drone_count,
+        "callbacks": sum(len(d.state_subscriptions) for d in drones) / drone_count,
+        "set_state_per_sec": calls / elapsed,
+        "mean_us": elapsed / calls * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument(
+        "--variant", nargs="+", choices=["noop", "threshold", "gui"], default=["noop", "gui"]
+    )
+    args = parser.parse_args()
+
+    make_qt_app()
+    for count in args.counts:
+        for variant in args.variant:
+            emit(run(count, args.rounds, variant))
+
+
+if __name__ == "__main__":
+    main()
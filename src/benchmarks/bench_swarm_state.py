@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Benchmark a whole-swarm query over Drone objects versus the SwarmState arrays.
+
+The query is what a swarm overview needs every frame: bounding box, mean altitude,
+number of airborne drones and of drones without an update in the last second. The
+loop variant reads the Drone properties one drone at a time; the arrays variant
+runs the same query on the registry's zero-copy arrays.
+
+Usage (from src/):
+    python3 -m benchmarks.bench_swarm_state [--counts 100 1000 10000] [--rounds 50]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_utils import emit, make_controller
+from model.drone import DroneStatus
+
+
+def query_loop(drones, now: float) -> tuple:
+    lats = [d.lat for d in drones]
+    lons = [d.lon for d in drones]
+    alts = [d.alt for d in drones]
+    airborne = sum(1 for d in drones if d.status == DroneStatus.AIRBORNE)
+    stale = sum(1 for d in drones if d.last_update is None or now - d.last_update > 1.0)
+    return min(lats), max(lats), min(lons), max(lons), sum(alts) / len(alts), airborne, stale
+
+
+def query_arrays(arrays, now: float) -> tuple:
+    active = arrays.active
+    lat, lon, alt = arrays.lat[active], arrays.lon[active], arrays.alt[active]
+    airborne = np.count_nonzero(arrays.status == DroneStatus.AIRBORNE.value)
+    # NaN (never updated) compares False, so count the fresh ones instead
+    stale = np.count_nonzero(active) - np.count_nonzero(now - arrays.updated <= 1.0)
+    return lat.min(), lat.max(), lon.min(), lon.max(), alt.mean(), airborne, stale
+
+
+def run(drone_count: int, rounds: int, variant: str) -> dict:
+    controller = make_controller(drone_count)
+    drones = controller.get_all_drones()
+    for drone in drones[::2]:
+        drone.set_status(DroneStatus.AIRBORNE)
+
+    now = time.monotonic()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if variant == "loop":
+            query_loop(drones, now)
+        else:
+            query_arrays(controller.state_arrays(), now)
+    elapsed = time.perf_counter() - start
+
+    state = controller.registry.state
+    bytes_per_slot = sum(getattr(state, name).itemsize for name in state.FIELDS)
+    return {
+        "benchmark": "swarm_state",
+        "variant": variant,
+        "drones": drone_count,
+        "query_us": elapsed / rounds * 1e6,
+        "state_bytes_per_drone": bytes_per_slot + state.status.itemsize,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    for count in args.counts:
+        for variant in ("loop", "arrays"):
+            emit(run(count, args.rounds, variant))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Benchmark DroneListWidget status update latency versus drone count.
+
+Each sample changes one random drone's status and repaints the table viewport
+synchronously, i.e. the time from Drone.set_status to the change being on screen.
+
+Usage (from src/):
+    python3 -m benchmarks.bench_table_status [--counts 10 100 1000] [--updates 200]
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.bench_utils import emit, make_controller, make_qt_app, summarize_ms
+from model.drone import DroneStatus
+
+
+def run(drone_count: int, updates: int) -> dict:
+    from gui.drone_table_widget import DroneListWidget
+
+    controller = make_controller(drone_count)
+    widget = DroneListWidget(controller)
+    widget.resize(1270, 240)
+    widget.show()
+    viewport = widget.table.viewport()
+    viewport.repaint()
+
+    drones = controller.get_all_drones()
+    statuses = list(DroneStatus)
+    rng = random.Random(3)
+    latencies = []
+    for _ in range(updates):
+        drone = rng.choice(drones)
+        start = time.perf_counter()
+        drone.set_status(rng.choice(statuses))
+        viewport.repaint()
+        latencies.append(time.perf_counter() - start)
+
+    widget.close()
+    widget.deleteLater()
+    result = {"benchmark": "table_status", "drones": drone_count, "updates": updates}
+    result.update(summarize_ms(latencies))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--updates", type=int, default=200)
+    args = parser.parse_args()
+
+    make_qt_app()
+    for count in args.counts:
+        emit(run(count, args.updates))
+
+
+if __name__ == "__main__":
+    main()
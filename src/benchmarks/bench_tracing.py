@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark the cost of tracing spans, with tracing off and on.
+
+Times a bare with-block span as used on hot paths (GUI flushes, telemetry reads),
+a MAVSDK plugin call through TracedSystem against the plain call, and with tracing
+on, the Chrome trace export of a full ring buffer.
+
+Usage (from src/):
+    python3 -m benchmarks.bench_tracing [--spans 100000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.bench_utils import emit
+from utils import tracing
+
+
+class _Action(object):
+    async def goto_location(self, *args):
+        pass
+
+
+class _System(object):
+    def __init__(self):
+        self.action = _Action()
+
+
+def time_spans(count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        with tracing.span("map.update_markers", "gui", drones=100):
+            pass
+    return (time.perf_counter() - start) / count
+
+
+async def time_calls(system, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        await system.action.goto_location(47.0, 8.0, 10.0, 0.0)
+    return (time.perf_counter() - start) / count
+
+
+def run(spans: int, enabled: bool) -> dict:
+    tracer = tracing.enable(spans) if enabled else None
+    try:
+        span_sec = time_spans(spans)
+        calls = spans // 10
+        plain_sec = asyncio.run(time_calls(_System(), calls))
+        traced = tracing.TracedSystem(
+            _System(), "drone", lambda: {"drone": "drone", "status": "IN_AIR"}
+        )
+        traced_sec = asyncio.run(time_calls(traced, calls))
+        result = {
+            "benchmark": "tracing",
+            "variant": "on" if enabled else "off",
+            "span_us": span_sec * 1e6,
+            "plugin_call_overhead_us": (traced_sec - plain_sec) * 1e6,
+        }
+        if tracer is not None:
+            # fill the ring buffer so the export covers all of it
+            for _ in range(tracer.capacity - len(tracer.spans)):
+                tracer.record("wait_arrival", "mission", "drone", 0, 1000, {"drone": "drone"})
+            fd, path = tempfile.mkstemp(suffix=".json")
+            os.close(fd)
+            start = time.perf_counter()
+            tracer.write_chrome_trace(path)
+            result["export_ms"] = (time.perf_counter() - start) * 1000.0
+            result["export_bytes"] = os.path.getsize(path)
+            os.remove(path)
+        return result
+    finally:
+        tracing.disable()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spans", type=int, default=100_000)
+    args = parser.parse_args()
+    for enabled in (False, True):
+        emit(run(args.spans, enabled))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks are run from the src/ directory, e.g.:
+    python3 -m benchmarks.bench_map_markers
+"""
+
+import json
+import os
+import random
+import statistics
+import sys
+from typing import List
+
+from controller.swarm_controller import SwarmController
+from model.drone import Drone
+from utils.file_utils import resolve_file_path
+
+DEFAULT_SCENARIO_FILE = "assets/demo_scenario.json"
+
+# Roughly the area covered by assets/demo_map.png
+CENTER_LAT = 32.0617
+CENTER_LON = 118.7795
+SPREAD_DEG = 0.0008
+
+
+def make_qt_app():
+    # Benchmarks always run headless unless a platform is forced from outside
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def make_controller(drone_count: int, seed: int = 0) -> SwarmController:
+    """Demo scenario controller with drone_count synthetic drones (no scenario drones)."""
+    controller = SwarmController(resolve_file_path(DEFAULT_SCENARIO_FILE))
+    for drone in controller.get_all_drones():
+        controller.remove_drone(drone.drone_id)
+    rng = random.Random(seed)
+    for i in range(drone_count):
+        drone = Drone(drone_id=f"sim{i:04d}", connection_url="", role="SIMULATED")
+        drone.set_state(
+            lat=CENTER_LAT + rng.uniform(-SPREAD_DEG, SPREAD_DEG),
+            lon=CENTER_LON + rng.uniform(-SPREAD_DEG, SPREAD_DEG),
+            alt=20.0,
+            heading=rng.uniform(0.0, 360.0),
+        )
+        controller.add_drone(drone)
+    return controller
+
+
+def jitter_drones(drones: List[Drone], rng: random.Random, step_deg=0.000005):
+    for drone in drones:
+        drone.set_state(
+            lat=drone.lat + rng.uniform(-step_deg, step_deg),
+            lon=drone.lon + rng.uniform(-step_deg, step_deg),
+            alt=None,
+            heading=None,
+        )
+
+
+def summarize_ms(samples_sec: List[float]) -> dict:
+    samples_ms = sorted(s * 1000.0 for s in samples_sec)
+    return {
+        "mean_ms": statistics.fmean(samples_ms),
+        "p50_ms": samples_ms[len(samples_ms) // 2],
+        "p95_ms": samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.95))],
+        "max_ms": samples_ms[-1],
+    }
+
+
+def emit(result: dict) -> None:
+    # One JSON object per line so results can be collected by other tools
+    print(json.dumps(result), flush=True)
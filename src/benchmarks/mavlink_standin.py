@@ -0,0 +1,73 @@
+"""A minimal local MAVLink stand-in for connection benchmarks.
+
+Sends MAVLink v1 HEARTBEAT messages for N fake vehicles, one UDP port per vehicle,
+so mavsdk_server can discover them without PX4. Nothing else (health, position) is
+emulated, so connect with wait_for_health disabled.
+"""
+
+import asyncio
+import socket
+import struct
+from typing import List
+
+HEARTBEAT_MSG_ID = 0
+HEARTBEAT_CRC_EXTRA = 50
+MAV_TYPE_QUADROTOR = 2
+MAV_AUTOPILOT_PX4 = 12
+MAV_STATE_STANDBY = 3
+
+
+def x25_crc(data: bytes, crc: int = 0xFFFF) -> int:
+    for byte in data:
+        tmp = byte ^ (crc & 0xFF)
+        tmp = (tmp ^ (tmp << 4)) & 0xFF
+        crc = ((crc >> 8) ^ (tmp << 8) ^ (tmp << 3) ^ (tmp >> 4)) & 0xFFFF
+    return crc
+
+
+def heartbeat_packet(sysid: int, seq: int, compid: int = 1) -> bytes:
+    payload = struct.pack(
+        "<IBBBBB",
+        0,  # custom_mode
+        MAV_TYPE_QUADROTOR,
+        MAV_AUTOPILOT_PX4,
+        0,  # base_mode
+        MAV_STATE_STANDBY,
+        3,  # mavlink_version
+    )
+    header = struct.pack("<BBBBB", len(payload), seq & 0xFF, sysid, compid, HEARTBEAT_MSG_ID)
+    crc = x25_crc(header + payload + bytes([HEARTBEAT_CRC_EXTRA]))
+    return b"\xfe" + header + payload + struct.pack("<H", crc)
+
+
+class MavlinkStandin(object):
+    """Emits heartbeats for one fake vehicle per target UDP port (sysid 1..N)."""
+
+    def __init__(self, ports: List[int], host: str = "127.0.0.1", rate_hz: float = 2.0):
+        self.ports = list(ports)
+        self.host = host
+        self.rate_hz = rate_hz
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._task = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._socket.close()
+
+    async def _run(self) -> None:
+        seq = 0
+        while True:
+            for index, port in enumerate(self.ports):
+                try:
+                    self._socket.sendto(heartbeat_packet(index + 1, seq), (self.host, port))
+                except OSError:
+                    # nobody listening on this port yet
+                    pass
+            seq += 1
+            await asyncio.sleep(1.0 / self.rate_hz)
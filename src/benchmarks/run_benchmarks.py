@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Run the benchmark suite headless and compare the results with a baseline.
+
+Covers set_state fan-out, map marker frame time, tiled map startup and pan/zoom
+frame time, table status latency, geo transforms, whole-swarm state queries,
+separation checks, connect wall time (simulated backend, and with --with-mavsdk a
+local MAVLink stand-in behind real mavsdk_server processes), drone_goto step
+latency, fan-out command wall time and the overhead of metrics and tracing.
+
+Results are printed as JSON lines while running and can be written as one JSON
+document with --output. --save-baseline stores them; --baseline compares against a
+stored file and exits with status 1 if any metric regressed by more than --tolerance.
+
+Usage (from src/):
+    python3 -m benchmarks.run_benchmarks [--quick] [--output results.json]
+    python3 -m benchmarks.run_benchmarks --save-baseline baseline.json
+    python3 -m benchmarks.run_benchmarks --baseline baseline.json [--tolerance 0.25]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+from typing import Dict, List
+
+from benchmarks import (
+    bench_connect,
+    bench_drone_goto,
+    bench_fleet_commands,
+    bench_geo_transform,
+    bench_map_markers,
+    bench_map_tiles,
+    bench_metrics,
+    bench_separation,
+    bench_state_fanout,
+    bench_swarm_state,
+    bench_table_status,
+    bench_tracing,
+)
+from benchmarks.bench_utils import emit, make_qt_app
+
+# Fields that identify a result; the same key is compared across runs
+KEY_FIELDS = ("benchmark", "variant", "drones", "zoom", "points")
+
+
+def run_suite(quick: bool, with_mavsdk: bool) -> List[dict]:
+    counts = [10, 100] if quick else [10, 100, 1000]
+    make_qt_app()
+    results = []
+
+    def record(result: dict) -> None:
+        emit(result)
+        results.append(result)
+
+    for count in counts:
+        for variant in ("noop", "threshold", "gui"):
+            record(bench_state_fanout.run(count, rounds=20 if quick else 50, variant=variant))
+    for count in counts:
+        for zoom in (1.0, 0.3):
+            record(bench_map_markers.run(count, frames=20 if quick else 60, zoom=zoom))
+    for count in counts:
+        record(bench_table_status.run(count, updates=50 if quick else 200))
+    with tempfile.TemporaryDirectory() as directory:
+        for size in [2048, 8192] if quick else [2048, 8192, 16384]:
+            image_path = bench_map_tiles.make_image(directory, size)
+            for variant in ("pixmap", "tiled"):
+                record(
+                    bench_map_tiles.run(
+                        image_path, variant, 20 if quick else 40, os.path.join(directory, "tiles")
+                    )
+                )
+    record(bench_geo_transform.run(20_000 if quick else 100_000))
+    for count in counts:
+        record(bench_separation.run(count, "grid", rounds=20 if quick else 50))
+    record(asyncio.run(bench_separation.run_live(1000, rate_hz=10.0, seconds=1.0 if quick else 3.0)))
+    for count in counts:
+        for variant in ("loop", "arrays"):
+            record(bench_swarm_state.run(count, rounds=20 if quick else 50, variant=variant))
+
+    modes = ["sim"] + (["per-system", "pooled"] if with_mavsdk else [])
+    for mode in modes:
+        count = 100 if mode == "sim" else 4
+        record(asyncio.run(bench_connect.run(count, mode, 14600, 8)))
+    for count in [1, 20] if quick else [1, 50]:
+        record(asyncio.run(bench_drone_goto.run(count, gotos=2 if quick else 3)))
+    for count in [10, 100]:
+        for enabled in (False, True):
+            record(asyncio.run(bench_metrics.run(count, 1.0 if quick else 3.0, enabled)))
+    for count in [10, 100]:
+        for variant in ("sequential", "capped", "fan-out"):
+            record(asyncio.run(bench_fleet_commands.run(count, 20.0, variant)))
+    for enabled in (False, True):
+        record(bench_tracing.run(20_000 if quick else 100_000, enabled))
+    return results
+
+
+def result_key(result: dict) -> tuple:
+    return tuple((field, result[field]) for field in KEY_FIELDS if field in result)
+
+
+def metric_direction(name: str, value) -> int:
+    """+1 if higher is better, -1 if lower is better, 0 if not a compared metric."""
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return 0
+    # single worst samples are too noisy to gate on
+    if "max_" in name:
+        return 0
+    if name.endswith("_per_sec"):
+        return 1
+    if name.endswith("_ms") or name.endswith("_sec") or name.endswith("_us"):
+        return -1
+    return 0
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """Return one line per metric that is worse than the baseline by more than tolerance."""
+    baseline_by_key: Dict[tuple, dict] = {result_key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = baseline_by_key.get(result_key(result))
+        if base is None:
+            continue
+        for name, value in result.items():
+            direction = metric_direction(name, value)
+            base_value = base.get(name)
+            if direction == 0 or not isinstance(base_value, (int, float)) or not base_value:
+                continue
+            change = (value - base_value) / base_value
+            if change * direction < -tolerance:
+                label = ", ".join(f"{k}={v}" for k, v in result_key(result))
+                regressions.append(
+                    f"{label}: {name} {base_value:.4g} -> {value:.4g} ({change:+.0%})"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="smaller drone counts and fewer samples")
+    parser.add_argument("--with-mavsdk", action="store_true", help="also connect through mavsdk_server")
+    parser.add_argument("--output", help="write all results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--save-baseline", help="write the results as a baseline to this file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+
+    document = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "results": run_suite(args.quick, args.with_mavsdk),
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(document, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(document["results"], baseline["results"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import math
+import time
+
+from model.telemetry_hub import TelemetryHub
+from utils.geo_tools import heading_difference_deg, latlon_to_local_m
+
+# the next check is scheduled after this fraction of the estimated time to arrival,
+# leaving room for the drone to speed up
+ETA_FRACTION = 0.5
+
+# below this speed (m/s) there is no useful ETA, e.g. a drone about to set off
+MIN_ETA_SPEED_M_S = 0.2
+
+# default tolerances of an arrival, also drone_goto's
+HORIZONTAL_TOLERANCE_M = 0.25
+ALTITUDE_TOLERANCE_M = 0.5
+YAW_TOLERANCE_DEG = 5.0
+
+
+class ArrivalCheck(object):
+    """Arrival predicate for TelemetryHub.wait_until, with tolerances in metres.
+
+    The position is compared with the target in a local east/north/up frame around
+    the target, and the heading wrap-aware, so 359° is within 2° of 1°. While the
+    drone is still outside the tolerances, the time to arrival is estimated from its
+    velocity_ned telemetry, and samples before the next check is due are skipped:
+    a drone 500 m out is checked about once a second, one a metre out on every
+    sample. Once in position, every sample is checked until the yaw matches.
+    """
+
+    def __init__(
+        self,
+        latitude_deg: float,
+        longitude_deg: float,
+        altitude_m: float,
+        yaw_deg: float,
+        horizontal_tolerance_m: float = HORIZONTAL_TOLERANCE_M,
+        altitude_tolerance_m: float = ALTITUDE_TOLERANCE_M,
+        yaw_tolerance_deg: float = YAW_TOLERANCE_DEG,
+        max_check_interval_sec: float = 1.0,
+    ):
+        self.latitude_deg = latitude_deg
+        self.longitude_deg = longitude_deg
+        self.altitude_m = altitude_m
+        self.yaw_deg = yaw_deg
+        self.horizontal_tolerance_m = horizontal_tolerance_m
+        self.altitude_tolerance_m = altitude_tolerance_m
+        self.yaw_tolerance_deg = yaw_tolerance_deg
+        self.max_check_interval_sec = max_check_interval_sec
+        self.next_check_at = 0.0  # time.monotonic()
+        self.checks = 0
+        self.skipped = 0
+
+    def __call__(self, telemetry: TelemetryHub) -> bool:
+        now = time.monotonic()
+        if now < self.next_check_at:
+            self.skipped += 1
+            return False
+        position = telemetry.latest_value("position")
+        heading = telemetry.latest_value("heading")
+        if position is None or heading is None:
+            return False
+        self.checks += 1
+
+        east, north = latlon_to_local_m(
+            position.latitude_deg, position.longitude_deg, self.latitude_deg, self.longitude_deg
+        )
+        horizontal_excess = math.hypot(east, north) - self.horizontal_tolerance_m
+        vertical_excess = (
+            abs(position.absolute_altitude_m - self.altitude_m) - self.altitude_tolerance_m
+        )
+        if horizontal_excess <= 0.0 and vertical_excess <= 0.0:
+            return (
+                heading_difference_deg(heading.heading_deg, self.yaw_deg)
+                <= self.yaw_tolerance_deg
+            )
+
+        velocity = telemetry.latest_value("velocity_ned")
+        if velocity is None:
+            return False
+        speed = math.sqrt(velocity.north_m_s**2 + velocity.east_m_s**2 + velocity.down_m_s**2)
+        if speed < MIN_ETA_SPEED_M_S:
+            return False
+        # a lower bound: the remaining distance cannot be flown faster at this speed
+        eta_sec = math.hypot(max(horizontal_excess, 0.0), max(vertical_excess, 0.0)) / speed
+        self.next_check_at = now + min(eta_sec * ETA_FRACTION, self.max_check_interval_sec)
+        return False
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List
+
+from model.drone import Drone
+
+logger = logging.getLogger(__name__)
+
+# Connection phases, in the order connect_drone goes through them.
+# The mavsdk_server phase only exists when using a MavsdkServerPool.
+PHASE_MAVSDK_SERVER = "mavsdk_server"
+PHASE_GRPC_CONNECT = "grpc_connect"
+PHASE_DISCOVERY = "discovery"
+PHASE_HEALTH = "health"
+PHASES = (PHASE_MAVSDK_SERVER, PHASE_GRPC_CONNECT, PHASE_DISCOVERY, PHASE_HEALTH)
+
+
+class DroneConnectionError(Exception):
+    """A drone failed to connect; phase names the step that failed."""
+
+    def __init__(self, drone_id: str, phase: str, message: str):
+        super().__init__(f"Error connecting to {drone_id} during {phase}: {message}")
+        self.drone_id = drone_id
+        self.phase = phase
+
+
+@dataclass
+class ConnectionResult:
+    drone_id: str
+    connected: bool = False
+    attempts: int = 0
+    # seconds spent in each phase of the last attempt
+    phase_timings: Dict[str, float] = field(default_factory=dict)
+    total_sec: float = 0.0
+    failed_phase: str | None = None
+    error: str | None = None
+
+
+@dataclass
+class ConnectionReport:
+    results: List[ConnectionResult] = field(default_factory=list)
+    wall_time_sec: float = 0.0
+
+    @property
+    def connected(self) -> List[ConnectionResult]:
+        return [r for r in self.results if r.connected]
+
+    @property
+    def failed(self) -> List[ConnectionResult]:
+        return [r for r in self.results if not r.connected]
+
+    def phase_stats(self) -> Dict[str, Dict[str, float]]:
+        """Mean and max seconds per phase over the successful connections."""
+        stats = {}
+        for phase in PHASES:
+            timings = [
+                r.phase_timings[phase] for r in self.connected if phase in r.phase_timings
+            ]
+            if timings:
+                stats[phase] = {
+                    "mean_sec": sum(timings) / len(timings),
+                    "max_sec": max(timings),
+                }
+        return stats
+
+    def summary(self) -> str:
+        phases = ", ".join(
+            f"{phase} mean {s['mean_sec']:.2f}s max {s['max_sec']:.2f}s"
+            for phase, s in self.phase_stats().items()
+        )
+        text = (
+            f"Connected {len(self.connected)}/{len(self.results)} drones "
+            f"in {self.wall_time_sec:.2f}s"
+        )
+        if phases:
+            text += f" ({phases})"
+        for r in self.failed:
+            text += f"; {r.drone_id} failed in {r.failed_phase} after {r.attempts} attempts"
+        return text
+
+
+class ConnectionPipeline(object):
+    """Connects many drones with a concurrency limit and jittered retry backoff.
+
+    connect_fn(drone, phase_timings=...) does a single connection attempt. It fills
+    phase_timings as each phase completes and raises DroneConnectionError on failure.
+    """
+
+    def __init__(
+        self,
+        connect_fn: Callable[..., Awaitable],
+        max_concurrency: int = 8,
+        max_attempts: int = 3,
+        backoff_base_sec: float = 0.5,
+        backoff_max_sec: float = 8.0,
+    ):
+        self.connect_fn = connect_fn
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+
+    async def run(self, drones: Iterable[Drone]) -> ConnectionReport:
+        start = time.monotonic()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *(self._connect_with_retries(drone, semaphore) for drone in drones)
+        )
+        return ConnectionReport(
+            results=list(results), wall_time_sec=time.monotonic() - start
+        )
+
+    def backoff_delay(self, attempt: int) -> float:
+        # exponential backoff with "equal jitter": half fixed, half random
+        delay = min(self.backoff_max_sec, self.backoff_base_sec * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _connect_with_retries(
+        self, drone: Drone, semaphore: asyncio.Semaphore
+    ) -> ConnectionResult:
+        result = ConnectionResult(drone_id=drone.drone_id)
+        start = time.monotonic()
+        for attempt in range(1, self.max_attempts + 1):
+            result.attempts = attempt
+            result.phase_timings = {}
+            # hold the semaphore only while connecting, not while backing off
+            async with semaphore:
+                try:
+                    await self.connect_fn(drone, phase_timings=result.phase_timings)
+                    result.connected = True
+                    result.failed_phase = None
+                    result.error = None
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    result.failed_phase = getattr(e, "phase", None)
+                    result.error = str(e)
+                    logger.warning(
+                        f"{drone.drone_id}: connection attempt {attempt}/{self.max_attempts} failed: {e}"
+                    )
+            if attempt < self.max_attempts:
+                await asyncio.sleep(self.backoff_delay(attempt))
+        result.total_sec = time.monotonic() - start
+        return result
@@ -0,0 +1,70 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Callable, Coroutine
+
+logger = logging.getLogger(__name__)
+
+
+class ControllerThread(object):
+    """Runs the controller's asyncio loop on its own thread.
+
+    Telemetry, connection and mission tasks then keep their timing however busy the
+    GUI thread is. Everything touching the controller must go through submit() or
+    call_soon(); results come back as concurrent.futures.Future.
+    """
+
+    def __init__(self, name: str = "swarm-controller"):
+        self.name = name
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Run a coroutine on the controller loop."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def call_soon(self, fn: Callable, *args) -> None:
+        """Call a plain function on the controller loop, e.g. one that creates tasks."""
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def stop(self, timeout_sec: float = 5.0) -> None:
+        if not self.is_running():
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+        self._thread.join(timeout_sec)
+        self._thread = None
+
+    def _run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    async def _shutdown(self) -> None:
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.loop.stop()
+
+    @staticmethod
+    def _log_failure(future: concurrent.futures.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Controller task failed: {future.exception()!r}")
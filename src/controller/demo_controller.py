@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 
 import asyncio
+import functools
 import logging
+import time
+from typing import List
 
 from enum import Enum, auto
 
@@ -9,7 +12,16 @@ from enum import Enum, auto
 from mavsdk.telemetry import Position
 from mavsdk.action import OrbitYawBehavior
 
+from controller.arrival_check import (
+    ALTITUDE_TOLERANCE_M,
+    HORIZONTAL_TOLERANCE_M,
+    YAW_TOLERANCE_DEG,
+    ArrivalCheck,
+)
+from controller.mission_compiler import MissionWaypoint, compile_mission
+from controller.swarm_sync import StatusBoard
 from model.drone import Drone, DroneStatus
+from utils import tracing
 
 # configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,36 +41,66 @@ class DemoDroneStatus(Enum):
     LANDED = auto()
 
 
+# How fly_route flies a list of waypoints
+ROUTE_MISSION = "mission"  # one mission upload, tracked through mission progress
+ROUTE_GOTO = "goto"  # one drone_goto per waypoint
+
+
+def _traced(category: str = "mission"):
+    # records each call of a DemoController method taking a drone as a span on the
+    # drone's track, see utils.tracing; a no-op unless tracing is enabled
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def traced(self, drone, *args, **kwargs):
+            with self.trace_span(drone, fn.__name__, category):
+                return await fn(self, drone, *args, **kwargs)
+
+        return traced
+
+    return decorate
+
+
 class DemoController(object):
     def __init__(self):
-        self.status = {}
-        self.status_conditions = {}
+        self.status_board = StatusBoard()
+        self.route_mode = ROUTE_MISSION
+        self.metrics = None  # a SwarmMetrics, set by SwarmController.enable_metrics
 
-    # def get_drone_status(self, drone: Drone) -> DroneStatus:
-    #     return self.status.get(drone)
+    def get_drone_status(self, drone: Drone | str) -> DemoDroneStatus | None:
+        return self.status_board.get(drone)
 
     async def set_drone_status(self, drone: Drone, status: DemoDroneStatus) -> None:
-        if drone not in self.status_conditions:
-            self.status_conditions[drone] = asyncio.Condition()
-        condition = self.status_conditions[drone]
-        async with condition:
-            self.status[drone] = status
-            condition.notify_all()
-
+        self.status_board.set(drone, status)
+
+    def trace_args(self, drone: Drone | str) -> dict:
+        drone_id = drone if isinstance(drone, str) else drone.drone_id
+        status = self.get_drone_status(drone)
+        return {"drone": drone_id, "status": status.name if status is not None else None}
+
+    def trace_span(self, drone: Drone | str, name: str, category: str = "mission", **args):
+        # a span on the drone's track tagged with its mission status
+        if tracing.get_tracer() is None:
+            return tracing.span(name)
+        args.update(self.trace_args(drone))
+        return tracing.span(name, category, args["drone"], **args)
+
+    # drone may also be a drone id, for waiting on drones the mission holds no reference to
+    @_traced()
     async def wait_for_drone_status(
-        self, drone: Drone, target: DemoDroneStatus
+        self,
+        drone: Drone | str,
+        target: DemoDroneStatus,
+        timeout_sec: float | None = None,
     ) -> None:
-        condition = self.status_conditions[drone]
-        async with condition:
-            await condition.wait_for(lambda: self.status[drone] == target)
+        await self.status_board.wait_for(drone, target, timeout_sec)
 
+    @_traced("telemetry")
     async def get_one_position(self, drone: Drone) -> Position:
-        async for pos in drone.mavsdk_system.telemetry.position():
-            return pos
+        return await drone.get_one_position()
 
+    @_traced("telemetry")
     async def get_one_heading(self, drone: Drone) -> float:
-        async for heading in drone.mavsdk_system.telemetry.heading():
-            return heading.heading_deg
+        return await drone.get_one_heading()
 
     # Move a drone to a specific location and wait until it arrives within specified tolerances
     #
@@ -66,8 +108,14 @@ class DemoController(object):
     # E.g., to only change altitude, set latitude_deg, longitude_deg, and yaw_deg to None.
     #
     # Note: This function is needed because sending the action via mavsdk does not block until arrival
-    # so we need to implement our own wait logic
+    # so we need to implement our own wait logic. Arrival is checked as telemetry samples
+    # reach the drone's telemetry hub, in metres around the target and more often the
+    # closer the drone gets, see ArrivalCheck.
+    #
+    # Returns the time in seconds between sending the goto and arriving. Raises
+    # asyncio.TimeoutError if timeout_sec is given and the drone has not arrived by then.
     #
+    @_traced()
     async def drone_goto(
         self,
         drone: Drone,
@@ -75,14 +123,14 @@ class DemoController(object):
         longitude_deg=None,
         altitude_m=None,
         yaw_deg=None,
-        latitude_epsilon: float = 0.000002,
-        longitude_epsilon: float = 0.000002,
-        altitude_epsilon: float = 0.5,
-        yaw_epsilon: float = 5.0,
-        check_freqency_sec: float = 1.0,
+        horizontal_tolerance_m: float = HORIZONTAL_TOLERANCE_M,
+        altitude_tolerance_m: float = ALTITUDE_TOLERANCE_M,
+        yaw_tolerance_deg: float = YAW_TOLERANCE_DEG,
+        timeout_sec: float | None = None,
         status_at_completion: DemoDroneStatus = None,
-    ) -> None:
+    ) -> float:
         # Fill out any None parameters with current drone values
+        called_time = time.monotonic()
         position = await self.get_one_position(drone)
         latitude_deg = (
             latitude_deg if latitude_deg is not None else position.latitude_deg
@@ -99,39 +147,194 @@ class DemoController(object):
         logger.debug(
             f"Going to lat={latitude_deg}, lon={longitude_deg}, alt={altitude_m}, yaw={yaw_deg}"
         )
+        start_time = time.monotonic()
         await drone.mavsdk_system.action.goto_location(
             latitude_deg=latitude_deg,
             longitude_deg=longitude_deg,
             absolute_altitude_m=altitude_m,
             yaw_deg=yaw_deg,
         )
-
-        # Note: We need to get new telemetry streams inside the loop to avoid stale data
-        while True:
-            position = await self.get_one_position(drone)
-            lat_diff = abs(position.latitude_deg - latitude_deg)
-            lon_diff = abs(position.longitude_deg - longitude_deg)
-            alt_diff = abs(position.absolute_altitude_m - altitude_m)
-            heading_deg = await self.get_one_heading(drone)
-            yaw_diff = abs(heading_deg - yaw_deg)
-            logger.debug(
-                f"Current position: lat={position.latitude_deg}, lon={position.longitude_deg}, alt={position.absolute_altitude_m}"
+        sent_time = time.monotonic()
+
+        arrived = ArrivalCheck(
+            latitude_deg,
+            longitude_deg,
+            altitude_m,
+            yaw_deg,
+            horizontal_tolerance_m,
+            altitude_tolerance_m,
+            yaw_tolerance_deg,
+        )
+        try:
+            with self.trace_span(drone, "wait_arrival"):
+                arrival_time = await drone.telemetry.wait_until(arrived, timeout_sec)
+        except asyncio.TimeoutError:
+            logger.error(
+                f"{drone.drone_id} did not reach lat={latitude_deg}, lon={longitude_deg}, "
+                f"alt={altitude_m}, yaw={yaw_deg} within {timeout_sec} s"
             )
-            logger.debug(
-                f"Differences: lat_diff={lat_diff}, lon_diff={lon_diff}, alt_diff={alt_diff}, yaw_diff={yaw_diff}"
+            if self.metrics is not None:
+                self.metrics.goto_timeouts.inc()
+                self.metrics.goto_arrival_checks.inc(arrived.checks)
+            raise
+        elapsed_sec = arrival_time - start_time
+        if self.metrics is not None:
+            self.metrics.observe_goto(
+                start_time - called_time,
+                sent_time - start_time,
+                arrival_time - sent_time,
+                time.monotonic() - arrival_time,
             )
-            if (
-                lat_diff <= latitude_epsilon
-                and lon_diff <= longitude_epsilon
-                and alt_diff <= altitude_epsilon
-                and yaw_diff <= yaw_epsilon
-            ):
-                logger.debug("Reached target location and orientation.")
-                if status_at_completion is not None:
-                    await self.set_drone_status(drone, status_at_completion)
-                break
-            await asyncio.sleep(check_freqency_sec)
+            self.metrics.goto_arrival_checks.inc(arrived.checks)
+
+        logger.debug(
+            f"{drone.drone_id} reached target location and orientation in {elapsed_sec:.2f} s "
+            f"({arrived.checks} checks, {arrived.skipped} samples skipped)."
+        )
+        if status_at_completion is not None:
+            await self.set_drone_status(drone, status_at_completion)
+        return elapsed_sec
 
+    # Fly a whole route of waypoints and set each waypoint's status_at_arrival as it is
+    # reached. By default the route is uploaded as a single mission; ROUTE_GOTO flies it
+    # leg by leg with drone_goto instead, e.g. for vehicles without mission support.
+    #
+    # Returns the time in seconds from starting the route to reaching the last waypoint
+    # (after its hold time). Raises asyncio.TimeoutError if timeout_sec is given and exceeded.
+    #
+    @_traced()
+    async def fly_route(
+        self,
+        drone: Drone,
+        waypoints: List[MissionWaypoint],
+        mode: str | None = None,
+        timeout_sec: float | None = None,
+    ) -> float:
+        mode = mode if mode is not None else self.route_mode
+        start_time = time.monotonic()
+        if mode == ROUTE_GOTO:
+            route = self._fly_route_with_gotos(drone, waypoints)
+        else:
+            route = self._fly_route_as_mission(drone, waypoints)
+        try:
+            await asyncio.wait_for(route, timeout_sec)
+        except asyncio.TimeoutError:
+            logger.error(f"{drone.drone_id} did not finish its route within {timeout_sec} s")
+            raise
+        elapsed_sec = time.monotonic() - start_time
+        logger.debug(f"{drone.drone_id} finished its route in {elapsed_sec:.2f} s.")
+        return elapsed_sec
+
+    async def _fly_route_with_gotos(
+        self, drone: Drone, waypoints: List[MissionWaypoint]
+    ) -> None:
+        for waypoint in waypoints:
+            goto_options = {}
+            if waypoint.acceptance_radius_m is not None:
+                goto_options["horizontal_tolerance_m"] = waypoint.acceptance_radius_m
+            if waypoint.altitude_tolerance_m is not None:
+                goto_options["altitude_tolerance_m"] = waypoint.altitude_tolerance_m
+            if waypoint.yaw_tolerance_deg is not None:
+                goto_options["yaw_tolerance_deg"] = waypoint.yaw_tolerance_deg
+            await self.drone_goto(
+                drone,
+                latitude_deg=waypoint.latitude_deg,
+                longitude_deg=waypoint.longitude_deg,
+                altitude_m=waypoint.altitude_m,
+                yaw_deg=waypoint.yaw_deg,
+                status_at_completion=waypoint.status_at_arrival,
+                **goto_options,
+            )
+            if waypoint.hold_sec:
+                with self.trace_span(drone, "hold"):
+                    await asyncio.sleep(waypoint.hold_sec)
+
+    async def _fly_route_as_mission(
+        self, drone: Drone, waypoints: List[MissionWaypoint]
+    ) -> None:
+        position = await self.get_one_position(drone)
+        heading_deg = await self.get_one_heading(drone)
+        compiled = compile_mission(
+            waypoints,
+            start_latitude_deg=position.latitude_deg,
+            start_longitude_deg=position.longitude_deg,
+            start_altitude_m=position.absolute_altitude_m,
+            start_yaw_deg=heading_deg,
+            home_altitude_m=position.absolute_altitude_m - position.relative_altitude_m,
+        )
+        total = len(compiled)
+        mission = drone.mavsdk_system.mission
+        await mission.set_return_to_launch_after_mission(False)
+        await mission.upload_mission(compiled.plan)
+
+        # Waypoints count as reached when mission progress moves past them or, so that
+        # milestones fire on arrival rather than after the hold, as soon as position and
+        # heading telemetry are within the tolerances of the current one.
+        events = asyncio.Queue()
+        current = 0
+        reached = 0  # waypoints [0, reached) have been handled
+        leg_start_ns = time.perf_counter_ns()
+
+        def on_sample(name, sample) -> None:
+            if name in ("position", "heading") and current < total and current >= reached:
+                position = drone.telemetry.latest_value("position")
+                heading = drone.telemetry.latest_value("heading")
+                if position is not None and compiled.waypoints[current].reached_by(
+                    position, heading.heading_deg if heading is not None else None
+                ):
+                    events.put_nowait(current + 1)
+
+        async def follow_progress() -> None:
+            async for progress in mission.mission_progress():
+                events.put_nowait(progress)
+                if progress.total == total and progress.current >= total:
+                    return
+
+        drone.telemetry.add_sample_listener(on_sample)
+        progress_task = asyncio.create_task(follow_progress())
+        # a failed or ended progress stream must not leave the loop below waiting
+        progress_task.add_done_callback(events.put_nowait)
+        try:
+            await mission.start_mission()
+            finished = False
+            while not finished:
+                event = await events.get()
+                if isinstance(event, asyncio.Task):
+                    if event.exception() is not None:
+                        raise event.exception()
+                    raise Exception("mission progress stream ended")
+                if isinstance(event, int):
+                    reached_upto = event
+                elif event.total == total:
+                    current = min(event.current, total)
+                    reached_upto = current
+                    finished = event.current >= total
+                else:
+                    continue  # progress of a previous mission
+                while reached < reached_upto:
+                    logger.debug(f"{drone.drone_id} reached waypoint {reached + 1}/{total}")
+                    status = compiled.milestones.get(reached)
+                    reached += 1
+                    if status is not None:
+                        await self.set_drone_status(drone, status)
+                    tracer = tracing.get_tracer()
+                    if tracer is not None:
+                        # one span per leg, from the previous waypoint to this one
+                        now_ns = time.perf_counter_ns()
+                        tracer.record(
+                            f"waypoint {reached}/{total}",
+                            "mission",
+                            drone.drone_id,
+                            leg_start_ns,
+                            now_ns,
+                            self.trace_args(drone),
+                        )
+                        leg_start_ns = now_ns
+        finally:
+            drone.telemetry.remove_sample_listener(on_sample)
+            progress_task.cancel()
+
+    @_traced()
     async def comms_drone_mission(self, drone: Drone) -> None:
         logger.info("comms_drone: Arming")
         await drone.mavsdk_system.action.arm()
@@ -182,9 +385,10 @@ class DemoController(object):
         # 10 m/s speed seems to be the minimum
         await drone.mavsdk_system.action.set_current_speed(10.0)
 
+    @_traced()
     async def x3_mission(self, drone: Drone) -> None:
         # Wait for VTOL to be in position above firestation
-        # await wait_for_drone_status(sim, sim.xlab550, DroneStatus.LOOKING_AT_FIRESTATION)
+        # await self.wait_for_drone_status("xlab550", DemoDroneStatus.LOOKING_AT_FIRESTATION)
         # Update: We want to show drones acting concurrently, so don't wait for VTOL
 
         # wait for a short time
@@ -200,79 +404,51 @@ class DemoController(object):
         await self.set_drone_status(drone, DemoDroneStatus.IN_AIR)
         drone.set_status(DroneStatus.AIRBORNE)
 
-        await self.drone_goto(
-            drone,
-            latitude_deg=32.061728,
-            longitude_deg=118.778431,
-            altitude_m=25.0,
-            status_at_completion=DemoDroneStatus.ABOVE_LAUNCH_SITE,
-        )
-
-        logger.info("x3 fly to firestation")
-        await self.drone_goto(
-            drone,
-            latitude_deg=32.061566,
-            longitude_deg=118.779284,
-            altitude_m=30.0,
-            yaw_deg=120.0,
-            status_at_completion=DemoDroneStatus.ABOVE_FIRESTATION,
-        )
-
-        logger.info("x3 look in firestation")
-        await self.drone_goto(
+        logger.info("x3 fly to firestation, look in and around it")
+        await self.fly_route(
             drone,
-            latitude_deg=32.061566,
-            longitude_deg=118.779284,
-            altitude_m=3.3,
-            yaw_deg=200.0,
-            status_at_completion=DemoDroneStatus.LOOKING_AT_FIRESTATION,
-            altitude_epsilon=0.2,
-        )
-
-        logger.info("x3 fly in firestation")
-        await self.drone_goto(
-            drone,
-            latitude_deg=32.061467,
-            longitude_deg=118.779241,
-            altitude_m=3.2,
-            yaw_deg=200.0,
-            status_at_completion=DemoDroneStatus.IN_FIRESTATION,
-        )
-
-        # logger.info("x3 look around firestation")
-        # await self.drone_goto(
-        #     drone,
-        #     altitude_m=3.2,
-        #     yaw_deg=300.0,
-        # )
-
-        await asyncio.sleep(10)
-
-        logger.info("x3 look around firestation")
-        await self.drone_goto(
-            drone,
-            altitude_m=3.2,
-            yaw_deg=60.0,
-        )
-
-        await asyncio.sleep(10)
-        logger.info("x3 look around firestation")
-        await self.drone_goto(
-            drone,
-            altitude_m=3.2,
-            yaw_deg=170.0,
-        )
-
-        await asyncio.sleep(10)
-
-        logger.info("x3 fly out firestation")
-        await self.drone_goto(
-            drone,
-            latitude_deg=32.061398,
-            longitude_deg=118.779249,
-            altitude_m=2.6,
-            yaw_deg=170.0,
-            status_at_completion=DemoDroneStatus.LOOKING_AT_FIRESTATION,
+            [
+                MissionWaypoint(
+                    latitude_deg=32.061728,
+                    longitude_deg=118.778431,
+                    altitude_m=25.0,
+                    status_at_arrival=DemoDroneStatus.ABOVE_LAUNCH_SITE,
+                ),
+                MissionWaypoint(
+                    latitude_deg=32.061566,
+                    longitude_deg=118.779284,
+                    altitude_m=30.0,
+                    yaw_deg=120.0,
+                    status_at_arrival=DemoDroneStatus.ABOVE_FIRESTATION,
+                ),
+                MissionWaypoint(
+                    latitude_deg=32.061566,
+                    longitude_deg=118.779284,
+                    altitude_m=3.3,
+                    yaw_deg=200.0,
+                    altitude_tolerance_m=0.2,
+                    status_at_arrival=DemoDroneStatus.LOOKING_AT_FIRESTATION,
+                ),
+                MissionWaypoint(
+                    latitude_deg=32.061467,
+                    longitude_deg=118.779241,
+                    altitude_m=3.2,
+                    yaw_deg=200.0,
+                    hold_sec=10.0,
+                    status_at_arrival=DemoDroneStatus.IN_FIRESTATION,
+                ),
+                # look around firestation
+                MissionWaypoint(altitude_m=3.2, yaw_deg=60.0, hold_sec=10.0),
+                MissionWaypoint(altitude_m=3.2, yaw_deg=170.0, hold_sec=10.0),
+                # fly out firestation
+                MissionWaypoint(
+                    latitude_deg=32.061398,
+                    longitude_deg=118.779249,
+                    altitude_m=2.6,
+                    yaw_deg=170.0,
+                    status_at_arrival=DemoDroneStatus.LOOKING_AT_FIRESTATION,
+                ),
+            ],
         )
 
         await asyncio.sleep(15)
@@ -281,9 +457,12 @@ class DemoController(object):
 
         logger.info("x3 returning to land")
 
+    @_traced()
     async def x500_mission(self, drone: Drone) -> None:
         # Wait for VTOL to be in position above firestation
-        # await wait_for_drone_status(sim, sim.vtol, DroneStatus.ABOVE_FIRESTATION)
+        # await self.wait_for_drone_status(
+        #     "fixed_wing_comms_drone", DemoDroneStatus.ABOVE_FIRESTATION
+        # )
         # Update: We want to show drones acting concurrently, so don't wait for VTOL
 
         # wait for a short time
@@ -299,38 +478,41 @@ class DemoController(object):
         await self.set_drone_status(drone, DemoDroneStatus.IN_AIR)
         drone.set_status(DroneStatus.AIRBORNE)
 
-        # climb and head towards firestation while initially avoiding trees
-        await self.drone_goto(
-            drone,
-            latitude_deg=32.062515,
-            longitude_deg=118.778664,
-            altitude_m=25.0,
-            status_at_completion=DemoDroneStatus.ABOVE_LAUNCH_SITE,
-        )
-
         logger.info("x500 fly to firestation")
-        await self.drone_goto(
-            drone,
-            latitude_deg=32.061566,
-            longitude_deg=118.779284,
-            altitude_m=30.0,
-            yaw_deg=120.0,
-            status_at_completion=DemoDroneStatus.ABOVE_FIRESTATION,
-        )
-
-        logger.info("x500 look in firestation")
-        await self.drone_goto(
+        await self.fly_route(
             drone,
-            latitude_deg=32.061453,
-            longitude_deg=118.779477,
-            altitude_m=3.2,
-            yaw_deg=270.0,
-            status_at_completion=DemoDroneStatus.LOOKING_AT_FIRESTATION,
+            [
+                # climb and head towards firestation while initially avoiding trees
+                MissionWaypoint(
+                    latitude_deg=32.062515,
+                    longitude_deg=118.778664,
+                    altitude_m=25.0,
+                    status_at_arrival=DemoDroneStatus.ABOVE_LAUNCH_SITE,
+                ),
+                MissionWaypoint(
+                    latitude_deg=32.061566,
+                    longitude_deg=118.779284,
+                    altitude_m=30.0,
+                    yaw_deg=120.0,
+                    status_at_arrival=DemoDroneStatus.ABOVE_FIRESTATION,
+                ),
+                # look in firestation
+                MissionWaypoint(
+                    latitude_deg=32.061453,
+                    longitude_deg=118.779477,
+                    altitude_m=3.2,
+                    yaw_deg=270.0,
+                    status_at_arrival=DemoDroneStatus.LOOKING_AT_FIRESTATION,
+                ),
+            ],
         )
 
+    @_traced()
     async def xlab550_mission(self, drone: Drone) -> None:
         # Wait for VTOL to be in position above firestation
-        # await wait_for_drone_status(sim, sim.vtol, DroneStatus.ABOVE_FIRESTATION)
+        # await self.wait_for_drone_status(
+        #     "fixed_wing_comms_drone", DemoDroneStatus.ABOVE_FIRESTATION
+        # )
         # Update: We want to show drones acting concurrently, so don't wait for VTOL
 
         # wait for a short time
@@ -346,28 +528,28 @@ class DemoController(object):
         await self.set_drone_status(drone, DemoDroneStatus.IN_AIR)
         drone.set_status(DroneStatus.AIRBORNE)
 
-        logger.info("xlab550: Climbing to 30m and turning to look at firestation")
-        await self.drone_goto(
-            drone,
-            altitude_m=3.0,
-            yaw_deg=300.0,
-            status_at_completion=DemoDroneStatus.ABOVE_LAUNCH_SITE,
-        )
-
-        logger.info("xlab550: fly to firestation")
-        await self.drone_goto(
-            drone,
-            latitude_deg=32.061265,
-            longitude_deg=118.779401,
-            altitude_m=20.0,
-            yaw_deg=300.0,
-            status_at_completion=DemoDroneStatus.ABOVE_FIRESTATION,
-        )
-
-        logger.info("xlab550: look at firestation")
-        await self.drone_goto(
+        logger.info("xlab550: Climbing and flying to firestation")
+        await self.fly_route(
             drone,
-            altitude_m=9.0,
-            yaw_deg=320.0,
-            status_at_completion=DemoDroneStatus.LOOKING_AT_FIRESTATION,
+            [
+                # climb and turn to look at firestation
+                MissionWaypoint(
+                    altitude_m=3.0,
+                    yaw_deg=300.0,
+                    status_at_arrival=DemoDroneStatus.ABOVE_LAUNCH_SITE,
+                ),
+                MissionWaypoint(
+                    latitude_deg=32.061265,
+                    longitude_deg=118.779401,
+                    altitude_m=20.0,
+                    yaw_deg=300.0,
+                    status_at_arrival=DemoDroneStatus.ABOVE_FIRESTATION,
+                ),
+                # look at firestation
+                MissionWaypoint(
+                    altitude_m=9.0,
+                    yaw_deg=320.0,
+                    status_at_arrival=DemoDroneStatus.LOOKING_AT_FIRESTATION,
+                ),
+            ],
         )
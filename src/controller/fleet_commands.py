@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+from model.drone import Drone
+
+logger = logging.getLogger(__name__)
+
+# an action is the name of a MAVSDK Action plugin method, e.g. "arm" or
+# "return_to_launch", or a function taking a drone and returning an awaitable
+ActionSpec = str | Callable[[Drone], Awaitable]
+
+
+@dataclass
+class CommandResult:
+    drone_id: str
+    ok: bool = False
+    # from the command being dispatched to the drone to it completing or failing
+    latency_sec: float = 0.0
+    value: Any = None
+    error: str | None = None
+    timed_out: bool = False
+
+
+@dataclass
+class CommandReport:
+    action: str
+    results: List[CommandResult] = field(default_factory=list)
+    wall_time_sec: float = 0.0
+
+    @property
+    def succeeded(self) -> List[CommandResult]:
+        return [r for r in self.results if r.ok]
+
+    @property
+    def failed(self) -> List[CommandResult]:
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def all_ok(self) -> bool:
+        return all(r.ok for r in self.results)
+
+    def by_drone(self) -> Dict[str, CommandResult]:
+        return {r.drone_id: r for r in self.results}
+
+    def latency_stats(self) -> Dict[str, float]:
+        """Mean and max seconds over the drones that completed the command."""
+        latencies = [r.latency_sec for r in self.succeeded]
+        if not latencies:
+            return {}
+        return {"mean_sec": sum(latencies) / len(latencies), "max_sec": max(latencies)}
+
+    def summary(self) -> str:
+        text = (
+            f"{self.action}: {len(self.succeeded)}/{len(self.results)} drones "
+            f"in {self.wall_time_sec:.2f}s"
+        )
+        stats = self.latency_stats()
+        if stats:
+            text += (
+                f" (latency mean {stats['mean_sec'] * 1000:.1f} ms "
+                f"max {stats['max_sec'] * 1000:.1f} ms)"
+            )
+        for r in self.failed:
+            text += f"; {r.drone_id} failed: {r.error}"
+        return text
+
+
+def action_name(action: ActionSpec) -> str:
+    return action if isinstance(action, str) else getattr(action, "__name__", repr(action))
+
+
+async def dispatch_command(
+    drones: Iterable[Drone],
+    action: ActionSpec,
+    args: tuple = (),
+    kwargs: Dict[str, Any] | None = None,
+    timeout_sec: float | None = None,
+    max_concurrency: int | None = None,
+    on_result: Callable[[str, CommandResult], None] | None = None,
+) -> CommandReport:
+    """Run one action on many drones at once and collect a result per drone.
+
+    A string action calls drone.mavsdk_system.action.<action>(*args, **kwargs). Each
+    drone gets its own timeout_sec; a drone failing or timing out does not affect
+    the others. max_concurrency caps how many commands are in flight, None sends
+    them all at once. A function action is called as action(drone, *args, **kwargs).
+    Drones that are not connected fail without being sent anything.
+    """
+    kwargs = kwargs or {}
+    name = action_name(action)
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    start = time.monotonic()
+
+    async def run_one(drone: Drone) -> CommandResult:
+        result = CommandResult(drone_id=drone.drone_id)
+        if drone.mavsdk_system is None:
+            result.error = "not connected"
+            return result
+        if semaphore is not None:
+            async with semaphore:
+                await _run_command(drone, action, args, kwargs, timeout_sec, result)
+        else:
+            await _run_command(drone, action, args, kwargs, timeout_sec, result)
+        if not result.ok:
+            logger.warning(f"{drone.drone_id}: {name} failed: {result.error}")
+        if on_result is not None:
+            on_result(name, result)
+        return result
+
+    # gather makes every coroutine a task up front, so with no concurrency cap all
+    # commands start together instead of one after another
+    results = await asyncio.gather(*(run_one(drone) for drone in drones))
+    return CommandReport(
+        action=name, results=list(results), wall_time_sec=time.monotonic() - start
+    )
+
+
+async def _run_command(
+    drone: Drone,
+    action: ActionSpec,
+    args: tuple,
+    kwargs: Dict[str, Any],
+    timeout_sec: float | None,
+    result: CommandResult,
+) -> None:
+    start = time.monotonic()
+    try:
+        if isinstance(action, str):
+            awaitable = getattr(drone.mavsdk_system.action, action)(*args, **kwargs)
+        else:
+            awaitable = action(drone, *args, **kwargs)
+        result.value = await asyncio.wait_for(awaitable, timeout_sec)
+        result.ok = True
+    except asyncio.TimeoutError:
+        result.timed_out = True
+        result.error = f"timed out after {timeout_sec} s"
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        result.error = str(e)
+    finally:
+        result.latency_sec = time.monotonic() - start
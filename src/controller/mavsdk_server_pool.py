@@ -0,0 +1,265 @@
+import asyncio
+import heapq
+import logging
+import os
+import time
+from importlib.resources import files
+from typing import Dict, Iterable, List
+
+import mavsdk.bin
+
+from model.drone import Drone, DroneStatus
+
+logger = logging.getLogger(__name__)
+
+
+class MavsdkServerHandle(object):
+    """A running mavsdk_server that a System can attach to by address and port."""
+
+    def __init__(self, connection_url: str, address: str, port: int, process=None):
+        self.connection_url = connection_url
+        self.address = address
+        self.port = port
+        # asyncio subprocess for pooled servers, None for externally managed ones
+        self.process: asyncio.subprocess.Process | None = process
+        self.drone: Drone | None = None  # drone that last acquired this server
+        self.last_used = time.monotonic()
+        self.startup_sec: float | None = None
+        self.reserved = False
+
+    @property
+    def external(self) -> bool:
+        return self.process is None
+
+    def is_alive(self) -> bool:
+        return self.external or self.process.returncode is None
+
+    def is_idle(self) -> bool:
+        # reserved while starting or handed to an acquire() that has not set drone yet
+        if self.reserved:
+            return False
+        return self.drone is None or self.drone.status == DroneStatus.DISCONNECTED
+
+    def resident_memory_kb(self) -> int | None:
+        if self.process is None:
+            return None
+        return process_resident_memory_kb(self.process.pid)
+
+
+class MavsdkServerPool(object):
+    """Shared mavsdk_server processes, started ahead of time and reused across reconnects.
+
+    A mavsdk_server serves one vehicle, so servers are keyed by the drone's connection
+    URL. At most max_servers pooled processes run at once. When the cap is reached the
+    least recently used server whose drone is disconnected is stopped, otherwise
+    acquire() waits until a drone disconnects. Servers still starting, or about to be
+    handed to an acquire(), are never stopped for another. Externally managed servers (listed in
+    the scenario) are attached to by address and never started, stopped or counted.
+    """
+
+    def __init__(
+        self,
+        max_servers: int = 16,
+        base_port: int = 50051,
+        sysid: int = 245,
+        compid: int = 190,
+        ready_timeout_sec: float = 10.0,
+    ):
+        self.max_servers = max_servers
+        self.base_port = base_port
+        self.sysid = sysid
+        self.compid = compid
+        self.ready_timeout_sec = ready_timeout_sec
+        self._servers: Dict[str, MavsdkServerHandle] = {}  # connection_url -> server
+        self._starting: Dict[str, asyncio.Future] = {}  # connection_url -> start task
+        self._claims: Dict[str, int] = {}  # connection_url -> acquire() calls in flight
+        self._external: Dict[str, MavsdkServerHandle] = {}  # drone_id -> server
+        self._free_ports: List[int] = []  # min-heap of released port offsets
+        self._next_port_offset = 0
+        self._slot_changed = asyncio.Condition()
+        self._watched_drones = set()
+
+    def add_external(self, drone_id: str, address: str, port: int) -> None:
+        self._external[drone_id] = MavsdkServerHandle(None, address, port)
+
+    def server_count(self) -> int:
+        return len(self._servers)
+
+    def servers(self) -> List[MavsdkServerHandle]:
+        return list(self._servers.values()) + list(self._external.values())
+
+    async def acquire(self, drone: Drone) -> MavsdkServerHandle:
+        """Return a ready server for the drone, starting one if needed."""
+        handle = self._external.get(drone.drone_id)
+        if handle is None:
+            url = drone.connection_url
+            self._claims[url] = self._claims.get(url, 0) + 1
+            try:
+                handle = await self._ensure_server(url)
+            finally:
+                self._release_claim(url)
+            # no await between releasing the claim and setting the drone, so the server
+            # cannot be stopped for another in between
+
+        handle.drone = drone
+        handle.last_used = time.monotonic()
+        self._watch(drone)
+        return handle
+
+    def prestart(self, drones: Iterable[Drone]) -> asyncio.Task:
+        """Start servers for the given drones (up to the cap) in the background."""
+        drones = [d for d in drones if d.drone_id not in self._external]
+        return asyncio.create_task(self._prestart(drones[: self.max_servers]))
+
+    async def shutdown(self) -> None:
+        for handle in list(self._servers.values()):
+            await self._stop_server(handle)
+
+    def resident_memory_kb(self) -> int:
+        """Total resident memory of the pooled server processes."""
+        return sum(h.resident_memory_kb() or 0 for h in self._servers.values())
+
+    async def _prestart(self, drones: List[Drone]) -> None:
+        results = await asyncio.gather(
+            *(self._ensure_server(d.connection_url) for d in drones),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Failed to prestart mavsdk_server: {result}")
+
+    async def _ensure_server(self, connection_url: str) -> MavsdkServerHandle:
+        # concurrent callers for the same URL share a single server start
+        starting = self._starting.get(connection_url)
+        if starting is not None:
+            return await asyncio.shield(starting)
+
+        handle = self._servers.get(connection_url)
+        if handle is not None:
+            if handle.is_alive():
+                return handle
+            logger.warning(f"mavsdk_server for {connection_url} exited, restarting")
+            self._forget(handle)
+
+        starting = asyncio.ensure_future(self._start_server(connection_url))
+        self._starting[connection_url] = starting
+        starting.add_done_callback(lambda _: self._starting.pop(connection_url, None))
+        return await asyncio.shield(starting)
+
+    async def _start_server(self, connection_url: str) -> MavsdkServerHandle:
+        async with self._slot_changed:
+            while len(self._servers) >= self.max_servers:
+                idle = self._least_recently_used_idle()
+                if idle is not None:
+                    await self._stop_server(idle)
+                    break
+                await self._slot_changed.wait()
+
+            port = self._lease_port()
+            start = time.monotonic()
+            process = await asyncio.create_subprocess_exec(
+                os.fspath(files(mavsdk.bin) / "mavsdk_server"),
+                "-p",
+                str(port),
+                "--sysid",
+                str(self.sysid),
+                "--compid",
+                str(self.compid),
+                connection_url,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            handle = MavsdkServerHandle(connection_url, "localhost", port, process)
+            handle.reserved = True
+            self._servers[connection_url] = handle
+
+        try:
+            await self._wait_ready(handle)
+        except Exception:
+            await self._stop_server(handle)
+            await self._notify_slot_changed()
+            raise
+        handle.startup_sec = time.monotonic() - start
+        # reserved until every acquire() waiting for it has its drone set; a prestarted
+        # server nobody asked for yet is free to be stopped for another
+        handle.reserved = connection_url in self._claims
+        if not handle.reserved:
+            await self._notify_slot_changed()
+        logger.debug(
+            f"mavsdk_server for {connection_url} ready on port {port} in {handle.startup_sec:.2f}s"
+        )
+        return handle
+
+    async def _wait_ready(self, handle: MavsdkServerHandle) -> None:
+        # the server is ready once its gRPC port accepts connections
+        deadline = time.monotonic() + self.ready_timeout_sec
+        while True:
+            if not handle.is_alive():
+                raise RuntimeError(f"mavsdk_server on port {handle.port} exited")
+            try:
+                _, writer = await asyncio.open_connection(handle.address, handle.port)
+                writer.close()
+                return
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(
+                        f"mavsdk_server on port {handle.port} not ready after {self.ready_timeout_sec} s"
+                    )
+                await asyncio.sleep(0.05)
+
+    async def _stop_server(self, handle: MavsdkServerHandle) -> None:
+        self._forget(handle)
+        if handle.process.returncode is None:
+            handle.process.kill()
+            await handle.process.wait()
+
+    def _forget(self, handle: MavsdkServerHandle) -> None:
+        if self._servers.get(handle.connection_url) is handle:
+            del self._servers[handle.connection_url]
+            heapq.heappush(self._free_ports, handle.port - self.base_port)
+
+    def _release_claim(self, connection_url: str) -> None:
+        count = self._claims.pop(connection_url) - 1
+        if count:
+            self._claims[connection_url] = count
+            return
+        handle = self._servers.get(connection_url)
+        if handle is not None and connection_url not in self._starting:
+            handle.reserved = False
+
+    def _lease_port(self) -> int:
+        if self._free_ports:
+            return self.base_port + heapq.heappop(self._free_ports)
+        offset = self._next_port_offset
+        self._next_port_offset += 1
+        return self.base_port + offset
+
+    def _least_recently_used_idle(self) -> MavsdkServerHandle | None:
+        idle = [h for h in self._servers.values() if h.is_idle()]
+        return min(idle, key=lambda h: h.last_used) if idle else None
+
+    def _watch(self, drone: Drone) -> None:
+        # wake up acquire() calls waiting for a slot whenever a drone disconnects
+        if drone.drone_id not in self._watched_drones:
+            self._watched_drones.add(drone.drone_id)
+            drone.add_status_change_callback(self._drone_status_changed)
+
+    def _drone_status_changed(self, drone: Drone, new_status: DroneStatus) -> None:
+        if new_status == DroneStatus.DISCONNECTED:
+            asyncio.ensure_future(self._notify_slot_changed())
+
+    async def _notify_slot_changed(self) -> None:
+        async with self._slot_changed:
+            self._slot_changed.notify_all()
+
+
+def process_resident_memory_kb(pid: int) -> int | None:
+    # Linux only; returns None where /proc is not available
+    try:
+        with open(f"/proc/{pid}/status") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
@@ -0,0 +1,153 @@
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from mavsdk.mission import MissionItem, MissionPlan
+
+from controller.arrival_check import ALTITUDE_TOLERANCE_M, YAW_TOLERANCE_DEG
+from utils.geo_tools import heading_difference_deg, latlon_to_local_m
+
+# default horizontal acceptance radius of mission items. Wider than drone_goto's
+# tolerance: the vehicle moves on to the next item within this radius, so a
+# milestone checked against a tighter one could be missed
+MISSION_ACCEPTANCE_RADIUS_M = 0.5
+
+
+@dataclass
+class MissionWaypoint:
+    """One leg of a route, with the same conventions as DemoController.drone_goto.
+
+    Any of latitude_deg, longitude_deg, altitude_m (absolute, metres AMSL) and yaw_deg
+    left as None keeps the value of the previous waypoint, or the drone's current
+    value for the first one. hold_sec is how long to stay at the waypoint before
+    continuing. status_at_arrival is a DemoDroneStatus to set once it is reached.
+    acceptance_radius_m, altitude_tolerance_m and yaw_tolerance_deg say how close
+    counts as reached. The altitude and yaw ones default to drone_goto's; the radius
+    defaults to drone_goto's horizontal tolerance when flown with gotos, and to
+    MISSION_ACCEPTANCE_RADIUS_M when flown as a mission.
+    """
+
+    latitude_deg: float | None = None
+    longitude_deg: float | None = None
+    altitude_m: float | None = None
+    yaw_deg: float | None = None
+    hold_sec: float = 0.0
+    speed_m_s: float | None = None
+    acceptance_radius_m: float | None = None
+    altitude_tolerance_m: float | None = None
+    yaw_tolerance_deg: float | None = None
+    fly_through: bool = False
+    status_at_arrival: object = None
+
+    def reached_by(self, position, heading_deg: float | None = None) -> bool:
+        """True if a telemetry Position (and heading, if the waypoint has a yaw) is
+        within the tolerances of this waypoint.
+
+        Only meaningful for resolved waypoints (see CompiledMission.waypoints).
+        """
+        east, north = latlon_to_local_m(
+            position.latitude_deg, position.longitude_deg, self.latitude_deg, self.longitude_deg
+        )
+        radius = (
+            self.acceptance_radius_m
+            if self.acceptance_radius_m is not None
+            else MISSION_ACCEPTANCE_RADIUS_M
+        )
+        altitude_tolerance_m = (
+            self.altitude_tolerance_m
+            if self.altitude_tolerance_m is not None
+            else ALTITUDE_TOLERANCE_M
+        )
+        if (
+            math.hypot(north, east) > radius
+            or abs(position.absolute_altitude_m - self.altitude_m) > altitude_tolerance_m
+        ):
+            return False
+        if self.yaw_deg is None or math.isnan(self.yaw_deg):
+            return True
+        yaw_tolerance_deg = (
+            self.yaw_tolerance_deg if self.yaw_tolerance_deg is not None else YAW_TOLERANCE_DEG
+        )
+        return (
+            heading_deg is not None
+            and heading_difference_deg(heading_deg, self.yaw_deg) <= yaw_tolerance_deg
+        )
+
+
+@dataclass
+class CompiledMission:
+    plan: MissionPlan
+    # the waypoints with every None resolved, one per mission item
+    waypoints: List[MissionWaypoint] = field(default_factory=list)
+    # mission item index -> status to set once that item has been reached
+    milestones: Dict[int, object] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.plan.mission_items)
+
+
+def compile_mission(
+    waypoints: List[MissionWaypoint],
+    start_latitude_deg: float,
+    start_longitude_deg: float,
+    start_altitude_m: float,
+    start_yaw_deg: float,
+    home_altitude_m: float,
+    acceptance_radius_m: float = MISSION_ACCEPTANCE_RADIUS_M,
+) -> CompiledMission:
+    """Turn waypoints into a single MissionPlan for upload.
+
+    Mission items take altitudes relative to home, so absolute altitudes are
+    converted with home_altitude_m (position.absolute_altitude_m -
+    position.relative_altitude_m of the drone).
+    """
+    lat, lon, alt, yaw = start_latitude_deg, start_longitude_deg, start_altitude_m, start_yaw_deg
+    items = []
+    resolved = []
+    milestones = {}
+    for index, waypoint in enumerate(waypoints):
+        lat = waypoint.latitude_deg if waypoint.latitude_deg is not None else lat
+        lon = waypoint.longitude_deg if waypoint.longitude_deg is not None else lon
+        alt = waypoint.altitude_m if waypoint.altitude_m is not None else alt
+        yaw = waypoint.yaw_deg if waypoint.yaw_deg is not None else yaw
+        radius = (
+            waypoint.acceptance_radius_m
+            if waypoint.acceptance_radius_m is not None
+            else acceptance_radius_m
+        )
+        items.append(
+            MissionItem(
+                latitude_deg=lat,
+                longitude_deg=lon,
+                relative_altitude_m=alt - home_altitude_m,
+                speed_m_s=waypoint.speed_m_s if waypoint.speed_m_s is not None else math.nan,
+                is_fly_through=waypoint.fly_through,
+                gimbal_pitch_deg=math.nan,
+                gimbal_yaw_deg=math.nan,
+                camera_action=MissionItem.CameraAction.NONE,
+                loiter_time_s=waypoint.hold_sec,
+                camera_photo_interval_s=math.nan,
+                acceptance_radius_m=radius,
+                yaw_deg=yaw,
+                camera_photo_distance_m=math.nan,
+                vehicle_action=MissionItem.VehicleAction.NONE,
+            )
+        )
+        resolved.append(
+            MissionWaypoint(
+                latitude_deg=lat,
+                longitude_deg=lon,
+                altitude_m=alt,
+                yaw_deg=yaw,
+                hold_sec=waypoint.hold_sec,
+                speed_m_s=waypoint.speed_m_s,
+                acceptance_radius_m=radius,
+                altitude_tolerance_m=waypoint.altitude_tolerance_m,
+                yaw_tolerance_deg=waypoint.yaw_tolerance_deg,
+                fly_through=waypoint.fly_through,
+                status_at_arrival=waypoint.status_at_arrival,
+            )
+        )
+        if waypoint.status_at_arrival is not None:
+            milestones[index] = waypoint.status_at_arrival
+    return CompiledMission(MissionPlan(items), resolved, milestones)
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from model.drone import Drone, DroneStatus
+from utils.geo_tools import latlon_to_local_m_batch
+
+logger = logging.getLogger(__name__)
+
+# the neighbour cells to compare with, half of the 3x3 block so each pair shows up once
+_NEIGHBOUR_CELLS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def find_close_pairs(
+    east: np.ndarray,
+    north: np.ndarray,
+    up: np.ndarray,
+    min_horizontal_m: float,
+    min_vertical_m: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Pairs of points closer than both minimums, found with a spatial hash.
+
+    Points are hashed into square cells of min_horizontal_m, so a close pair is
+    always in the same or an adjacent cell and only those are compared: O(n) for a
+    spread out swarm instead of O(n²). Returns (i, j, horizontal_m, vertical_m)
+    arrays with i < j indexing the inputs.
+    """
+    count = len(east)
+    if count < 2:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, np.empty(0), np.empty(0)
+    cell_x = np.floor(east / min_horizontal_m).astype(np.int64)
+    cell_y = np.floor(north / min_horizontal_m).astype(np.int64)
+    # pack the cell into one key; the margin of 1 keeps neighbour keys from wrapping
+    cell_x -= cell_x.min() - 1
+    cell_y -= cell_y.min() - 1
+    stride = int(cell_y.max()) + 2
+    keys = cell_x * stride + cell_y
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    positions = np.arange(count)
+
+    firsts, seconds = [], []
+    for dx, dy in _NEIGHBOUR_CELLS:
+        neighbour_keys = sorted_keys + (dx * stride + dy)
+        end = np.searchsorted(sorted_keys, neighbour_keys, side="right")
+        if dx == 0 and dy == 0:
+            # same cell: only the points after this one
+            start = positions + 1
+        else:
+            start = np.searchsorted(sorted_keys, neighbour_keys, side="left")
+        counts = np.maximum(end - start, 0)
+        total = int(counts.sum())
+        if total == 0:
+            continue
+        firsts.append(np.repeat(positions, counts))
+        run_offsets = np.repeat(start - (np.cumsum(counts) - counts), counts)
+        seconds.append(run_offsets + np.arange(total))
+
+    if not firsts:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, np.empty(0), np.empty(0)
+    i = order[np.concatenate(firsts)]
+    j = order[np.concatenate(seconds)]
+    horizontal = np.hypot(east[i] - east[j], north[i] - north[j])
+    vertical = np.abs(up[i] - up[j])
+    close = (horizontal < min_horizontal_m) & (vertical < min_vertical_m)
+    i, j = i[close], j[close]
+    swap = i > j
+    i[swap], j[swap] = j[swap], i[swap]
+    return i, j, horizontal[close], vertical[close]
+
+
+@dataclass
+class SeparationAlert:
+    drone_ids: Tuple[str, str]
+    horizontal_m: float
+    vertical_m: float
+    started: float  # time.monotonic() when separation was lost
+    closest_horizontal_m: float
+    active: bool = True
+
+
+class SeparationMonitor(object):
+    """Checks every drone pair in the air for loss of separation on each telemetry tick.
+
+    Two drones are in conflict when they are closer than min_horizontal_m horizontally
+    and min_vertical_m vertically. Each new conflict is logged and passed to the alert
+    callbacks, and again with active False once it clears. With hold_on_conflict the
+    lower priority drone of a new conflict (the one registered later) is told to hold
+    position; resuming its mission is left to the operator.
+
+    Checks run on the SwarmState arrays, driven by a batched state subscription, so
+    the monitor costs nothing while no drone moves.
+    """
+
+    MONITORED_STATUSES = (DroneStatus.AIRBORNE, DroneStatus.LANDING)
+
+    def __init__(
+        self,
+        controller,
+        min_horizontal_m: float = 5.0,
+        min_vertical_m: float = 3.0,
+        rate_hz: float = 10.0,
+        hold_on_conflict: bool = False,
+    ):
+        self.controller = controller
+        self.min_horizontal_m = min_horizontal_m
+        self.min_vertical_m = min_vertical_m
+        self.rate_hz = rate_hz
+        self.hold_on_conflict = hold_on_conflict
+        self.conflicts: Dict[Tuple[str, str], SeparationAlert] = {}
+        self.alert_callbacks: List[Callable] = []
+        self.origin: Tuple[float, float] | None = None  # lat, lon of the local frame
+        self.check_count = 0
+        self.check_sec_total = 0.0
+        self._subscription = None
+        self._hold_tasks = set()  # referenced until done, so they are not collected
+        self._status_codes = np.array([status.value for status in self.MONITORED_STATUSES])
+
+    def add_alert_callback(self, callback_fn) -> None:
+        self.alert_callbacks.append(callback_fn)
+
+    def remove_alert_callback(self, callback_fn) -> None:
+        if callback_fn in self.alert_callbacks:
+            self.alert_callbacks.remove(callback_fn)
+
+    def start(self) -> None:
+        if self._subscription is None:
+            self._subscription = self.controller.subscribe_state(
+                self._on_tick,
+                batched=True,
+                min_interval_sec=1.0 / self.rate_hz,
+                name="separation_monitor",
+            )
+
+    def stop(self) -> None:
+        if self._subscription is not None:
+            self.controller.unsubscribe_state(self._subscription)
+            self._subscription = None
+
+    def _on_tick(self, drones: List[Drone]) -> None:
+        self.check()
+
+    def check(self) -> List[SeparationAlert]:
+        """Check the whole swarm now; returns the conflicts that are active."""
+        start = time.perf_counter()
+        arrays = self.controller.state_arrays()
+        monitored = np.isin(arrays.status, self._status_codes)
+        monitored &= np.isfinite(arrays.lat) & np.isfinite(arrays.lon)
+        monitored &= np.isfinite(arrays.alt)
+        indexes = np.flatnonzero(monitored)
+        if len(indexes) >= 2:
+            lat, lon = arrays.lat[indexes], arrays.lon[indexes]
+            if self.origin is None:
+                self.origin = (float(lat.mean()), float(lon.mean()))
+            east, north = latlon_to_local_m_batch(lat, lon, *self.origin)
+            i, j, horizontal, vertical = find_close_pairs(
+                east, north, arrays.alt[indexes], self.min_horizontal_m, self.min_vertical_m
+            )
+            self._update_conflicts(indexes[i], indexes[j], horizontal, vertical)
+        elif self.conflicts:
+            self._update_conflicts([], [], [], [])
+        self.check_count += 1
+        self.check_sec_total += time.perf_counter() - start
+        return list(self.conflicts.values())
+
+    def _update_conflicts(self, first_indexes, second_indexes, horizontal, vertical) -> None:
+        now = time.monotonic()
+        current = set()
+        drones = None
+        for a, b, h, v in zip(
+            np.asarray(first_indexes).tolist(),
+            np.asarray(second_indexes).tolist(),
+            np.asarray(horizontal).tolist(),
+            np.asarray(vertical).tolist(),
+        ):
+            if drones is None:
+                drones = self.controller.registry.drones_by_index()
+            key = (drones[a].drone_id, drones[b].drone_id)
+            current.add(key)
+            alert = self.conflicts.get(key)
+            if alert is None:
+                alert = SeparationAlert(key, h, v, now, h)
+                self.conflicts[key] = alert
+                logger.warning(
+                    f"Separation lost between {key[0]} and {key[1]}: "
+                    f"{h:.1f} m horizontal, {v:.1f} m vertical"
+                )
+                self._notify(alert)
+                if self.hold_on_conflict:
+                    self._hold(drones[a], drones[b])
+            else:
+                alert.horizontal_m, alert.vertical_m = h, v
+                alert.closest_horizontal_m = min(alert.closest_horizontal_m, h)
+
+        for key in [key for key in self.conflicts if key not in current]:
+            alert = self.conflicts.pop(key)
+            alert.active = False
+            logger.info(
+                f"Separation restored between {key[0]} and {key[1]} after "
+                f"{now - alert.started:.1f} s, closest {alert.closest_horizontal_m:.1f} m"
+            )
+            self._notify(alert)
+
+    def _hold(self, first: Drone, second: Drone) -> None:
+        # the later registered drone yields; registry indexes are reused, so they
+        # do not tell which one that is
+        registry = self.controller.registry
+        if registry.registration_sequence(first) > registry.registration_sequence(second):
+            first, second = second, first
+        task = asyncio.ensure_future(self.controller.hold_drone(second))
+        self._hold_tasks.add(task)
+        task.add_done_callback(self._hold_tasks.discard)
+
+    def _notify(self, alert: SeparationAlert) -> None:
+        for callback in self.alert_callbacks:
+            try:
+                callback(alert)
+            except Exception:
+                logger.exception("Separation alert callback failed")
@@ -1,12 +1,34 @@
 import asyncio
 import json
 import logging
-from typing import List
+import time
+from typing import Dict, List
 from model.drone import Drone, DroneStatus
+from model.drone_registry import DroneRegistry
+from model.state_subscription import StateSubscription, SubscriptionStats
+from model.swarm_state import StateArrays
+from model.telemetry_recorder import TelemetryRecorder
 
 from mavsdk import System
 
-from controller.demo_controller import DemoController
+from controller.connection_pipeline import (
+    PHASE_DISCOVERY,
+    PHASE_GRPC_CONNECT,
+    PHASE_HEALTH,
+    PHASE_MAVSDK_SERVER,
+    ConnectionPipeline,
+    ConnectionReport,
+    DroneConnectionError,
+)
+from controller.demo_controller import DemoController, DemoDroneStatus
+from controller.fleet_commands import ActionSpec, CommandReport, dispatch_command
+from controller.mavsdk_server_pool import MavsdkServerPool
+from controller.separation_monitor import SeparationMonitor
+from controller.swarm_metrics import SwarmMetrics
+from sim.sim_world import SimVehicle, SimWorld
+from sim.simulated_system import SimulatedSystem
+from utils import tracing
+from utils.geo_tools import offset_latlon
 
 # TODO: Separate mavsdk specifics from controller logic
 
@@ -15,16 +37,70 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+BACKEND_MAVSDK = "mavsdk"
+BACKEND_SIM = "sim"
+
+
 class SwarmController:
-    def __init__(self, scenario_spec: str | None = None):
-        self.drones = {}
+    def __init__(self, scenario_spec: str | None = None, backend: str | None = None):
+        self.registry = DroneRegistry()
+
+        # Connection settings, may be overridden by the scenario's "connection" block
+        # waiting for a pooled mavsdk_server, e.g. while all max_servers are in use
+        self.server_timeout_sec: float | None = 30.0
+        self.connect_timeout_sec: float | None = 3.0
+        self.discovery_timeout_sec: float | None = 10.0
+        self.health_timeout_sec: float | None = 30.0
+        self.wait_for_health: bool = True
+        self.connection_pipeline = ConnectionPipeline(self.connect_drone)
+        self.last_connection_report: ConnectionReport | None = None
+
+        # Fan-out command settings, may be overridden by the scenario's "commands" block
+        self.command_timeout_sec: float | None = 5.0
+        self.command_max_concurrency: int | None = None  # None sends all at once
+        # tasks of the running deploy_swarm, cancelled by emergency commands
+        self.mission_tasks: List[asyncio.Task] = []
+        self._missions_aborted = False
+
+        # None means every System launches its own mavsdk_server
+        self.mavsdk_server_pool: MavsdkServerPool | None = None
+        self._prestart_pending = False
+
+        self.recorder: TelemetryRecorder | None = None
+        self.separation_monitor: SeparationMonitor | None = None
+        self.metrics: SwarmMetrics | None = None
+        # swarm-wide state subscriptions, also added to drones added later
+        self.state_subscriptions: List[StateSubscription] = []
+
+        # Set when drones are simulated in-process instead of connected through MAVSDK
+        self.sim_world: SimWorld | None = None
+        self.sim_home: tuple | None = None  # (lat, lon, alt) of the first drone's home
+        self.sim_spacing_m = 5.0
 
         self.demo_controller = DemoController()
+        self.scenario_spec = {}
         if scenario_spec:
             self.load_scenario(scenario_spec)
+        # an explicit backend overrides the scenario's
+        if backend == BACKEND_SIM and self.sim_world is None:
+            self.enable_sim_backend()
+        elif backend == BACKEND_MAVSDK:
+            self.sim_world = None
 
     def load_scenario(self, scenario_spec_path: str) -> None:
         self.scenario_spec = json.loads(open(scenario_spec_path).read())
+        self.configure_connection(**self.scenario_spec.get("connection", {}))
+        self.configure_commands(**self.scenario_spec.get("commands", {}))
+        if self.scenario_spec.get("mavsdk_server_pool"):
+            self.enable_mavsdk_server_pool(**self.scenario_spec["mavsdk_server_pool"])
+        if self.scenario_spec.get("backend") == BACKEND_SIM or "sim" in self.scenario_spec:
+            self.enable_sim_backend(**self.scenario_spec.get("sim", {}))
+        if "separation" in self.scenario_spec:
+            self.enable_separation_monitor(**self.scenario_spec["separation"])
+        if "metrics" in self.scenario_spec:
+            self.enable_metrics(**self.scenario_spec["metrics"])
+        if "tracing" in self.scenario_spec:
+            self.enable_tracing(**self.scenario_spec["tracing"])
         if self.scenario_spec.get("drones"):
             for drone_spec in self.scenario_spec["drones"]:
                 drone = Drone(
@@ -34,86 +110,478 @@ class SwarmController:
                 )
                 self.add_drone(drone)
 
+    def configure_connection(
+        self,
+        max_concurrency: int | None = None,
+        max_attempts: int | None = None,
+        backoff_base_sec: float | None = None,
+        backoff_max_sec: float | None = None,
+        server_timeout_sec: float | None = None,
+        connect_timeout_sec: float | None = None,
+        discovery_timeout_sec: float | None = None,
+        health_timeout_sec: float | None = None,
+        wait_for_health: bool | None = None,
+    ) -> None:
+        # Only the given settings are changed
+        pipeline = self.connection_pipeline
+        if max_concurrency is not None:
+            pipeline.max_concurrency = max_concurrency
+        if max_attempts is not None:
+            pipeline.max_attempts = max_attempts
+        if backoff_base_sec is not None:
+            pipeline.backoff_base_sec = backoff_base_sec
+        if backoff_max_sec is not None:
+            pipeline.backoff_max_sec = backoff_max_sec
+        if server_timeout_sec is not None:
+            self.server_timeout_sec = server_timeout_sec
+        if connect_timeout_sec is not None:
+            self.connect_timeout_sec = connect_timeout_sec
+        if discovery_timeout_sec is not None:
+            self.discovery_timeout_sec = discovery_timeout_sec
+        if health_timeout_sec is not None:
+            self.health_timeout_sec = health_timeout_sec
+        if wait_for_health is not None:
+            self.wait_for_health = wait_for_health
+
+    def configure_commands(
+        self, timeout_sec: float | None = None, max_concurrency: int | None = None
+    ) -> None:
+        # Only the given settings are changed; max_concurrency 0 lifts the cap
+        if timeout_sec is not None:
+            self.command_timeout_sec = timeout_sec
+        if max_concurrency is not None:
+            self.command_max_concurrency = max_concurrency or None
+
+    def enable_mavsdk_server_pool(
+        self,
+        max_servers: int = 16,
+        base_port: int = 50051,
+        prestart: bool = True,
+        external_servers: List[dict] | None = None,
+    ) -> MavsdkServerPool:
+        # external_servers: [{"drone_id": ..., "address": ..., "port": ...}] for
+        # mavsdk_server instances managed outside this application
+        self.mavsdk_server_pool = MavsdkServerPool(
+            max_servers=max_servers, base_port=base_port
+        )
+        for server in external_servers or []:
+            self.mavsdk_server_pool.add_external(
+                server["drone_id"], server.get("address", "localhost"), server["port"]
+            )
+        self._prestart_pending = prestart
+        return self.mavsdk_server_pool
+
+    def enable_sim_backend(
+        self,
+        rate_hz: float = 20.0,
+        home_lat: float | None = None,
+        home_lon: float | None = None,
+        home_alt: float = 0.0,
+        spacing_m: float = 5.0,
+    ) -> SimWorld:
+        # Drones get homes on a grid of spacing_m starting at home_lat/home_lon,
+        # which default to the scenario's map center
+        center = self.scenario_spec.get("center_view_coordinates", {})
+        home_lat = home_lat if home_lat is not None else center.get("lat", 0.0)
+        home_lon = home_lon if home_lon is not None else center.get("lon", 0.0)
+        self.sim_home = (home_lat, home_lon, home_alt)
+        self.sim_spacing_m = spacing_m
+        self.sim_world = SimWorld(rate_hz=rate_hz)
+        return self.sim_world
+
+    def enable_separation_monitor(self, **monitor_options) -> SeparationMonitor:
+        # Check separation on every telemetry tick, see SeparationMonitor for options
+        self.disable_separation_monitor()
+        self.separation_monitor = SeparationMonitor(self, **monitor_options)
+        self.separation_monitor.start()
+        return self.separation_monitor
+
+    def disable_separation_monitor(self) -> None:
+        if self.separation_monitor is not None:
+            self.separation_monitor.stop()
+            self.separation_monitor = None
+
+    def enable_metrics(self, **metrics_options) -> SwarmMetrics:
+        # see SwarmMetrics for options, e.g. port to serve them over HTTP
+        self.disable_metrics()
+        self.metrics = SwarmMetrics(self, **metrics_options)
+        self.demo_controller.metrics = self.metrics
+        self.metrics.start()
+        return self.metrics
+
+    def disable_metrics(self) -> None:
+        if self.metrics is not None:
+            self.metrics.stop()
+            self.metrics = None
+            self.demo_controller.metrics = None
+
+    def enable_tracing(self, capacity: int = 100_000) -> tracing.Tracer:
+        """Record mission steps, MAVSDK calls and telemetry reads as spans.
+
+        Tracing is process-wide, see utils.tracing; write the spans out with
+        write_trace(). Drones connected before this are traced from now on.
+        """
+        tracer = tracing.enable(capacity)
+        for drone in self.get_all_drones():
+            system = drone.mavsdk_system
+            if system is not None and not isinstance(system, tracing.TracedSystem):
+                # swapped in place, the drone's telemetry hub keeps the unwrapped system
+                drone.mavsdk_system = self._traced_system(drone, system)
+        return tracer
+
+    def disable_tracing(self) -> tracing.Tracer | None:
+        return tracing.disable()
+
+    def write_trace(self, path: str) -> bool:
+        tracer = tracing.get_tracer()
+        if tracer is None:
+            logger.warning(f"Tracing is not enabled, not writing {path}")
+            return False
+        tracer.write_chrome_trace(path)
+        return True
+
+    def _traced_system(self, drone: Drone, system) -> tracing.TracedSystem:
+        return tracing.TracedSystem(
+            system, drone.drone_id, lambda: self.demo_controller.trace_args(drone)
+        )
+
+    async def hold_drone(self, drone: Drone) -> bool:
+        # Stop the drone where it is; a running mission stays paused until resumed
+        if drone.mavsdk_system is None:
+            return False
+        try:
+            await drone.mavsdk_system.action.hold()
+        except Exception as e:
+            logger.error(f"{drone.drone_id}: hold failed: {e}")
+            return False
+        logger.warning(f"{drone.drone_id}: holding position")
+        return True
+
+    def select_drones(
+        self,
+        drone_ids: List[str] | None = None,
+        role: str | None = None,
+        status: DroneStatus | DemoDroneStatus | None = None,
+    ) -> List[Drone]:
+        """Drones matching all of the given criteria; none given selects every drone.
+
+        status is either a connection status (DroneStatus) or a mission status
+        (DemoDroneStatus). Unknown drone ids are skipped with a warning.
+        """
+        if drone_ids is not None:
+            drones = []
+            for drone_id in drone_ids:
+                drone = self.get_drone_by_id(drone_id)
+                if drone is None:
+                    logger.warning(f"No drone {drone_id} to select")
+                else:
+                    drones.append(drone)
+        elif role is not None:
+            drones = self.get_drones_by_role(role)
+        elif isinstance(status, DroneStatus):
+            drones = self.get_drones_by_status(status)
+        else:
+            drones = self.get_all_drones()
+        if role is not None:
+            drones = [d for d in drones if d.role == role]
+        if isinstance(status, DroneStatus):
+            drones = [d for d in drones if d.status == status]
+        elif status is not None:
+            drones = [d for d in drones if self.demo_controller.get_drone_status(d) == status]
+        return drones
+
+    async def command_drones(
+        self,
+        action: ActionSpec,
+        *args,
+        drone_ids: List[str] | None = None,
+        role: str | None = None,
+        status: DroneStatus | DemoDroneStatus | None = None,
+        timeout_sec: float | None = None,
+        max_concurrency: int | None = None,
+        **kwargs,
+    ) -> CommandReport:
+        """Send one action to the selected drones at once, see select_drones().
+
+        E.g. command_drones("arm", role="SURVEILLANCE") or
+        command_drones("set_current_speed", 8.0, status=DroneStatus.CONNECTED).
+        timeout_sec applies to each drone; it and max_concurrency default to the
+        command settings. Returns a CommandReport with each drone's result and latency.
+        """
+        drones = self.select_drones(drone_ids, role, status)
+        return await dispatch_command(
+            drones,
+            action,
+            args,
+            kwargs,
+            timeout_sec if timeout_sec is not None else self.command_timeout_sec,
+            max_concurrency if max_concurrency is not None else self.command_max_concurrency,
+            self._observe_command,
+        )
+
+    async def emergency_return_to_launch(self) -> CommandReport:
+        return await self._emergency_command("return_to_launch")
+
+    async def emergency_hold(self) -> CommandReport:
+        return await self._emergency_command("hold")
+
+    async def _emergency_command(self, action: str) -> CommandReport:
+        await self.abort_missions()
+        # every connected drone, uncapped, so no drone waits behind another
+        drones = [d for d in self.get_all_drones() if d.mavsdk_system is not None]
+        logger.warning(f"Emergency {action} for {len(drones)} drones")
+        report = await dispatch_command(
+            drones, action, (), None, self.command_timeout_sec, None, self._observe_command
+        )
+        logger.warning(report.summary())
+        return report
+
+    async def abort_missions(self, timeout_sec: float = 1.0) -> None:
+        """Cancel the mission tasks of a running deploy_swarm.
+
+        Waits up to timeout_sec for them to finish, so no mission step (a goto, an
+        orbit) is sent after a command that should override it.
+        """
+        tasks = [task for task in self.mission_tasks if not task.done()]
+        if not tasks:
+            return
+        logger.warning(f"Aborting {len(tasks)} mission tasks")
+        self._missions_aborted = True
+        for task in tasks:
+            task.cancel()
+        await asyncio.wait(tasks, timeout=timeout_sec)
+
+    def _observe_command(self, action: str, result) -> None:
+        if self.metrics is not None:
+            self.metrics.observe_command(action, result.latency_sec, not result.ok)
+
+    def prestart_mavsdk_servers(self) -> asyncio.Task | None:
+        # Must be called with a running event loop; connect_drones does so if needed
+        self._prestart_pending = False
+        if self.mavsdk_server_pool is None:
+            return None
+        return self.mavsdk_server_pool.prestart(
+            self.registry.by_status(DroneStatus.DISCONNECTED)
+        )
+
     def add_drone(self, drone: Drone) -> Drone:
-        if drone.drone_id in self.drones:
+        if not self.registry.add(drone):
             logger.error(f"Drone with ID {drone.drone_id} already exists! Skipping.")
             return None
-        self.drones[drone.drone_id] = drone
+        if self.recorder is not None:
+            self.recorder.attach(drone)
+        for subscription in self.state_subscriptions:
+            drone.add_state_subscription(subscription)
+        return drone
+
+    def remove_drone(self, drone_id: str) -> Drone:
+        # the registry frees the drone's slot, and with it its mavsdk_server port, for
+        # the next drone added; disconnect first so nothing is left running on it
+        drone = self.get_drone_by_id(drone_id)
+        if drone is not None and drone.mavsdk_system is not None:
+            drone_system = drone.mavsdk_system
+            drone.set_mavsdk_system(None)
+            self._discard_system(drone_system)
+        if drone is not None and drone.status != DroneStatus.DISCONNECTED:
+            drone.set_status(DroneStatus.DISCONNECTED)
+        drone = self.registry.remove(drone_id)
+        if drone is not None:
+            drone.stop_periodic_state_update()
+            if self.sim_world is not None:
+                self.sim_world.remove_vehicle(drone_id)
+            if self.recorder is not None:
+                self.recorder.detach(drone)
+            for subscription in self.state_subscriptions:
+                drone.unsubscribe_state(subscription)
         return drone
 
+    def start_recording(self, directory: str, **recorder_options) -> TelemetryRecorder:
+        # Record every drone's state and status changes until stop_recording()
+        self.stop_recording()
+        self.recorder = TelemetryRecorder(directory, **recorder_options)
+        self.recorder.attach_all(self.get_all_drones())
+        return self.recorder
+
+    def stop_recording(self) -> None:
+        if self.recorder is None:
+            return
+        for drone in self.get_all_drones():
+            self.recorder.detach(drone)
+        self.recorder.close()
+        self.recorder = None
+
+    def subscribe_state(self, callback_fn, **options) -> StateSubscription:
+        """Subscribe to state changes of every drone, see StateSubscription for options.
+
+        E.g. subscribe_state(fn, batched=True, min_interval_sec=0.1) calls fn with the
+        list of drones that changed, at most ten times a second.
+        """
+        subscription = StateSubscription(callback_fn, **options)
+        self.state_subscriptions.append(subscription)
+        for drone in self.get_all_drones():
+            drone.add_state_subscription(subscription)
+        return subscription
+
+    def unsubscribe_state(self, subscription: StateSubscription) -> None:
+        if subscription in self.state_subscriptions:
+            self.state_subscriptions.remove(subscription)
+        for drone in self.get_all_drones():
+            drone.unsubscribe_state(subscription)
+        subscription.cancel()
+
+    def state_subscription_stats(self) -> Dict[str, SubscriptionStats]:
+        # per subscriber name, summed over drones and subscriptions sharing the name
+        stats: Dict[str, SubscriptionStats] = {}
+        seen = set()
+        for drone in self.get_all_drones():
+            for subscription in drone.state_subscriptions:
+                if id(subscription) in seen:
+                    continue
+                seen.add(id(subscription))
+                total = stats.setdefault(subscription.name, SubscriptionStats())
+                total.delivered += subscription.stats.delivered
+                total.skipped += subscription.stats.skipped
+                total.errors += subscription.stats.errors
+                total.dispatch_sec_total += subscription.stats.dispatch_sec_total
+                total.dispatch_sec_max = max(
+                    total.dispatch_sec_max, subscription.stats.dispatch_sec_max
+                )
+        return stats
+
     def get_drone_by_id(self, drone_id: str) -> Drone:
-        for drone in self.drones.values():
-            if drone.drone_id == drone_id:
-                return drone
-        return None
+        return self.registry.get(drone_id)
 
     def get_drone_index(self, drone: Drone) -> int:
-        for index, d in enumerate(self.drones.values()):
-            if d == drone:
-                return index
-        return -1
+        return self.registry.index_of(drone)
+
+    def state_arrays(self) -> StateArrays:
+        # zero-copy views of every drone's state, indexed by get_drone_index(drone)
+        return self.registry.arrays()
 
     def get_all_drones(self) -> List[Drone]:
-        return list(self.drones.values())
+        return self.registry.all()
+
+    def get_drones_by_role(self, role: str) -> List[Drone]:
+        return self.registry.by_role(role)
+
+    def get_drones_by_status(self, status: DroneStatus) -> List[Drone]:
+        return self.registry.by_status(status)
+
+    async def role_barrier(
+        self,
+        drone: Drone,
+        status,
+        role: str | None = None,
+        timeout_sec: float | None = None,
+    ) -> None:
+        # Set drone's mission status and wait for every drone of its role (or the
+        # given role) to reach it too
+        group = self.get_drones_by_role(role if role is not None else drone.role)
+        await self.demo_controller.status_board.barrier(drone, status, group, timeout_sec)
 
-    def connect_drones_by_ids(self, drone_ids: List[str]) -> None:
-        for drone_id in drone_ids:
-            asyncio.create_task(self.connect_drone(self.drones[drone_id]))
+    def connect_drones_by_ids(self, drone_ids: List[str]) -> asyncio.Task:
+        drones = [self.registry.get(drone_id) for drone_id in drone_ids]
+        return asyncio.create_task(self.connect_drones(drones))
 
-    def connect_all_drones(self) -> None:
-        for drone in self.drones.values():
-            if drone.status == DroneStatus.DISCONNECTED:
-                try:
-                    asyncio.create_task(self.connect_drone(drone))
-                except Exception as e:
-                    logger.error(f"Failed to connect to drone {drone.drone_id}: {e}")
+    def connect_all_drones(self) -> asyncio.Task:
+        drones = self.registry.by_status(DroneStatus.DISCONNECTED)
+        return asyncio.create_task(self.connect_drones(drones))
+
+    async def connect_drones(self, drones: List[Drone]) -> ConnectionReport:
+        if self._prestart_pending:
+            self.prestart_mavsdk_servers()
+        # connect through the pipeline so failures are retried and reported
+        report = await self.connection_pipeline.run(drones)
+        self.last_connection_report = report
+        if report.failed:
+            logger.error(report.summary())
+        else:
+            logger.info(report.summary())
+        return report
 
     async def connect_drone(
-        self, drone: Drone, initialize_state: bool = True
-    ) -> System:
+        self,
+        drone: Drone,
+        initialize_state: bool = True,
+        phase_timings: Dict[str, float] | None = None,
+    ) -> System | SimulatedSystem:
+        # phase_timings, if given, is filled with the seconds spent in each phase
+        phase_timings = phase_timings if phase_timings is not None else {}
         drone.set_status(DroneStatus.CONNECTING)
 
-        # as seen at https://discuss.px4.io/t/mavsdk-multiple-drones-problem/44693/2
-        # so I believe port 50051 is just a random starting port so that each System instance
-        # uses a different port to avoid conflicts
-        drone_system = System(port=50051 + self.get_drone_index(drone))
         system_address = drone.connection_url
         drone_name = drone.drone_id
 
+        drone_system = None
         try:
-            await asyncio.wait_for(
-                drone_system.connect(system_address=system_address), timeout=3
-            )
-            logger.debug(f"Awaiting connection to {drone_name} at {system_address}")
-        except asyncio.TimeoutError:
-            logger.error(f"Error connecting to {drone_name} at {system_address}!")
-            logger.error(f"{drone_name} connection failed!")
-            drone.set_status(DroneStatus.DISCONNECTED)
-            raise Exception(f"Error connecting to {drone_name}.")
-        logger.debug(f"Connection await complete to {drone_name}.")
-
-        async for state in drone_system.core.connection_state():
-            logger.debug(f"Connection state for {drone_name}:")
-            logger.debug(f"{state=}")
-            if state.is_connected:
-                logger.debug(f"Drone {drone_name} discovered!")
-                break
+            if self.sim_world is not None:
+                drone_system = self._create_sim_system(drone)
+            elif self.mavsdk_server_pool is not None:
+                server = await self._run_phase(
+                    drone,
+                    PHASE_MAVSDK_SERVER,
+                    self.mavsdk_server_pool.acquire(drone),
+                    self.server_timeout_sec,
+                    phase_timings,
+                )
+                drone_system = System(
+                    mavsdk_server_address=server.address, port=server.port
+                )
             else:
-                logger.error(f"Error awaiting connection state for {drone_name}!")
-                logger.error(f"{drone_name} connection failed!")
-                drone.set_status(DroneStatus.DISCONNECTED)
-                raise Exception(f"Error connecting to {drone_name}.")
-        logger.debug(f"Connection state for drone {drone_name} complete.")
-
-        logger.debug(
-            f"Waiting for drone {drone_name} to have a global position estimate..."
-        )
-        async for health in drone_system.telemetry.health():
-            if health.is_global_position_ok and health.is_home_position_ok:
+                # each drone keeps the gRPC port leased to it by the registry
+                drone_system = System(port=self.registry.port_of(drone))
+
+            logger.debug(f"Awaiting connection to {drone_name} at {system_address}")
+            await self._run_phase(
+                drone,
+                PHASE_GRPC_CONNECT,
+                drone_system.connect(system_address=system_address),
+                self.connect_timeout_sec,
+                phase_timings,
+            )
+            logger.debug(f"Connection await complete to {drone_name}.")
+
+            await self._run_phase(
+                drone,
+                PHASE_DISCOVERY,
+                _first_matching(
+                    drone_system.core.connection_state(),
+                    lambda state: state.is_connected,
+                ),
+                self.discovery_timeout_sec,
+                phase_timings,
+            )
+            logger.debug(f"Drone {drone_name} discovered!")
+
+            if self.wait_for_health:
+                logger.debug(
+                    f"Waiting for drone {drone_name} to have a global position estimate..."
+                )
+                await self._run_phase(
+                    drone,
+                    PHASE_HEALTH,
+                    _first_matching(
+                        drone_system.telemetry.health(),
+                        lambda health: health.is_global_position_ok
+                        and health.is_home_position_ok,
+                    ),
+                    self.health_timeout_sec,
+                    phase_timings,
+                )
                 logger.debug(f"-- Global position estimate OK for drone {drone_name}")
-                break
+        except DroneConnectionError as e:
+            logger.error(f"{drone_name} connection failed! {e}")
+            self._discard_system(drone_system)
+            drone.set_status(DroneStatus.DISCONNECTED)
+            raise
+        except asyncio.CancelledError:
+            self._discard_system(drone_system)
+            drone.set_status(DroneStatus.DISCONNECTED)
+            raise
 
-        drone.mavsdk_system = drone_system
+        if tracing.get_tracer() is not None:
+            drone_system = self._traced_system(drone, drone_system)
+        drone.set_mavsdk_system(drone_system)
         drone.set_status(DroneStatus.CONNECTED)
 
         if initialize_state:
@@ -122,6 +590,74 @@ class SwarmController:
 
         return drone_system
 
+    def _discard_system(self, drone_system: System | SimulatedSystem | None) -> None:
+        # A System that spawned its own mavsdk_server must stop it, or the next System
+        # on that port (a retry, or a drone added in a removed one's slot) finds the
+        # gRPC port still bound and the server process leaks.
+        # Pooled servers are shared and stay with the pool.
+        if isinstance(drone_system, System) and self.mavsdk_server_pool is None:
+            process = getattr(drone_system, "_server_process", None)
+            try:
+                drone_system._stop_mavsdk_server()
+                if process is not None:
+                    process.wait(timeout=1.0)  # reap it, it was killed
+            except Exception as e:
+                logger.warning(f"Could not stop a discarded System's mavsdk_server: {e}")
+
+    def _create_sim_system(self, drone: Drone) -> SimulatedSystem:
+        # a reconnecting drone keeps its simulated vehicle, and with it its position
+        vehicle = self.sim_world.vehicles.get(drone.drone_id)
+        if vehicle is None:
+            home_lat, home_lon, home_alt = self.sim_home
+            index = max(self.registry.index_of(drone), 0)
+            home_lat, home_lon = offset_latlon(
+                home_lat,
+                home_lon,
+                (index % 10) * self.sim_spacing_m,
+                (index // 10) * self.sim_spacing_m,
+            )
+            vehicle = self.sim_world.add_vehicle(
+                SimVehicle(drone.drone_id, home_lat, home_lon, home_alt)
+            )
+        return SimulatedSystem(self.sim_world, vehicle)
+
+    async def _run_phase(
+        self,
+        drone: Drone,
+        phase: str,
+        awaitable,
+        timeout_sec: float | None,
+        phase_timings: Dict[str, float],
+    ):
+        # the phase is timed whether it succeeds or fails
+        start = time.monotonic()
+        start_ns = time.perf_counter_ns()
+        failed = True
+        try:
+            result = await asyncio.wait_for(awaitable, timeout=timeout_sec)
+            failed = False
+            return result
+        except asyncio.TimeoutError:
+            raise DroneConnectionError(
+                drone.drone_id, phase, f"timed out after {timeout_sec} s"
+            )
+        except Exception as e:
+            raise DroneConnectionError(drone.drone_id, phase, str(e)) from e
+        finally:
+            phase_timings[phase] = time.monotonic() - start
+            if self.metrics is not None:
+                self.metrics.observe_connect_phase(phase, phase_timings[phase], failed)
+            tracer = tracing.get_tracer()
+            if tracer is not None:
+                tracer.record(
+                    f"connect.{phase}",
+                    "connect",
+                    drone.drone_id,
+                    start_ns,
+                    time.perf_counter_ns(),
+                    {"drone": drone.drone_id, "failed": failed},
+                )
+
     async def deploy_swarm(self) -> None:
         # run demo
 
@@ -145,9 +681,28 @@ class SwarmController:
             self.demo_controller.xlab550_mission(drone=xlab550)
         )
 
-        await asyncio.gather(
+        self.mission_tasks = [
             drone_x500_mission_task,
             drone_x3_mission_task,
             drone_lipan_mission_task,
             drone_xlab550_mission_task,
-        )
+        ]
+        self._missions_aborted = False
+        try:
+            await asyncio.gather(*self.mission_tasks)
+        except asyncio.CancelledError:
+            # cancelled missions end the deployment; cancelling deploy_swarm itself
+            # still propagates
+            if not self._missions_aborted:
+                raise
+            logger.warning("Missions aborted")
+        finally:
+            self.mission_tasks = []
+
+
+async def _first_matching(stream, predicate):
+    # Consume an async telemetry stream until an item satisfies predicate
+    async for item in stream:
+        if predicate(item):
+            return item
+    raise Exception("stream ended")
@@ -0,0 +1,306 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from model.drone import DroneStatus
+from utils.metrics import LoopLagMonitor, MetricFamily, MetricsRegistry, MetricsServer
+
+logger = logging.getLogger(__name__)
+
+# drone_goto steps: reading the current state, sending the goto, flying to arrival
+GOTO_STEPS = ("read_state", "command", "flight")
+
+# telemetry sample rates are averaged over at least this long
+RATE_WINDOW_SEC = 1.0
+
+
+class SwarmMetrics(object):
+    """Performance metrics of a SwarmController.
+
+    Covers per-drone telemetry sample rates and ages, drone_goto step durations and
+    arrival latency, state callback dispatch time, event loop lag and connection
+    phase timings. Hot paths only update a histogram; values that are kept anyway
+    (telemetry sample times, StateSubscription stats) are read when the metrics are
+    scraped. With a port they are served in the Prometheus text format at
+    http://host:port/metrics (port 0 picks a free one).
+
+    The loop lag monitor must be started from the controller's loop, see
+    start_loop_monitor(). telemetry_stats() is also called by the HTTP server's
+    thread; the GUI reads summary() on the controller thread when it has one.
+    """
+
+    def __init__(
+        self,
+        controller,
+        port: int | None = None,
+        host: str = "127.0.0.1",
+        loop_lag_interval_sec: float = 0.25,
+    ):
+        self.controller = controller
+        self.registry = MetricsRegistry()
+        registry = self.registry
+        self.loop_lag = registry.histogram(
+            "swarm_event_loop_lag_seconds",
+            "How much later than asked the controller's event loop woke from a sleep",
+        ).labels()
+        goto_steps = registry.histogram(
+            "swarm_goto_step_seconds", "Duration of the steps of drone_goto", ("step",)
+        )
+        self.goto_steps = {step: goto_steps.labels(step) for step in GOTO_STEPS}
+        self.goto_arrival_latency = registry.histogram(
+            "swarm_goto_arrival_latency_seconds",
+            "From the telemetry sample that completed a drone_goto to drone_goto returning",
+        ).labels()
+        self.goto_timeouts = registry.counter(
+            "swarm_goto_timeouts_total", "drone_goto calls that timed out"
+        ).labels()
+        self.goto_arrival_checks = registry.counter(
+            "swarm_goto_arrival_checks_total",
+            "Arrival checks made by drone_goto; samples before the next is due are skipped",
+        ).labels()
+        self.connect_phases = registry.histogram(
+            "swarm_connect_phase_seconds",
+            "Duration of the phases of connect_drone, failed attempts included",
+            ("phase",),
+        )
+        self.connect_failures = registry.counter(
+            "swarm_connect_failures_total", "Failed connection attempts by phase", ("phase",)
+        )
+        self.command_latency = registry.histogram(
+            "swarm_command_seconds",
+            "Per-drone latency of fan-out commands, failed ones included",
+            ("action",),
+        )
+        self.command_failures = registry.counter(
+            "swarm_command_failures_total", "Fan-out commands that failed per drone", ("action",)
+        )
+        registry.add_collector(self._collect_drones)
+        registry.add_collector(self._collect_telemetry)
+        registry.add_collector(self._collect_state_dispatch)
+
+        self.loop_monitor = LoopLagMonitor(self.loop_lag, loop_lag_interval_sec)
+        self.server = MetricsServer(registry, host, port) if port is not None else None
+        # (drone_id, stream) -> (time, sample count, rate) at the start of the window
+        self._rates: Dict[Tuple[str, str], Tuple[float, int, float]] = {}
+        self._rates_lock = threading.Lock()  # scrapes come from the server's thread
+
+    def start(self) -> None:
+        if self.server is not None:
+            self.server.start()
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # the app calls start_loop_monitor() once its loop runs
+        self.start_loop_monitor()
+
+    def start_loop_monitor(self) -> None:
+        # must run on the loop the controller runs on
+        self.loop_monitor.start()
+
+    def stop(self) -> None:
+        self.loop_monitor.stop()
+        if self.server is not None:
+            self.server.stop()
+
+    def render(self) -> str:
+        return self.registry.render()
+
+    def observe_goto(
+        self,
+        read_state_sec: float,
+        command_sec: float,
+        flight_sec: float,
+        arrival_latency_sec: float,
+    ) -> None:
+        self.goto_steps["read_state"].observe(read_state_sec)
+        self.goto_steps["command"].observe(command_sec)
+        self.goto_steps["flight"].observe(flight_sec)
+        self.goto_arrival_latency.observe(arrival_latency_sec)
+
+    def observe_connect_phase(self, phase: str, seconds: float, failed: bool) -> None:
+        self.connect_phases.labels(phase).observe(seconds)
+        if failed:
+            self.connect_failures.labels(phase).inc()
+
+    def observe_command(self, action: str, seconds: float, failed: bool) -> None:
+        self.command_latency.labels(action).observe(seconds)
+        if failed:
+            self.command_failures.labels(action).inc()
+
+    def telemetry_stats(self) -> Dict[Tuple[str, str], Tuple[int, float, float]]:
+        """(drone_id, stream) -> (samples received, samples per second, age in seconds).
+
+        Rates are over the time since the previous window, at least RATE_WINDOW_SEC,
+        the first one since the telemetry started. NaN until there is a window.
+        """
+        with self._rates_lock:
+            now = time.monotonic()
+            stats = {}
+            rates = {}
+            for drone in self.controller.get_all_drones():
+                telemetry = drone.telemetry
+                if telemetry is None:
+                    continue
+                for stream, count in list(telemetry.sample_counts.items()):
+                    key = (drone.drone_id, stream)
+                    window = self._rates.get(key, (telemetry.started_at, 0, math.nan))
+                    if now - window[0] >= RATE_WINDOW_SEC:
+                        window = (now, count, (count - window[1]) / (now - window[0]))
+                    rates[key] = window
+                    sample = telemetry.latest(stream)
+                    age = now - sample.timestamp if sample is not None else math.nan
+                    stats[key] = (count, window[2], age)
+            self._rates = rates
+            return stats
+
+    def summary(self) -> List[Tuple[str, str]]:
+        """(name, value) rows for a human, e.g. the GUI's stats panel."""
+        rows = []
+        registry = self.controller.registry
+        statuses = [
+            f"{registry.count_by_status(status)} {status.name}"
+            for status in DroneStatus
+            if registry.count_by_status(status)
+        ]
+        rows.append(("Drones", ", ".join(statuses) or "none"))
+
+        by_stream: Dict[str, List[Tuple[float, float]]] = {}
+        for (_, stream), (_, rate, age) in self.telemetry_stats().items():
+            by_stream.setdefault(stream, []).append((rate, age))
+        for stream, values in sorted(by_stream.items()):
+            rates = [rate for rate, _ in values if not math.isnan(rate)]
+            ages = [age for _, age in values if not math.isnan(age)]
+            text = (
+                f"{sum(rates) / len(rates):.1f} Hz mean, {min(rates):.1f} Hz min"
+                if rates
+                else "rate pending"
+            )
+            if ages:
+                text += f", oldest {max(ages):.2f} s"
+            rows.append((f"Telemetry {stream}", text))
+
+        lag = self.loop_lag
+        if lag.count:
+            rows.append(
+                (
+                    "Event loop lag",
+                    f"{self.loop_monitor.last_lag_sec * 1000:.1f} ms now, "
+                    f"p99 <= {lag.quantile(0.99) * 1000:.1f} ms, "
+                    f"max {self.loop_monitor.max_lag_sec * 1000:.1f} ms",
+                )
+            )
+
+        flight = self.goto_steps["flight"]
+        if flight.count:
+            rows.append(
+                (
+                    "drone_goto",
+                    f"{flight.count} done, {self.goto_timeouts.value:.0f} timed out, "
+                    f"flight {flight.mean:.1f} s mean, "
+                    f"{self.goto_arrival_checks.value / flight.count:.0f} arrival checks mean",
+                )
+            )
+            rows.append(
+                (
+                    "drone_goto steps",
+                    f"read state {self.goto_steps['read_state'].mean * 1000:.1f} ms, "
+                    f"command {self.goto_steps['command'].mean * 1000:.1f} ms, "
+                    f"arrival latency {self.goto_arrival_latency.mean * 1000:.1f} ms mean",
+                )
+            )
+
+        for (phase,), histogram in list(self.connect_phases.children.items()):
+            failures = self.connect_failures.children.get((phase,))
+            rows.append(
+                (
+                    f"Connect {phase}",
+                    f"{histogram.mean:.2f} s mean over {histogram.count}, "
+                    f"{failures.value if failures else 0:.0f} failed",
+                )
+            )
+
+        for (action,), histogram in list(self.command_latency.children.items()):
+            failures = self.command_failures.children.get((action,))
+            rows.append(
+                (
+                    f"Command {action}",
+                    f"{histogram.mean * 1000:.1f} ms mean over {histogram.count}, "
+                    f"{failures.value if failures else 0:.0f} failed",
+                )
+            )
+
+        for name, stats in sorted(self.controller.state_subscription_stats().items()):
+            rows.append(
+                (
+                    f"State callbacks {name}",
+                    f"{stats.mean_dispatch_sec * 1e6:.1f} us mean, "
+                    f"{stats.dispatch_sec_max * 1e6:.0f} us max, {stats.delivered} calls",
+                )
+            )
+        return rows
+
+    def _collect_drones(self) -> List[MetricFamily]:
+        drones = MetricFamily("swarm_drones", "gauge", "Drones by status", ("status",))
+        for status in DroneStatus:
+            drones.labels(status.name).set(self.controller.registry.count_by_status(status))
+        return [drones]
+
+    def _collect_telemetry(self) -> List[MetricFamily]:
+        labelnames = ("drone", "stream")
+        samples = MetricFamily(
+            "swarm_telemetry_samples_total", "counter", "Telemetry samples received", labelnames
+        )
+        rates = MetricFamily(
+            "swarm_telemetry_sample_rate_hz",
+            "gauge",
+            f"Telemetry samples per second, over at least {RATE_WINDOW_SEC} s",
+            labelnames,
+        )
+        ages = MetricFamily(
+            "swarm_telemetry_sample_age_seconds",
+            "gauge",
+            "Time since the latest telemetry sample",
+            labelnames,
+        )
+        for key, (count, rate, age) in self.telemetry_stats().items():
+            samples.labels(*key).inc(count)
+            rates.labels(*key).set(rate)
+            ages.labels(*key).set(age)
+        return [samples, rates, ages]
+
+    def _collect_state_dispatch(self) -> List[MetricFamily]:
+        labelnames = ("subscriber",)
+        delivered = MetricFamily(
+            "swarm_state_callbacks_total", "counter", "State subscriber calls", labelnames
+        )
+        skipped = MetricFamily(
+            "swarm_state_skipped_total",
+            "counter",
+            "State updates filtered out by subscriber interval or thresholds",
+            labelnames,
+        )
+        errors = MetricFamily(
+            "swarm_state_callback_errors_total", "counter", "State subscriber failures", labelnames
+        )
+        dispatch = MetricFamily(
+            "swarm_state_dispatch_seconds_total",
+            "counter",
+            "Time spent in state subscriber callbacks from Drone.set_state",
+            labelnames,
+        )
+        dispatch_max = MetricFamily(
+            "swarm_state_dispatch_seconds_max",
+            "gauge",
+            "Longest state subscriber callback",
+            labelnames,
+        )
+        for name, stats in self.controller.state_subscription_stats().items():
+            delivered.labels(name).inc(stats.delivered)
+            skipped.labels(name).inc(stats.skipped)
+            errors.labels(name).inc(stats.errors)
+            dispatch.labels(name).inc(stats.dispatch_sec_total)
+            dispatch_max.labels(name).set(stats.dispatch_sec_max)
+        return [delivered, skipped, errors, dispatch, dispatch_max]
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+from model.drone import Drone
+
+
+def _drone_id(drone: Drone | str) -> str:
+    return drone if isinstance(drone, str) else drone.drone_id
+
+
+class StatusBoard(object):
+    """Mission status of every drone, with waits that only wake when satisfied.
+
+    Each pending wait is a future keyed by (drone id, status); set() resolves only the
+    future for the status that was just reached, so a change costs O(1) however many
+    drones and waiters there are. Drones may be passed as Drone objects or by id, so a
+    mission can wait on a drone it holds no reference to.
+    """
+
+    def __init__(self):
+        self._status: Dict[str, Hashable] = {}
+        self._reached: Dict[str, Set[Hashable]] = {}  # every status each drone has had
+        # (drone id, status) -> shared future, and the number of waits using it
+        self._waiters: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self._waiter_counts: Dict[Tuple[str, Hashable], int] = {}
+
+    def get(self, drone: Drone | str) -> Hashable | None:
+        return self._status.get(_drone_id(drone))
+
+    def has_reached(self, drone: Drone | str, status: Hashable) -> bool:
+        return status in self._reached.get(_drone_id(drone), ())
+
+    def set(self, drone: Drone | str, status: Hashable) -> None:
+        drone_id = _drone_id(drone)
+        self._status[drone_id] = status
+        self._reached.setdefault(drone_id, set()).add(status)
+        self._waiter_counts.pop((drone_id, status), None)
+        future = self._waiters.pop((drone_id, status), None)
+        if future is not None and not future.done():
+            future.set_result(time.monotonic())
+
+    def forget(self, drone: Drone | str) -> None:
+        # waits already pending for the drone stay pending
+        drone_id = _drone_id(drone)
+        self._status.pop(drone_id, None)
+        self._reached.pop(drone_id, None)
+
+    async def wait_for(
+        self,
+        drone: Drone | str,
+        status: Hashable,
+        timeout_sec: float | None = None,
+        include_past: bool = False,
+    ) -> None:
+        """Wait until the drone is at status; return at once if it already is.
+
+        With include_past, having been at status at any earlier time is enough.
+        Raises TimeoutError if timeout_sec is given and exceeded.
+        """
+        drone_id = _drone_id(drone)
+        if self._status.get(drone_id) == status:
+            return
+        if include_past and self.has_reached(drone_id, status):
+            return
+        key = (drone_id, status)
+        future = self._waiters.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[key] = future
+        self._waiter_counts[key] = self._waiter_counts.get(key, 0) + 1
+        try:
+            # waiters share the future; shield it so one timing out doesn't cancel the rest
+            await asyncio.wait_for(asyncio.shield(future), timeout_sec)
+        finally:
+            if not future.done():
+                # timed out or cancelled: drop the future once nobody waits on it
+                self._waiter_counts[key] -= 1
+                if self._waiter_counts[key] == 0:
+                    del self._waiter_counts[key]
+                    del self._waiters[key]
+
+    async def wait_all(
+        self,
+        drones: Iterable[Drone | str],
+        status: Hashable,
+        timeout_sec: float | None = None,
+        include_past: bool = False,
+    ) -> None:
+        await asyncio.wait_for(
+            asyncio.gather(
+                *(self.wait_for(drone, status, include_past=include_past) for drone in drones)
+            ),
+            timeout_sec,
+        )
+
+    async def wait_any(
+        self,
+        drones: Iterable[Drone | str],
+        status: Hashable,
+        timeout_sec: float | None = None,
+        include_past: bool = False,
+    ) -> Drone | str:
+        """Wait until any of the drones is at status and return that drone.
+
+        Raises asyncio.TimeoutError like wait_for, and ValueError without drones.
+        """
+        drones = list(drones)
+        if not drones:
+            raise ValueError(f"wait_any for {status} needs at least one drone")
+        tasks = {
+            asyncio.ensure_future(self.wait_for(drone, status, include_past=include_past)): drone
+            for drone in drones
+        }
+        try:
+            done, _ = await asyncio.wait(
+                tasks, timeout=timeout_sec, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for task in tasks:
+                task.cancel()
+        if not done:
+            raise asyncio.TimeoutError(f"No drone reached {status} within {timeout_sec} s")
+        task = next(iter(done))
+        task.result()  # a wait that failed did not reach the status, raise its error
+        return tasks[task]
+
+    async def barrier(
+        self,
+        drone: Drone | str,
+        status: Hashable,
+        group: Iterable[Drone | str],
+        timeout_sec: float | None = None,
+    ) -> None:
+        """Set drone's status, then wait until every drone of the group has reached it.
+
+        E.g. all drones of a role arriving above the launch site before moving on.
+        Group members that get there and move on before the last one arrives still
+        count, since the barrier includes past statuses.
+        """
+        self.set(drone, status)
+        await self.wait_all(group, status, timeout_sec, include_past=True)
+
+    def pending_waits(self) -> List[Tuple[str, Hashable]]:
+        return list(self._waiters.keys())
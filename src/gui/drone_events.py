@@ -0,0 +1,79 @@
+from typing import Callable, Dict, List
+
+from PySide6.QtCore import QObject, QTimer
+
+from model.drone import Drone
+from model.state_snapshot import SnapshotBuffer
+from utils import tracing
+
+
+class DroneEvents(object):
+    """How widgets subscribe to drone state and status changes.
+
+    This default registers the callbacks on the drones directly, for when the
+    controller shares the GUI thread's event loop.
+    """
+
+    def add_state_change_callback(self, drone: Drone, callback_fn: Callable) -> None:
+        drone.add_state_change_callback(callback_fn)
+
+    def add_status_change_callback(self, drone: Drone, callback_fn: Callable) -> None:
+        drone.add_status_change_callback(callback_fn)
+
+
+class SnapshotDroneEvents(QObject, DroneEvents):
+    """Delivers drone changes made on the controller thread to widgets on the GUI thread.
+
+    The drones write snapshots into a SnapshotBuffer; once per frame the buffer is
+    drained and the widget callbacks are called with the latest DroneSnapshot of each
+    drone that changed. Statuses passed through within one frame are coalesced, only
+    the last one is delivered.
+    """
+
+    FRAME_INTERVAL_MS = 16
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.buffer = SnapshotBuffer()
+        self._state_callbacks: Dict[str, List[Callable]] = {}
+        self._status_callbacks: Dict[str, List[Callable]] = {}
+        self._delivered_status = {}  # drone_id -> last status passed to the widgets
+
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setInterval(self.FRAME_INTERVAL_MS)
+        self._frame_timer.timeout.connect(self.deliver)
+        self._frame_timer.start()
+
+    def add_state_change_callback(self, drone: Drone, callback_fn: Callable) -> None:
+        self._attach(drone)
+        self._state_callbacks[drone.drone_id].append(callback_fn)
+
+    def add_status_change_callback(self, drone: Drone, callback_fn: Callable) -> None:
+        self._attach(drone)
+        self._status_callbacks[drone.drone_id].append(callback_fn)
+
+    def _attach(self, drone: Drone) -> None:
+        # the GUI is built before the controller thread starts, so this is not racing it
+        if drone.drone_id in self._state_callbacks:
+            return
+        self._state_callbacks[drone.drone_id] = []
+        self._status_callbacks[drone.drone_id] = []
+        self._delivered_status[drone.drone_id] = drone.status
+        self.buffer.attach(drone)
+
+    def deliver(self) -> None:
+        snapshots = self.buffer.drain()
+        if not snapshots:
+            return
+        with tracing.span("gui.deliver_snapshots", "gui", snapshots=len(snapshots)):
+            for snapshot in snapshots:
+                drone_id = snapshot.drone_id
+                if snapshot.status != self._delivered_status[drone_id]:
+                    self._delivered_status[drone_id] = snapshot.status
+                    for callback in self._status_callbacks[drone_id]:
+                        callback(snapshot, snapshot.status)
+                for callback in self._state_callbacks[drone_id]:
+                    callback(snapshot)
+
+    def stop(self) -> None:
+        self._frame_timer.stop()
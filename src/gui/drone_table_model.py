@@ -0,0 +1,149 @@
+from typing import Dict, List
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
+
+from controller.swarm_controller import SwarmController
+
+from model.drone import Drone, DroneStatus
+from utils import tracing
+
+from .drone_events import DroneEvents
+
+
+class DroneTableModel(QAbstractTableModel):
+    """Table model over the controller's drones.
+
+    Rows are looked up through an id -> row index, so status and telemetry changes
+    only emit dataChanged for the affected cells. Telemetry columns are refreshed
+    at most every TELEMETRY_REFRESH_MS regardless of the incoming telemetry rate.
+    """
+
+    COLUMNS = ["Vehicle ID", "Role", "Status", "Alt (m)", "Heading (°)", "Speed (m/s)"]
+    ID_COLUMN = 0
+    ROLE_COLUMN = 1
+    STATUS_COLUMN = 2
+    ALT_COLUMN = 3
+    HEADING_COLUMN = 4
+    GROUNDSPEED_COLUMN = 5
+
+    TELEMETRY_REFRESH_MS = 250
+
+    def __init__(
+        self,
+        controller: SwarmController | None = None,
+        parent=None,
+        drone_events: DroneEvents | None = None,
+    ):
+        super().__init__(parent)
+        self.drone_events = drone_events if drone_events is not None else DroneEvents()
+        # the drones, or with a controller thread the latest snapshot of each
+        self._drones: List[Drone] = []
+        self._row_by_id: Dict[str, int] = {}
+
+        self._dirty_telemetry_rows = set()
+        self._telemetry_timer = QTimer(self)
+        self._telemetry_timer.setSingleShot(True)
+        self._telemetry_timer.setInterval(self.TELEMETRY_REFRESH_MS)
+        self._telemetry_timer.timeout.connect(self._flush_telemetry_rows)
+
+        if controller is not None:
+            for drone in controller.get_all_drones():
+                self.add_drone(drone)
+
+    def add_drone(self, drone: Drone) -> None:
+        row = len(self._drones)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._drones.append(drone)
+        self._row_by_id[drone.drone_id] = row
+        self.endInsertRows()
+        self.drone_events.add_status_change_callback(drone, self.drone_status_changed)
+        self.drone_events.add_state_change_callback(drone, self.drone_state_changed)
+
+    def row_of(self, drone_id: str) -> int:
+        return self._row_by_id.get(drone_id, -1)
+
+    def drone_at(self, row: int) -> Drone:
+        return self._drones[row]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._drones)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        drone = self._drones[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == self.ID_COLUMN:
+                return drone.drone_id
+            if column == self.ROLE_COLUMN:
+                return drone.role if drone.role else ""
+            if column == self.STATUS_COLUMN:
+                return drone.status.name
+            if column == self.ALT_COLUMN:
+                return _format_number(drone.alt, 1)
+            if column == self.HEADING_COLUMN:
+                return _format_number(drone.heading, 0)
+            if column == self.GROUNDSPEED_COLUMN:
+                return _format_number(drone.groundspeed, 1)
+        elif role == Qt.BackgroundRole and column == self.STATUS_COLUMN:
+            # if status is DroneStatus.DISCONNECTED, set background to dark grey
+            if drone.status == DroneStatus.DISCONNECTED:
+                return Qt.darkGray
+            if drone.status == DroneStatus.CONNECTING:
+                return Qt.lightGray
+        elif role == Qt.TextAlignmentRole and column >= self.ALT_COLUMN:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def drone_status_changed(self, drone: Drone, new_status: DroneStatus) -> None:
+        row = self._row_by_id.get(drone.drone_id)
+        if row is None:
+            return
+        self._drones[row] = drone
+        cell = self.index(row, self.STATUS_COLUMN)
+        self.dataChanged.emit(cell, cell, [Qt.DisplayRole, Qt.BackgroundRole])
+
+    def drone_state_changed(self, drone: Drone) -> None:
+        row = self._row_by_id.get(drone.drone_id)
+        if row is None:
+            return
+        self._drones[row] = drone
+        self._dirty_telemetry_rows.add(row)
+        if not self._telemetry_timer.isActive():
+            self._telemetry_timer.start()
+
+    def _flush_telemetry_rows(self) -> None:
+        rows = sorted(self._dirty_telemetry_rows)
+        self._dirty_telemetry_rows.clear()
+
+        # emit one dataChanged per contiguous run of dirty rows
+        run_start = None
+        previous = None
+        with tracing.span("table.update_rows", "gui", rows=len(rows)):
+            for row in rows + [None]:
+                if run_start is not None and (row is None or row != previous + 1):
+                    self.dataChanged.emit(
+                        self.index(run_start, self.ALT_COLUMN),
+                        self.index(previous, self.GROUNDSPEED_COLUMN),
+                        [Qt.DisplayRole],
+                    )
+                    run_start = None
+                if run_start is None:
+                    run_start = row
+                previous = row
+
+
+def _format_number(value: float | None, decimals: int) -> str:
+    if value is None:
+        return ""
+    return f"{value:.{decimals}f}"
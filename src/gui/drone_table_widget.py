@@ -1,12 +1,11 @@
 import asyncio
 from typing import List
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QPushButton,
     QLabel,
     QHeaderView,
@@ -15,9 +14,11 @@ from PySide6.QtWidgets import (
 )
 
 
+from controller.controller_thread import ControllerThread
 from controller.swarm_controller import SwarmController
 
-from model.drone import Drone, DroneStatus
+from .drone_events import DroneEvents
+from .drone_table_model import DroneTableModel
 
 
 class DroneListWidget(QWidget):
@@ -26,13 +27,29 @@ class DroneListWidget(QWidget):
     The table is configured to always fill the widget's width.
     """
 
-    def __init__(self, controller: SwarmController | None = None, parent=None):
+    # summary of a finished emergency command, emitted from the controller's loop
+    command_finished = Signal(str)
+
+    def __init__(
+        self,
+        controller: SwarmController | None = None,
+        parent=None,
+        drone_events: DroneEvents | None = None,
+        controller_thread: ControllerThread | None = None,
+    ):
         super().__init__(parent)
 
-        self.table = QTableWidget(0, 3)
+        self.controller = controller
+        # with a controller thread, controller calls are handed over to its loop
+        self.controller_thread = controller_thread
+        self.model = DroneTableModel(controller, self, drone_events)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
         # remove row numbers
         self.table.verticalHeader().setVisible(False)
-        self.table.setHorizontalHeaderLabels(["Vehicle ID", "Role", "Status"])
+        # Fixed row heights so large swarms don't trigger per-row size computation
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         header = self.table.horizontalHeader()
         # Make columns stretch to fill available width
         header.setSectionResizeMode(QHeaderView.Stretch)
@@ -41,12 +58,12 @@ class DroneListWidget(QWidget):
         self.table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
         # Select by row
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
 
         # set font color when selected to black
         # set selection color to light gray
         self.table.setStyleSheet(
-            "QTableWidget::item:selected { color: black; background-color: lightgray; }"
+            "QTableView::item:selected { color: black; background-color: lightgray; }"
         )
 
         # Make a bar of buttons
@@ -58,13 +75,21 @@ class DroneListWidget(QWidget):
         button_layout.addWidget(self.connect_btn)
 
         self.deploy_btn = QPushButton("Execute Mission")
-        self.deploy_btn.clicked.connect(
-            lambda: asyncio.ensure_future(self.on_deploy_clicked())
-        )
+        self.deploy_btn.clicked.connect(self.on_deploy_clicked)
 
         button_layout.addWidget(self.deploy_btn)
 
+        # emergency commands go to every connected drone at once
+        self.hold_all_btn = QPushButton("Hold All")
+        self.hold_all_btn.clicked.connect(self.on_hold_all_clicked)
+        button_layout.addWidget(self.hold_all_btn)
+
+        self.rtl_all_btn = QPushButton("RTL All")
+        self.rtl_all_btn.clicked.connect(self.on_rtl_all_clicked)
+        button_layout.addWidget(self.rtl_all_btn)
+
         self.status = QLabel("")
+        self.command_finished.connect(self.status.setText)
 
         layout = QVBoxLayout(self)
         layout.addWidget(self.table)
@@ -72,47 +97,47 @@ class DroneListWidget(QWidget):
         layout.addWidget(self.status, alignment=Qt.AlignRight)
         layout.setContentsMargins(4, 4, 4, 4)
 
-        self.controller = controller
-        for drone in controller.get_all_drones():
-            drone.add_status_change_callback(self.drone_status_changed)
-            self.table.insertRow(self.table.rowCount())
-            row = self.table.rowCount() - 1
-            self.table.setItem(row, 0, QTableWidgetItem(drone.drone_id))
-            self.table.setItem(
-                row, 1, QTableWidgetItem(drone.role if drone.role else "")
-            )
-            self._set_drone_status(drone, drone.status)
-
-    def drone_status_changed(self, drone: Drone, new_status: DroneStatus) -> None:
-        self._set_drone_status(drone, new_status)
-
-    def _set_drone_status(self, drone: Drone, status: DroneStatus) -> None:
-        default_bg_color = self.table.palette().color(self.table.backgroundRole())
-
-        for r in range(self.table.rowCount()):
-            if self.table.item(r, 0).text() == drone.drone_id:
-                # if status is DroneStatus.DISCONNECTED, set background to dark grey
-                item = QTableWidgetItem(status.name)
-                if status == DroneStatus.DISCONNECTED:
-                    item.setBackground(Qt.darkGray)
-                elif status == DroneStatus.CONNECTING:
-                    item.setBackground(Qt.lightGray)
-                else:
-                    item.setBackground(default_bg_color)
-                self.table.setItem(r, 2, item)
-
     def get_selected_drone_ids(self) -> List[str]:
         return [
-            self.table.item(r, 0).text()
-            for r in range(self.table.rowCount())
-            if self.table.item(r, 0) and self.table.item(r, 0).isSelected()
+            self.model.drone_at(index.row()).drone_id
+            for index in self.table.selectionModel().selectedRows()
         ]
 
     def on_connect_clicked(self) -> None:
         # selected = self.get_selected_drone_ids()
         # self.status.setText(f"Connect clicked for: {', '.join(selected)}")
-        self.controller.connect_all_drones()
+        if self.controller_thread is not None:
+            self.controller_thread.call_soon(self.controller.connect_all_drones)
+        else:
+            self.controller.connect_all_drones()
 
-    async def on_deploy_clicked(self) -> None:
+    def on_deploy_clicked(self) -> None:
         self.status.setText("Executing mission...")
-        await self.controller.deploy_swarm()
+        if self.controller_thread is not None:
+            self.controller_thread.submit(self.controller.deploy_swarm())
+        else:
+            asyncio.ensure_future(self.controller.deploy_swarm())
+
+    def on_hold_all_clicked(self) -> None:
+        self.status.setText("Holding all drones...")
+        self._run_on_controller(self.controller.emergency_hold())
+
+    def on_rtl_all_clicked(self) -> None:
+        self.status.setText("Returning all drones to launch...")
+        self._run_on_controller(self.controller.emergency_return_to_launch())
+
+    def _run_on_controller(self, coro) -> None:
+        if self.controller_thread is not None:
+            future = self.controller_thread.submit(coro)
+        else:
+            future = asyncio.ensure_future(coro)
+        future.add_done_callback(self._command_done)
+
+    def _command_done(self, future) -> None:
+        # may run on the controller thread; the signal is queued to the GUI thread
+        if future.cancelled():
+            self.command_finished.emit("Command cancelled")
+        elif future.exception() is not None:
+            self.command_finished.emit(f"Command failed: {future.exception()}")
+        else:
+            self.command_finished.emit(future.result().summary())
@@ -1,3 +1,4 @@
+import signal
 import sys
 
 from PySide6.QtCore import Qt
@@ -14,16 +15,21 @@ import PySide6.QtAsyncio as QtAsyncio
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import QMessageBox
 
+from controller.controller_thread import ControllerThread
 from controller.swarm_controller import SwarmController
 
+from .drone_events import DroneEvents, SnapshotDroneEvents
 from .map_widget import MapWidget
 from .drone_table_widget import DroneListWidget
+from .stats_panel import StatsPanel
 
 
 class MainWindow(QMainWindow):
     def __init__(
         self,
         controller: SwarmController | None = None,
+        controller_thread: ControllerThread | None = None,
+        show_stats: bool = False,
     ):
         super().__init__()
         self.setWindowTitle("Swarm Controller")
@@ -31,9 +37,25 @@ class MainWindow(QMainWindow):
 
         self.createMenuBar()
 
-        self.central_widget = CentralWidget(controller)
+        # With a controller thread the drones change state off the GUI thread, so the
+        # widgets get per-frame snapshots instead of subscribing to the drones
+        self.drone_events = (
+            SnapshotDroneEvents(self) if controller_thread is not None else DroneEvents()
+        )
+        self.central_widget = CentralWidget(
+            controller, self.drone_events, controller_thread
+        )
         self.setCentralWidget(self.central_widget)
 
+        # With metrics enabled, the stats panel can be toggled from the View menu
+        self.stats_panel = None
+        if controller is not None and controller.metrics is not None:
+            self.stats_panel = StatsPanel(controller.metrics, controller_thread, self)
+            self.addDockWidget(Qt.RightDockWidgetArea, self.stats_panel)
+            self.stats_panel.setVisible(show_stats)
+            view_menu = self.menuBar().addMenu("&View")
+            view_menu.addAction(self.stats_panel.toggleViewAction())
+
         # register resize event to handle map resizing
         self.resizeEvent = self.on_map_resize
 
@@ -66,17 +88,24 @@ class MainWindow(QMainWindow):
 
 
 class CentralWidget(QWidget):
-    def __init__(self, controller: SwarmController | None = None):
+    def __init__(
+        self,
+        controller: SwarmController | None = None,
+        drone_events: DroneEvents | None = None,
+        controller_thread: ControllerThread | None = None,
+    ):
         super().__init__()
 
         # Use a vertical splitter so user can resize top (map) and bottom (drone list)
         splitter = QSplitter(Qt.Vertical)
 
         # Top: map
-        self.map_widget = MapWidget(controller)
+        self.map_widget = MapWidget(controller, drone_events=drone_events)
 
         # Bottom: DroneListWidget encapsulates table, status, and deploy button
-        self.drone_list_widget = DroneListWidget(controller)
+        self.drone_list_widget = DroneListWidget(
+            controller, drone_events=drone_events, controller_thread=controller_thread
+        )
 
         splitter.addWidget(self.map_widget)
         splitter.addWidget(self.drone_list_widget)
@@ -94,7 +123,7 @@ class CentralWidget(QWidget):
         self.map_widget.mouseMoved.connect(self.on_mouse_moved)
         self.map_widget.locationSelected.connect(self.on_location_selected)
         # connect selection and deploy signals from the DroneListWidget
-        self.drone_list_widget.table.itemSelectionChanged.connect(
+        self.drone_list_widget.table.selectionModel().selectionChanged.connect(
             self.on_selection_changed
         )
 
@@ -115,12 +144,51 @@ class CentralWidget(QWidget):
         self.map_widget.highlight_drones(selected)
 
 
-def run(controller: SwarmController | None = None) -> None:
+def run(
+    controller: SwarmController | None = None,
+    threaded: bool = False,
+    show_stats: bool = False,
+) -> None:
+    """Show the GUI for the controller.
+
+    With threaded, the controller runs on its own asyncio loop in a ControllerThread
+    and the GUI thread only runs Qt; otherwise both share the QtAsyncio loop.
+    show_stats opens the statistics panel, if the controller has metrics enabled.
+    """
     app = QApplication(sys.argv)
-    w = MainWindow(controller)
+    metrics = controller.metrics if controller is not None else None
+    if not threaded:
+        w = MainWindow(controller, show_stats=show_stats)
+        w.app = app
+        w.show()
+        try:
+            QtAsyncio.run(_start_loop_monitor(metrics), handle_sigint=True)
+        finally:
+            if metrics is not None:
+                metrics.stop()
+        return
+
+    controller_thread = ControllerThread()
+    w = MainWindow(controller, controller_thread, show_stats=show_stats)
     w.app = app
     w.show()
-    QtAsyncio.run(handle_sigint=True)
+    controller_thread.start()
+    if metrics is not None:
+        controller_thread.call_soon(metrics.start_loop_monitor)
+    signal.signal(signal.SIGINT, lambda *_: app.quit())
+    try:
+        app.exec()
+    finally:
+        w.drone_events.stop()
+        if metrics is not None:
+            metrics.stop()
+        controller_thread.stop()
+
+
+async def _start_loop_monitor(metrics) -> None:
+    # the lag is measured on the loop the controller runs on, here QtAsyncio's
+    if metrics is not None:
+        metrics.start_loop_monitor()
 
 
 if __name__ == "__main__":
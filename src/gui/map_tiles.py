@@ -0,0 +1,408 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+from PySide6.QtCore import QObject, QRect, QRectF, QRunnable, QSize, QThreadPool, Qt, Signal
+from PySide6.QtGui import QColor, QImage, QImageIOHandler, QImageReader, QPainter, QPixmap
+from PySide6.QtWidgets import QGraphicsItem, QGraphicsObject, QStyleOptionGraphicsItem
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "swarm_demo_controller" / "tiles"
+
+TileKey = Tuple[int, int, int]  # level, column, row
+
+
+class TilePyramid(object):
+    """A map image cut into tiles at halving resolutions, stored on disk.
+
+    Level 0 is the full resolution image, each further level halves it, down to a
+    level that fits in one tile. Tiles are built once per image (keyed by path,
+    size and modification time) under cache_dir and reused on later runs, so only
+    the first start with a new image pays for decoding it.
+    """
+
+    MANIFEST = "manifest.json"
+    # level 0 is decoded in strips of at most this many bytes where the format allows
+    STRIP_BUDGET_BYTES = 128 * 1024 * 1024
+
+    def __init__(self, image_path: str, tile_size: int = 256, cache_dir: str | None = None):
+        self.image_path = str(image_path)
+        self.tile_size = tile_size
+        reader = QImageReader(self.image_path)
+        self.image_size: QSize = reader.size()
+        if not self.image_size.isValid():
+            raise ValueError(f"Cannot read map image {self.image_path}: {reader.errorString()}")
+        # photos become JPEG tiles; keep PNG where the image has transparency
+        image_format = reader.imageFormat()
+        has_alpha = (
+            image_format == QImage.Format_Invalid
+            or QImage(1, 1, image_format).hasAlphaChannel()
+        )
+        self.tile_format = "png" if has_alpha else "jpg"
+
+        longest = max(self.image_size.width(), self.image_size.height())
+        self.levels = max(1, math.ceil(math.log2(max(1, longest / tile_size))) + 1)
+
+        stat = os.stat(self.image_path)
+        key = f"{os.path.abspath(self.image_path)}|{stat.st_size}|{stat.st_mtime_ns}|{tile_size}"
+        cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+        self.directory = cache_dir / hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    def is_built(self) -> bool:
+        return (self.directory / self.MANIFEST).is_file()
+
+    def level_size(self, level: int) -> Tuple[int, int]:
+        scale = 1 << level
+        return (
+            math.ceil(self.image_size.width() / scale),
+            math.ceil(self.image_size.height() / scale),
+        )
+
+    def grid(self, level: int) -> Tuple[int, int]:
+        width, height = self.level_size(level)
+        return math.ceil(width / self.tile_size), math.ceil(height / self.tile_size)
+
+    def tile_rect(self, level: int, column: int, row: int) -> QRect:
+        # in pixels of that level, clipped to its size
+        width, height = self.level_size(level)
+        x, y = column * self.tile_size, row * self.tile_size
+        return QRect(x, y, min(self.tile_size, width - x), min(self.tile_size, height - y))
+
+    def tile_path(self, level: int, column: int, row: int) -> Path:
+        return self.directory / str(level) / f"{column}_{row}.{self.tile_format}"
+
+    def load_tile(self, level: int, column: int, row: int) -> QImage:
+        return QImage(str(self.tile_path(level, column, row)))
+
+    def build(self, cancelled: threading.Event | None = None) -> bool:
+        """Cut and save every tile; safe to run on a worker thread.
+
+        Level 0 is read in strips of tile rows where the image format allows it (e.g.
+        JPEG), otherwise the image is decoded once. Each further level is drawn
+        from the four tiles below it, so memory use after level 0 is a few tiles.
+        Returns False if cancelled.
+        """
+        cancelled = cancelled or threading.Event()
+        for level in range(self.levels):
+            (self.directory / str(level)).mkdir(parents=True, exist_ok=True)
+
+        columns, rows = self.grid(0)
+        width = self.image_size.width()
+        clip_reads = QImageReader(self.image_path).supportsOption(QImageIOHandler.ClipRect)
+        allocation_limit = QImageReader.allocationLimit()
+        # each clip read decodes from the top again, so use as few strips as memory allows
+        if clip_reads:
+            strip_rows = max(1, self.STRIP_BUDGET_BYTES // (width * 4 * self.tile_size))
+        else:
+            # formats like PNG can only be decoded whole; lift Qt's 256 MB read limit.
+            # The limit is process wide, so it is put back once level 0 is read
+            QImageReader.setAllocationLimit(0)
+            strip_rows = rows
+        try:
+            for first_row in range(0, rows, strip_rows):
+                if cancelled.is_set():
+                    return False
+                last_row = min(rows, first_row + strip_rows) - 1
+                top = first_row * self.tile_size
+                bottom = self.tile_rect(0, 0, last_row).bottom()
+                reader = QImageReader(self.image_path)
+                if clip_reads:
+                    reader.setClipRect(QRect(0, top, width, bottom - top + 1))
+                else:
+                    top = 0
+                strip = reader.read()
+                for row in range(first_row, last_row + 1):
+                    for column in range(columns):
+                        rect = self.tile_rect(0, column, row)
+                        tile = strip.copy(rect.x(), rect.y() - top, rect.width(), rect.height())
+                        self._save(tile, 0, column, row)
+                strip = None
+        finally:
+            if not clip_reads:
+                QImageReader.setAllocationLimit(allocation_limit)
+
+        for level in range(1, self.levels):
+            columns, rows = self.grid(level)
+            for row in range(rows):
+                if cancelled.is_set():
+                    return False
+                for column in range(columns):
+                    self._save(self._downsample(level, column, row), level, column, row)
+
+        manifest = {
+            "image": self.image_path,
+            "width": self.image_size.width(),
+            "height": self.image_size.height(),
+            "tile_size": self.tile_size,
+            "levels": self.levels,
+        }
+        temp_path = self.directory / (self.MANIFEST + ".tmp")
+        temp_path.write_text(json.dumps(manifest))
+        temp_path.replace(self.directory / self.MANIFEST)
+        return True
+
+    def _downsample(self, level: int, column: int, row: int) -> QImage:
+        rect = self.tile_rect(level, column, row)
+        tile = QImage(rect.width(), rect.height(), QImage.Format_ARGB32_Premultiplied)
+        tile.fill(Qt.transparent)
+        painter = QPainter(tile)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        below_columns, below_rows = self.grid(level - 1)
+        half = self.tile_size / 2
+        for dy in (0, 1):
+            for dx in (0, 1):
+                child_column, child_row = 2 * column + dx, 2 * row + dy
+                if child_column >= below_columns or child_row >= below_rows:
+                    continue
+                child = self.load_tile(level - 1, child_column, child_row)
+                target = QRectF(dx * half, dy * half, child.width() / 2, child.height() / 2)
+                painter.drawImage(target, child)
+        painter.end()
+        return tile
+
+    def _save(self, tile: QImage, level: int, column: int, row: int) -> None:
+        if self.tile_format == "jpg":
+            tile = tile.convertToFormat(QImage.Format_RGB32)
+        tile.save(str(self.tile_path(level, column, row)), None, 90)
+
+
+class TileCache(object):
+    """Decoded tiles, least recently used first out once over budget_bytes."""
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.bytes_used = 0
+        self._pixmaps: "OrderedDict[TileKey, QPixmap]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._pixmaps)
+
+    def __contains__(self, key: TileKey) -> bool:
+        return key in self._pixmaps
+
+    def get(self, key: TileKey) -> QPixmap | None:
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+        return pixmap
+
+    def put(self, key: TileKey, pixmap: QPixmap) -> None:
+        if key in self._pixmaps:
+            self.bytes_used -= _pixmap_bytes(self._pixmaps.pop(key))
+        self._pixmaps[key] = pixmap
+        self.bytes_used += _pixmap_bytes(pixmap)
+        while self.bytes_used > self.budget_bytes and len(self._pixmaps) > 1:
+            _, evicted = self._pixmaps.popitem(last=False)
+            self.bytes_used -= _pixmap_bytes(evicted)
+
+    def clear(self) -> None:
+        self._pixmaps.clear()
+        self.bytes_used = 0
+
+
+def _pixmap_bytes(pixmap: QPixmap) -> int:
+    return pixmap.width() * pixmap.height() * max(1, pixmap.depth() // 8)
+
+
+class _TileSignals(QObject):
+    # emitted from pool threads, delivered on the GUI thread
+    loaded = Signal(object, QImage)
+    built = Signal(bool)
+
+
+class _LoadTileTask(QRunnable):
+    def __init__(self, pyramid: TilePyramid, key: TileKey, signals: _TileSignals):
+        super().__init__()
+        self.pyramid = pyramid
+        self.key = key
+        self.signals = signals
+
+    def run(self) -> None:
+        self.signals.loaded.emit(self.key, self.pyramid.load_tile(*self.key))
+
+
+class _BuildPyramidTask(QRunnable):
+    def __init__(self, pyramid: TilePyramid, signals: _TileSignals, cancelled: threading.Event):
+        super().__init__()
+        self.pyramid = pyramid
+        self.signals = signals
+        self.cancelled = cancelled
+
+    def run(self) -> None:
+        try:
+            built = self.pyramid.build(self.cancelled)
+        except Exception:
+            logger.exception(f"Building map tiles for {self.pyramid.image_path} failed")
+            built = False
+        self.signals.built.emit(built)
+
+
+class TiledMapItem(QGraphicsObject):
+    """Scene item drawing a TilePyramid at the level of detail of the current zoom.
+
+    Scene coordinates are full resolution image pixels, as with a QGraphicsPixmapItem
+    of the whole image. Only tiles in the exposed area are drawn; missing ones are
+    decoded on a worker thread and the area is repainted once they arrive, drawing
+    the closest coarser tile in memory until then. If the tiles cannot be built, the
+    whole image is shown as one pixmap instead, or an error if that fails too.
+    """
+
+    def __init__(
+        self,
+        pyramid: TilePyramid,
+        memory_budget_mb: float = 128.0,
+        worker_threads: int = 2,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.pyramid = pyramid
+        self.cache = TileCache(int(memory_budget_mb * 1024 * 1024))
+        self.tiles_requested = 0
+        self._pending: Set[TileKey] = set()
+        self._failed: Set[TileKey] = set()  # tiles that could not be read, not retried
+        self._fallback_pixmap: QPixmap | None = None  # whole image, if building failed
+        self._build_failed = False
+        self._built = pyramid.is_built()
+        self._cancelled = threading.Event()
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(worker_threads)
+        self._signals = _TileSignals()
+        self._signals.loaded.connect(self._tile_loaded)
+        self._signals.built.connect(self._pyramid_built)
+        self._bounds = QRectF(0, 0, pyramid.image_size.width(), pyramid.image_size.height())
+        # exposedRect in paint() is then the area to redraw, not the whole map
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+        if not self._built:
+            logger.info(f"Building map tiles for {pyramid.image_path} in {pyramid.directory}")
+            self._pool.start(_BuildPyramidTask(pyramid, self._signals, self._cancelled))
+        else:
+            self._request_overview()
+
+    def boundingRect(self) -> QRectF:
+        return self._bounds
+
+    def level_for_scale(self, scale: float) -> int:
+        # the coarsest level still at least as detailed as the screen
+        if scale >= 1.0:
+            return 0
+        return min(self.pyramid.levels - 1, int(math.floor(math.log2(1.0 / scale))))
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget=None) -> None:
+        exposed = option.exposedRect.intersected(self._bounds)
+        if not self._built:
+            self._paint_unbuilt(painter, exposed)
+            return
+        scale = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        level = self.level_for_scale(scale)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, level > 0 or scale < 1.0)
+
+        span = self.pyramid.tile_size * (1 << level)  # scene pixels per tile
+        columns, rows = self.pyramid.grid(level)
+        first_column = max(0, int(exposed.left() // span))
+        last_column = min(columns - 1, int(exposed.right() // span))
+        first_row = max(0, int(exposed.top() // span))
+        last_row = min(rows - 1, int(exposed.bottom() // span))
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                key = (level, column, row)
+                pixmap = self.cache.get(key)
+                if pixmap is None:
+                    self._request(key)
+                    self._paint_fallback(painter, key)
+                    continue
+                painter.drawPixmap(self._scene_rect(key), pixmap, QRectF(pixmap.rect()))
+
+    def stop(self) -> None:
+        """Cancel building and loading; call before dropping the item."""
+        self._cancelled.set()
+        self._pool.clear()
+        self._pool.waitForDone()
+
+    def _scene_rect(self, key: TileKey) -> QRectF:
+        level, column, row = key
+        rect = self.pyramid.tile_rect(level, column, row)
+        scale = 1 << level
+        return QRectF(rect.x() * scale, rect.y() * scale, rect.width() * scale, rect.height() * scale)
+
+    def _paint_unbuilt(self, painter: QPainter, exposed: QRectF) -> None:
+        if self._fallback_pixmap is not None:
+            # scene coordinates are image pixels, so the exposed area is also the source
+            painter.drawPixmap(exposed, self._fallback_pixmap, exposed)
+            return
+        painter.fillRect(exposed, QColor("#e0e0e0"))
+        if self._build_failed:
+            painter.drawText(
+                self._bounds, Qt.AlignCenter, f"Cannot show map {self.pyramid.image_path}"
+            )
+
+    def _paint_fallback(self, painter: QPainter, key: TileKey) -> None:
+        level, column, row = key
+        target = self._scene_rect(key)
+        for coarser in range(level + 1, self.pyramid.levels):
+            shift = coarser - level
+            parent_key = (coarser, column >> shift, row >> shift)
+            pixmap = self.cache.get(parent_key)
+            if pixmap is None:
+                continue
+            parent_rect = self._scene_rect(parent_key)
+            ratio = pixmap.width() / parent_rect.width()
+            source = QRectF(
+                (target.x() - parent_rect.x()) * ratio,
+                (target.y() - parent_rect.y()) * ratio,
+                target.width() * ratio,
+                target.height() * ratio,
+            )
+            painter.drawPixmap(target, pixmap, source)
+            return
+        painter.fillRect(target, QColor("#e0e0e0"))
+
+    def _request(self, key: TileKey) -> None:
+        if key in self._pending or key in self._failed:
+            return
+        self._pending.add(key)
+        self.tiles_requested += 1
+        self._pool.start(_LoadTileTask(self.pyramid, key, self._signals))
+
+    def _tile_loaded(self, key: TileKey, image: QImage) -> None:
+        self._pending.discard(key)
+        if image.isNull():
+            logger.warning(f"Map tile {key} could not be read")
+            # repaints would request it again and again otherwise
+            self._failed.add(key)
+            return
+        self.cache.put(key, QPixmap.fromImage(image))
+        self.update(self._scene_rect(key))
+
+    def _request_overview(self) -> None:
+        # the one-tile level is the fallback drawn while finer tiles load
+        self._request((self.pyramid.levels - 1, 0, 0))
+
+    def _pyramid_built(self, built: bool) -> None:
+        self._built = built
+        if built:
+            self._request_overview()
+        elif not self._cancelled.is_set():
+            self._build_failed = True
+            pixmap = QPixmap(self.pyramid.image_path)
+            if pixmap.isNull():
+                logger.error(f"Cannot show map {self.pyramid.image_path}")
+            else:
+                logger.warning("Showing the map as one image, without tiles")
+                self._fallback_pixmap = pixmap
+        self.update()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "tiles_cached": len(self.cache),
+            "cache_mb": self.cache.bytes_used / (1024 * 1024),
+            "tiles_requested": self.tiles_requested,
+            "tiles_pending": len(self._pending),
+        }
@@ -1,22 +1,31 @@
 import json
-from typing import List, Tuple
+import math
+from typing import Dict, Iterable, List, Set, Tuple
 from controller.swarm_controller import SwarmController
 from model.drone import Drone
 import utils.geo_tools as geo_tools
 import utils.file_utils as file_utils
+from utils import tracing
 
-from PySide6.QtCore import Qt, Signal, QPointF
-from PySide6.QtGui import QPixmap, QPen, QBrush, QColor, QPainter
+from PySide6.QtCore import Qt, Signal, QPointF, QTimer
+from PySide6.QtGui import QPixmap, QPen, QBrush, QColor, QPainter, QImageReader
 from PySide6.QtWidgets import (
     QGraphicsView,
     QGraphicsScene,
+    QGraphicsItem,
     QGraphicsPixmapItem,
     QGraphicsEllipseItem,
     QGraphicsLineItem,
+    QGraphicsSimpleTextItem,
     QGraphicsTextItem,
     QLabel,
+    QApplication,
 )
 
+from .drone_events import DroneEvents
+from .map_tiles import TiledMapItem, TilePyramid
+from .marker_lod import Cell, GridIndex
+
 
 class LatLonLabel(QLabel):
     """A QLabel that displays lat/lon coordinates."""
@@ -47,12 +56,24 @@ class MapWidget(QGraphicsView):
     mouseMoved = Signal(float, float)
     locationSelected = Signal(float, float)
 
+    FRAME_INTERVAL_MS = 16
+    # map images larger than this (either side, in pixels) are drawn from tiles
+    TILED_MAP_MIN_PX = 8192
+    # below this view scale drones close together on screen are drawn as one
+    # count badge per CLUSTER_CELL_PX grid cell
+    CLUSTER_BELOW_ZOOM = 0.5
+    CLUSTER_CELL_PX = 48
+    # markers this far (screen pixels) outside the view are not moved
+    CULL_MARGIN_PX = 160
+
     def __init__(
         self,
         controller: SwarmController | None = None,
         parent=None,
+        drone_events: DroneEvents | None = None,
     ):
         super().__init__(parent)
+        self.drone_events = drone_events if drone_events is not None else DroneEvents()
         # Use QPainter render hint for antialiasing (correct PySide6 API)
         self.setRenderHint(QPainter.Antialiasing)
         # Zoom state
@@ -73,16 +94,32 @@ class MapWidget(QGraphicsView):
         # doesn't scale with the scene or block mouse events.
         self.coord_label = LatLonLabel(self)
 
+        # Level of detail, see _rebuild_lod
+        self._positions: Dict[str, Tuple[float, float]] = {}  # drone_id -> scene x, y
+        self._reset_lod()
+
         # Map scene
         self.scene = QGraphicsScene(self)
+        # Drone markers move on every frame; skip the BSP index to avoid re-indexing churn
+        self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.setScene(self.scene)
 
-        self.pixmap_item: QGraphicsPixmapItem | None = None
+        # the map layer: a QGraphicsPixmapItem, or a TiledMapItem for large images
+        self.map_item: QGraphicsItem | None = None
         self.drones_items = {}  # name -> (ellipse, label)
         self.mission_lines = []
         self.mission_circle = None
         self.mission_point = None
 
+        # Drone state changes are coalesced and drawn at most once per frame
+        self._dirty_drones = {}  # drone_id -> drone
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.setInterval(self.FRAME_INTERVAL_MS)
+        self._frame_timer.timeout.connect(self._flush_dirty_drones)
+
+        self.geo_transform = geo_tools.GeoTransform()
+
         # Default bounds (min_lat, max_lat, min_lon, max_lon)
         # These can be tuned to match the map image used.
         self.bounds = (32.0605, 32.0625, 118.7780, 118.7805)
@@ -94,10 +131,9 @@ class MapWidget(QGraphicsView):
             pix = QPixmap(800, 600)
             pix.fill(QColor("#f7f7f7"))
             self.set_pixmap(pix)
-            self.img_to_latlon_mapping = geo_tools.default_affine_transform()
 
         for drone in controller.get_all_drones():
-            drone.add_state_change_callback(self.drone_state_changed)
+            self.drone_events.add_state_change_callback(drone, self.drone_state_changed)
 
         if controller.scenario_spec.get("center_view_coordinates"):
             center_coords = controller.scenario_spec["center_view_coordinates"]
@@ -115,19 +151,54 @@ class MapWidget(QGraphicsView):
             except FileNotFoundError as e:
                 raise ValueError(f"Map image file not found: {image_path}") from e
 
-            pixmap = QPixmap(image_path)
-            self.set_pixmap(pixmap)
+            # "map_tiles": {"enabled", "min_image_px", "tile_size", "cache_dir",
+            # "memory_budget_mb"}; images above min_image_px are tiled by default
+            tile_options = dict(scenario_spec.get("map_tiles", {}))
+            enabled = tile_options.pop("enabled", None)
+            min_image_px = tile_options.pop("min_image_px", self.TILED_MAP_MIN_PX)
+            size = QImageReader(str(image_path)).size()
+            if enabled or (enabled is None and max(size.width(), size.height()) > min_image_px):
+                self.set_tiled_map(str(image_path), **tile_options)
+            else:
+                pixmap = QPixmap(image_path)
+                self.set_pixmap(pixmap)
 
         if scenario_spec.get("pixel to lat/lon mapping"):
             # TODO: implement pixel to lat/lon mapping
             pt_pairs = scenario_spec["pixel to lat/lon mapping"]["point_pairs"]
-            self.img_to_latlon_mapping = geo_tools.compute_affine_transform(pt_pairs)
+            self.geo_transform = geo_tools.GeoTransform.from_point_pairs(pt_pairs)
 
     def set_pixmap(self, pix: QPixmap) -> None:
+        self._set_map_item(QGraphicsPixmapItem(pix))
+
+    def set_tiled_map(
+        self,
+        image_path: str,
+        tile_size: int = 256,
+        cache_dir: str | None = None,
+        memory_budget_mb: float = 128.0,
+    ) -> TiledMapItem:
+        # Only the tiles in view are decoded, at the resolution of the current zoom
+        pyramid = TilePyramid(image_path, tile_size=tile_size, cache_dir=cache_dir)
+        item = TiledMapItem(pyramid, memory_budget_mb=memory_budget_mb)
+        self._set_map_item(item)
+        # a pyramid still being built must not keep the application from exiting
+        QApplication.instance().aboutToQuit.connect(item.stop)
+        # allow zooming out until the whole map fits in about 1000 pixels
+        longest = max(pyramid.image_size.width(), pyramid.image_size.height())
+        self._zoom_min = min(self._zoom_min, 1000.0 / longest)
+        return item
+
+    def _set_map_item(self, item: QGraphicsItem) -> None:
+        if isinstance(self.map_item, TiledMapItem):
+            self.map_item.stop()
         self.scene.clear()
-        self.pixmap_item = QGraphicsPixmapItem(pix)
-        self.scene.addItem(self.pixmap_item)
-        self.setSceneRect(self.pixmap_item.boundingRect())
+        self.drones_items.clear()
+        self._positions.clear()
+        self._reset_lod()
+        self.map_item = item
+        self.scene.addItem(self.map_item)
+        self.setSceneRect(self.map_item.boundingRect())
 
     def set_bounds(
         self, min_lat: float, max_lat: float, min_lon: float, max_lon: float
@@ -135,38 +206,276 @@ class MapWidget(QGraphicsView):
         self.bounds = (min_lat, max_lat, min_lon, max_lon)
 
     def latlon_to_point(self, lat: float, lon: float) -> QPointF:
-        x, y = geo_tools.latlon_to_img_x_y(self.img_to_latlon_mapping, lat, lon)
+        x, y = self.geo_transform.latlon_to_img_x_y(lat, lon)
         return QPointF(x, y)
 
     def point_to_latlon(self, pt: QPointF) -> Tuple[float, float]:
-        lat, lon = geo_tools.img_x_y_to_latlon(
-            self.img_to_latlon_mapping, pt.x(), pt.y()
-        )
+        lat, lon = self.geo_transform.img_x_y_to_latlon(pt.x(), pt.y())
 
         return lat, lon
 
     def drone_state_changed(self, drone: Drone) -> None:
-        self.update_drone_marker(drone)
+        # Only mark the drone dirty; markers are redrawn once per frame
+        self._dirty_drones[drone.drone_id] = drone
+        if not self._frame_timer.isActive():
+            self._frame_timer.start()
+
+    def _flush_dirty_drones(self) -> None:
+        drones = list(self._dirty_drones.values())
+        self._dirty_drones.clear()
+        with tracing.span("map.update_markers", "gui", drones=len(drones)):
+            self.update_drone_markers(drones)
+
+    def update_drone_markers(self, drones: Iterable[Drone]) -> None:
+        # Project all drone positions with a single batched transform
+        drones = [d for d in drones if d.lat is not None and d.lon is not None]
+        if not drones:
+            return
+        if self.transform().m11() != self._lod_scale:
+            self._rebuild_lod()
+        xs, ys = self.geo_transform.latlon_to_img_x_y_batch(
+            [d.lat for d in drones], [d.lon for d in drones]
+        )
+        left, top, right, bottom = self._visible_scene_bounds()
+        positions, stale, index = self._positions, self._stale_markers, self._lod_index
+        for drone, x, y in zip(drones, xs.tolist(), ys.tolist()):
+            drone_id = drone.drone_id
+            old = positions.get(drone_id)
+            positions[drone_id] = (x, y)
+            index.move(drone_id, x, y)
+            items = self.drones_items.get(drone_id)
+            if items is None:
+                self._create_drone_marker(drone)[0].setPos(x, y)
+                continue
+            if drone_id in self._clustered:
+                stale.setdefault(drone_id, old)
+                continue
+            # a marker is moved if it is or will be in view; otherwise it is
+            # remembered as stale with the position it was last drawn at
+            placed_x, placed_y = stale.get(drone_id, old)
+            if (left <= x <= right and top <= y <= bottom) or (
+                left <= placed_x <= right and top <= placed_y <= bottom
+            ):
+                items[0].setPos(x, y)
+                stale.pop(drone_id, None)
+            else:
+                stale.setdefault(drone_id, old)
+        if self._lod_scale is None:
+            self._rebuild_lod()
+        else:
+            self._update_lod()
 
     def update_drone_marker(self, drone: Drone) -> None:
-        # Remove previous drone items
-        if drone.drone_id in self.drones_items:
-            old_ellipse, old_label = self.drones_items[drone.drone_id]
-            self.scene.removeItem(old_ellipse)
-            self.scene.removeItem(old_label)
-
-        pt = self.latlon_to_point(drone.lat, drone.lon)
-        ellipse = QGraphicsEllipseItem(pt.x() - 6, pt.y() - 6, 12, 12)
+        self.update_drone_markers([drone])
+
+    def _create_drone_marker(self, drone: Drone):
+        # The ellipse is centered on its position and the label is a child so it
+        # follows the ellipse. Both keep their size on screen at any zoom. The
+        # label's HTML is laid out once and cached; it is shown by _update_labels.
+        ellipse = QGraphicsEllipseItem(-6, -6, 12, 12)
         ellipse.setBrush(QBrush(QColor("#2b8cbe")))
         ellipse.setPen(QPen(Qt.black))
-        label = QGraphicsTextItem()
+        ellipse.setFlag(QGraphicsItem.ItemIgnoresTransformations)
+        label = QGraphicsTextItem(ellipse)
         label.setHtml(
             f'<div style="color: black; font-size: 12px; background-color: white;">{drone.drone_id}</div>'
         )
-        label.setPos(pt.x() + 8, pt.y() - 8)
+        label.setPos(8, -8)
+        label.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        label.setVisible(False)
+        size = label.boundingRect().size()
+        self._label_widths[drone.drone_id] = size.width()
+        if size.width() > self._label_cell[0] or size.height() > self._label_cell[1]:
+            # labels must fit a cell of the label grid; regroup with larger cells
+            self._label_cell = (
+                max(size.width(), self._label_cell[0]),
+                max(size.height(), self._label_cell[1]),
+            )
+            self._lod_scale = None
         self.scene.addItem(ellipse)
-        self.scene.addItem(label)
         self.drones_items[drone.drone_id] = (ellipse, label)
+        return ellipse, label
+
+    def _reset_lod(self) -> None:
+        self._lod_scale: float | None = None  # view scale the grid was built for
+        self._lod_clustered = False
+        self._lod_index = GridIndex(1.0)
+        self._clustered: Set[str] = set()  # drones drawn as part of a badge
+        self._cluster_badges: Dict[Cell, Tuple] = {}  # cell -> (ellipse, count text)
+        self._spare_badges: List[Tuple] = []
+        self._label_owners: Dict[Cell, str] = {}  # label cell -> drone whose label it holds
+        self._label_widths: Dict[str, float] = {}
+        self._label_cell = (1.0, 1.0)  # largest label so far, screen pixels
+        self._shown_labels: Set[str] = set()
+        # drone_id -> position the marker was last drawn at, for markers left
+        # behind outside the view
+        self._stale_markers: Dict[str, Tuple[float, float]] = {}
+
+    def _rebuild_lod(self) -> None:
+        # Regroup all drones for the current zoom; moves after this only
+        # update the cells they touch (see _update_lod)
+        scale = self.transform().m11()
+        # cells are a power of two in scene units so that they stay put while
+        # zooming within an octave, and at least their size on screen
+        unit = 2.0 ** math.ceil(math.log2(1.0 / scale))
+        for drone_id in list(self._clustered):
+            self._show_marker(drone_id)
+        self._clustered.clear()
+        for badge in self._cluster_badges.values():
+            badge[0].setVisible(False)
+            self._spare_badges.append(badge)
+        self._cluster_badges.clear()
+        for drone_id in self._shown_labels:
+            self.drones_items[drone_id][1].setVisible(False)
+        self._shown_labels.clear()
+        self._label_owners.clear()
+        self._lod_scale = scale
+        self._lod_clustered = scale < self.CLUSTER_BELOW_ZOOM
+        if self._lod_clustered:
+            self._lod_index = GridIndex(self.CLUSTER_CELL_PX * unit)
+        else:
+            label_w, label_h = self._label_cell
+            self._lod_index = GridIndex(label_w * unit, label_h * unit)
+        self._lod_index.rebuild(self._positions.items())
+        self._update_lod()
+
+    def _update_lod(self) -> None:
+        dirty = self._lod_index.take_dirty()
+        if not dirty:
+            return
+        if self._lod_clustered:
+            self._update_clusters(dirty)
+        else:
+            self._update_labels(dirty)
+
+    def _update_clusters(self, dirty: Set[Cell]) -> None:
+        # A cell with more than one drone is drawn as a badge at their centroid
+        index = self._lod_index
+        for cell in dirty:
+            members = index.members(cell)
+            badge = self._cluster_badges.get(cell)
+            if len(members) > 1:
+                if badge is None:
+                    badge = self._cluster_badges[cell] = self._take_badge()
+                ellipse, count = badge
+                text = str(len(members))
+                if count.text() != text:
+                    count.setText(text)
+                    rect = count.boundingRect()
+                    count.setPos(-rect.width() / 2, -rect.height() / 2)
+                ellipse.setPos(*index.centroid(cell))
+                for drone_id in members:
+                    if drone_id not in self._clustered:
+                        self._clustered.add(drone_id)
+                        self.drones_items[drone_id][0].setVisible(False)
+                continue
+            if badge is not None:
+                del self._cluster_badges[cell]
+                badge[0].setVisible(False)
+                self._spare_badges.append(badge)
+            for drone_id in members:
+                if drone_id in self._clustered:
+                    self._clustered.discard(drone_id)
+                    self._show_marker(drone_id)
+
+    def _update_labels(self, dirty: Set[Cell]) -> None:
+        # One label per cell of the label grid (the lowest drone id); it is
+        # hidden if it would overlap the label of an earlier neighbouring cell,
+        # in row order. Cells are as large as a label, so labels further apart
+        # cannot overlap, and a move only affects its cells and their neighbours.
+        index, owners, positions = self._lod_index, self._label_owners, self._positions
+        affected = set(dirty)
+        for i, j in dirty:
+            affected.update(((i + 1, j), (i - 1, j + 1), (i, j + 1), (i + 1, j + 1)))
+        hide, show = set(), set()
+        for cell in affected:
+            members = index.members(cell)
+            previous = owners.pop(cell, None)
+            if members:
+                owners[cell] = min(members)
+            if previous is not None and previous != owners.get(cell):
+                hide.add(previous)
+        scale = self._lod_scale
+        label_h = self._label_cell[1] / scale
+        widths = self._label_widths
+        for cell in affected:
+            owner = owners.get(cell)
+            if owner is None:
+                continue
+            x, y = positions[owner]
+            width = widths[owner] / scale
+            i, j = cell
+            covered = False
+            for neighbour in ((i - 1, j), (i - 1, j - 1), (i, j - 1), (i + 1, j - 1)):
+                other = owners.get(neighbour)
+                if other is None:
+                    continue
+                other_x, other_y = positions[other]
+                if (
+                    abs(y - other_y) < label_h
+                    and x < other_x + widths[other] / scale
+                    and other_x < x + width
+                ):
+                    covered = True
+                    break
+            (hide if covered else show).add(owner)
+        for drone_id in hide - show:
+            if drone_id in self._shown_labels:
+                self._shown_labels.discard(drone_id)
+                self.drones_items[drone_id][1].setVisible(False)
+        for drone_id in show - self._shown_labels:
+            self._shown_labels.add(drone_id)
+            self.drones_items[drone_id][1].setVisible(True)
+
+    def _take_badge(self) -> Tuple:
+        if self._spare_badges:
+            badge = self._spare_badges.pop()
+            badge[0].setVisible(True)
+            return badge
+        ellipse = QGraphicsEllipseItem(-11, -11, 22, 22)
+        ellipse.setBrush(QBrush(QColor("#08589e")))
+        ellipse.setPen(QPen(Qt.white))
+        ellipse.setFlag(QGraphicsItem.ItemIgnoresTransformations)
+        ellipse.setZValue(1)
+        count = QGraphicsSimpleTextItem(ellipse)
+        count.setBrush(QBrush(Qt.white))
+        self.scene.addItem(ellipse)
+        return ellipse, count
+
+    def _show_marker(self, drone_id: str) -> None:
+        ellipse = self.drones_items[drone_id][0]
+        if self._stale_markers.pop(drone_id, None) is not None:
+            ellipse.setPos(*self._positions[drone_id])
+        ellipse.setVisible(True)
+
+    def _visible_scene_bounds(self) -> Tuple[float, float, float, float]:
+        rect = self.mapToScene(self.viewport().rect()).boundingRect()
+        margin = self.CULL_MARGIN_PX / self.transform().m11()
+        return (
+            rect.left() - margin,
+            rect.top() - margin,
+            rect.right() + margin,
+            rect.bottom() + margin,
+        )
+
+    def _viewport_changed(self) -> None:
+        # Regroup after zooming and catch up markers that scrolled into view
+        if not self._positions:
+            return
+        if self.transform().m11() != self._lod_scale:
+            self._rebuild_lod()
+        if not self._stale_markers:
+            return
+        left, top, right, bottom = self._visible_scene_bounds()
+        for drone_id, (placed_x, placed_y) in list(self._stale_markers.items()):
+            if drone_id in self._clustered:
+                continue
+            x, y = self._positions[drone_id]
+            if (left <= x <= right and top <= y <= bottom) or (
+                left <= placed_x <= right and top <= placed_y <= bottom
+            ):
+                self.drones_items[drone_id][0].setPos(x, y)
+                del self._stale_markers[drone_id]
 
     def highlight_drones(self, names: List[str]) -> None:
         for name, (ellipse, label) in self.drones_items.items():
@@ -187,7 +496,7 @@ class MapWidget(QGraphicsView):
         self.mission_lines.clear()
 
     def mouseMoveEvent(self, event):
-        if not self.pixmap_item:
+        if not self.map_item:
             return
         scene_pt = self.mapToScene(event.pos())
         lat, lon = self.point_to_latlon(scene_pt)
@@ -200,7 +509,7 @@ class MapWidget(QGraphicsView):
         super().mouseMoveEvent(event)
 
     def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton and self.pixmap_item:
+        if event.button() == Qt.LeftButton and self.map_item:
             # clear previous mission
             self.clear_mission()
 
@@ -239,6 +548,11 @@ class MapWidget(QGraphicsView):
         # Keep the inset positioned in the lower-right when the view resizes
         super().resizeEvent(event)
         self._reposition_latlon_label()
+        self._viewport_changed()
+
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self._viewport_changed()
 
     def _reposition_latlon_label(self):
         if self.coord_label and not self.coord_label.isHidden():
@@ -266,6 +580,7 @@ class MapWidget(QGraphicsView):
 
         self._zoom = new_zoom
         self.scale(factor, factor)
+        self._viewport_changed()
         event.accept()
 
     def draw_lines_to_selected(self, selected_names: List[str]) -> None:
@@ -275,16 +590,11 @@ class MapWidget(QGraphicsView):
             return
         center = self.mission_point.rect().center()
         for name in selected_names:
-            items = self.drones_items.get(name)
-            if not items:
+            # markers outside the view may lag behind, the position does not
+            position = self._positions.get(name)
+            if position is None:
                 continue
-            ellipse, _ = items
-            line = QGraphicsLineItem(
-                ellipse.rect().center().x(),
-                ellipse.rect().center().y(),
-                center.x(),
-                center.y(),
-            )
+            line = QGraphicsLineItem(position[0], position[1], center.x(), center.y())
             pen = QPen(QColor("#444444"))
             pen.setWidth(2)
             line.setPen(pen)
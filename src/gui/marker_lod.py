@@ -0,0 +1,87 @@
+import math
+from typing import Dict, Iterable, Set, Tuple
+
+Cell = Tuple[int, int]
+
+
+class GridIndex(object):
+    """Ids bucketed into a grid of cell_width x cell_height cells, updated per move.
+
+    move() only touches the cells an id leaves and enters and marks them dirty, so
+    whatever is drawn per cell (cluster badges, which label to show) is redone for
+    the cells that changed instead of for the whole swarm.
+    """
+
+    def __init__(self, cell_width: float, cell_height: float | None = None):
+        self.cell_width = cell_width
+        self.cell_height = cell_height if cell_height is not None else cell_width
+        self.cell_of: Dict[str, Cell] = {}
+        self._members: Dict[Cell, Set[str]] = {}
+        self._sums: Dict[Cell, list] = {}  # cell -> [sum x, sum y] of its members
+        self._positions: Dict[str, Tuple[float, float]] = {}
+        self._dirty: Set[Cell] = set()
+
+    def __len__(self) -> int:
+        return len(self.cell_of)
+
+    def cell_for(self, x: float, y: float) -> Cell:
+        return math.floor(x / self.cell_width), math.floor(y / self.cell_height)
+
+    def move(self, item_id: str, x: float, y: float) -> None:
+        cell = self.cell_for(x, y)
+        old_cell = self.cell_of.get(item_id)
+        if old_cell is not None:
+            old_x, old_y = self._positions[item_id]
+            if old_cell == cell:
+                sums = self._sums[cell]
+                sums[0] += x - old_x
+                sums[1] += y - old_y
+                self._positions[item_id] = (x, y)
+                self._dirty.add(cell)
+                return
+            self._leave(item_id, old_cell, old_x, old_y)
+        self.cell_of[item_id] = cell
+        self._positions[item_id] = (x, y)
+        self._members.setdefault(cell, set()).add(item_id)
+        sums = self._sums.setdefault(cell, [0.0, 0.0])
+        sums[0] += x
+        sums[1] += y
+        self._dirty.add(cell)
+
+    def remove(self, item_id: str) -> None:
+        cell = self.cell_of.pop(item_id, None)
+        if cell is not None:
+            x, y = self._positions.pop(item_id)
+            self._leave(item_id, cell, x, y)
+
+    def members(self, cell: Cell) -> Set[str]:
+        return self._members.get(cell, set())
+
+    def centroid(self, cell: Cell) -> Tuple[float, float]:
+        sum_x, sum_y = self._sums[cell]
+        count = len(self._members[cell])
+        return sum_x / count, sum_y / count
+
+    def take_dirty(self) -> Set[Cell]:
+        dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def rebuild(self, positions: Iterable[Tuple[str, Tuple[float, float]]]) -> None:
+        self.cell_of.clear()
+        self._members.clear()
+        self._sums.clear()
+        self._positions.clear()
+        for item_id, (x, y) in positions:
+            self.move(item_id, x, y)
+
+    def _leave(self, item_id: str, cell: Cell, x: float, y: float) -> None:
+        members = self._members[cell]
+        members.discard(item_id)
+        if members:
+            sums = self._sums[cell]
+            sums[0] -= x
+            sums[1] -= y
+        else:
+            del self._members[cell]
+            del self._sums[cell]
+        self._dirty.add(cell)
@@ -0,0 +1,84 @@
+import concurrent.futures
+
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtWidgets import QAbstractItemView, QDockWidget, QTableWidget, QTableWidgetItem
+
+from controller.controller_thread import ControllerThread
+from controller.swarm_metrics import SwarmMetrics
+
+
+class StatsPanel(QDockWidget):
+    """A dock showing SwarmMetrics.summary(), refreshed while it is visible.
+
+    With a controller thread the summary is made on that thread, which owns the
+    drones and the metrics, and only the finished rows come back to the GUI.
+    """
+
+    REFRESH_INTERVAL_MS = 1000
+
+    # emitted from the controller thread, delivered on the GUI thread
+    rows_ready = Signal(object)
+
+    def __init__(
+        self,
+        metrics: SwarmMetrics,
+        controller_thread: ControllerThread | None = None,
+        parent=None,
+    ):
+        super().__init__("Statistics", parent)
+        self.setObjectName("stats_panel")
+        self.metrics = metrics
+        self.controller_thread = controller_thread
+        self._summary_future: concurrent.futures.Future | None = None
+        self.rows_ready.connect(self._show_rows)
+
+        self.table = QTableWidget(0, 2, self)
+        self.table.setHorizontalHeaderLabels(["Metric", "Value"])
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.table.setFocusPolicy(Qt.NoFocus)
+        self.setWidget(self.table)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self._on_visibility_changed)
+
+    def refresh(self) -> None:
+        if self.controller_thread is None:
+            self._show_rows(self.metrics.summary())
+            return
+        if self._summary_future is not None and not self._summary_future.done():
+            return  # the controller is busy, skip this refresh rather than queue more
+        self._summary_future = self.controller_thread.submit(_summary(self.metrics))
+        self._summary_future.add_done_callback(self._summary_done)
+
+    def _summary_done(self, future: concurrent.futures.Future) -> None:
+        # on the controller thread; the signal hands the rows over to the GUI thread
+        if not future.cancelled() and future.exception() is None:
+            self.rows_ready.emit(future.result())
+
+    def _show_rows(self, rows) -> None:
+        self.table.setRowCount(len(rows))
+        for row, (name, value) in enumerate(rows):
+            for column, text in enumerate((name, value)):
+                item = self.table.item(row, column)
+                if item is None:
+                    self.table.setItem(row, column, QTableWidgetItem(text))
+                elif item.text() != text:
+                    item.setText(text)
+        self.table.resizeColumnToContents(0)
+
+    def _on_visibility_changed(self, visible: bool) -> None:
+        # the metrics are only read while someone can see them
+        if visible:
+            self.refresh()
+            self._timer.start()
+        else:
+            self._timer.stop()
+
+
+async def _summary(metrics: SwarmMetrics):
+    return metrics.summary()
@@ -1,10 +1,18 @@
 import asyncio
+import math
+import time
 from enum import Enum, auto
 
+import numpy as np
+
 from mavsdk.telemetry import Position
 
 from mavsdk import System as MAVSDKSystem
 
+from model.state_subscription import StateSubscription
+from model.swarm_state import SwarmState
+from model.telemetry_hub import TelemetryHub
+
 
 class DroneStatus(Enum):
     DISCONNECTED = auto()
@@ -16,31 +24,150 @@ class DroneStatus(Enum):
     LANDED = auto()
 
 
+_STATUS_BY_CODE = {status.value: status for status in DroneStatus}
+
+# holds the state of drones until they are added to a registry
+UNREGISTERED_STATE = SwarmState()
+
+
+def _state_field(name: str) -> property:
+    # a float of the drone's slot in its SwarmState, None where the array holds NaN
+    def get(self) -> float | None:
+        value = getattr(self._state, name).item(self._slot)
+        return None if value != value else value
+
+    def set(self, value: float | None) -> None:
+        getattr(self._state, name)[self._slot] = np.nan if value is None else value
+
+    return property(get, set)
+
+
 class Drone(object):
+    """A drone; its position, heading, speed and status live in a SwarmState slot.
+
+    Drones start out in UNREGISTERED_STATE and move to their registry's SwarmState
+    when added to it (see move_to_state), so the registry can compute over the whole
+    swarm with array operations.
+    """
+
+    __slots__ = (
+        "drone_id",
+        "connection_url",
+        "role",
+        "mavsdk_system",
+        "telemetry",
+        "status_change_callbacks",
+        "state_subscriptions",
+        "role_change_callbacks",
+        "_state_update_task",
+        "_state_update_rate",
+        "_state",
+        "_slot",
+    )
+
+    lat = _state_field("lat")
+    lon = _state_field("lon")
+    alt = _state_field("alt")
+    heading = _state_field("heading")
+    groundspeed = _state_field("groundspeed")  # m/s
+
     def __init__(self, drone_id: str, connection_url: str, role: str | None = None):
         # drone_id must be unique per drone
         self.drone_id: str = drone_id
         self.connection_url: str = connection_url
         self.role = role if role is not None else "UNASSIGNED"
-        self.lat: float | None = None
-        self.lon: float | None = None
-        self.alt: float | None = None
-        self.heading: float | None = None
-        self.status: DroneStatus = DroneStatus.DISCONNECTED
+        self._state = UNREGISTERED_STATE
+        self._slot = UNREGISTERED_STATE.allocate(DroneStatus.DISCONNECTED.value)
         self.mavsdk_system: MAVSDKSystem = None  # to be set when connected
+        self.telemetry: TelemetryHub | None = None  # created with mavsdk_system
         self.status_change_callbacks = []
-        self.state_change_callbacks = []
+        self.state_subscriptions: list[StateSubscription] = []
+        self.role_change_callbacks = []
         self._state_update_task = None
         self._state_update_rate = 0.5  # seconds
 
+    def __del__(self):
+        if getattr(self, "_state", None) is UNREGISTERED_STATE:
+            UNREGISTERED_STATE.release(self._slot)
+
+    @property
+    def status(self) -> DroneStatus:
+        return _STATUS_BY_CODE[int(self._state.status[self._slot])]
+
+    @property
+    def slot(self) -> int:
+        return self._slot
+
+    @property
+    def last_update(self) -> float | None:
+        # time.monotonic() of the last set_state
+        value = self._state.updated.item(self._slot)
+        return None if value != value else value
+
+    def move_to_state(self, state: SwarmState) -> int:
+        """Move this drone's state into a new slot of state and return the slot."""
+        slot = state.allocate(int(self._state.status[self._slot]))
+        self._state.copy_slot(self._slot, state, slot)
+        self._state.release(self._slot)
+        self._state, self._slot = state, slot
+        return slot
+
+    def set_mavsdk_system(self, mavsdk_system: MAVSDKSystem | None) -> None:
+        # Replace the system and (re)subscribe to its telemetry streams once
+        if self.telemetry is not None:
+            self.telemetry.stop()
+            self.telemetry = None
+        self.mavsdk_system = mavsdk_system
+        if mavsdk_system is not None:
+            self.telemetry = TelemetryHub(mavsdk_system)
+            self.telemetry.start()
+
     def add_status_change_callback(self, callback_fn) -> None:
         self.status_change_callbacks.append(callback_fn)
 
+    def remove_status_change_callback(self, callback_fn) -> None:
+        if callback_fn in self.status_change_callbacks:
+            self.status_change_callbacks.remove(callback_fn)
+
     def add_state_change_callback(self, callback_fn) -> None:
-        self.state_change_callbacks.append(callback_fn)
+        # called on every update that changes the state
+        self.subscribe_state(callback_fn)
+
+    def remove_state_change_callback(self, callback_fn) -> None:
+        for subscription in self.state_subscriptions:
+            if subscription.callback_fn == callback_fn:
+                self.unsubscribe_state(subscription)
+                return
+
+    def subscribe_state(self, callback_fn, **options) -> StateSubscription:
+        """Subscribe to state changes with StateSubscription options, e.g. min_distance_m."""
+        subscription = StateSubscription(callback_fn, **options)
+        self.add_state_subscription(subscription)
+        return subscription
+
+    def add_state_subscription(self, subscription: StateSubscription) -> None:
+        # a subscription may be shared by several drones, e.g. for batched delivery
+        self.state_subscriptions.append(subscription)
+
+    def unsubscribe_state(self, subscription: StateSubscription) -> None:
+        if subscription in self.state_subscriptions:
+            self.state_subscriptions.remove(subscription)
+            subscription.forget(self)
+
+    def add_role_change_callback(self, callback_fn) -> None:
+        self.role_change_callbacks.append(callback_fn)
+
+    def remove_role_change_callback(self, callback_fn) -> None:
+        if callback_fn in self.role_change_callbacks:
+            self.role_change_callbacks.remove(callback_fn)
+
+    def set_role(self, new_role: str | None) -> None:
+        self.role = new_role if new_role is not None else "UNASSIGNED"
+        for callback in self.role_change_callbacks:
+            callback(self, self.role)
 
     def set_status(self, new_status: DroneStatus) -> None:
-        self.status = new_status
+        self._state.status[self._slot] = new_status.value
         for callback in self.status_change_callbacks:
             callback(self, new_status)
 
@@ -50,15 +177,41 @@ class Drone(object):
         lon: float | None,
         alt: float | None,
         heading: float | None,
+        groundspeed: float | None = None,
     ) -> None:
-        self.lat = lat if lat is not None else self.lat
-        self.lon = lon if lon is not None else self.lon
-        self.alt = alt if alt is not None else self.alt
-        self.heading = heading if heading is not None else self.heading
-        for callback in self.state_change_callbacks:
-            callback(self)
+        state, slot = self._state, self._slot
+        if lat is not None:
+            state.lat[slot] = lat
+        if lon is not None:
+            state.lon[slot] = lon
+        if alt is not None:
+            state.alt[slot] = alt
+        if heading is not None:
+            state.heading[slot] = heading
+        if groundspeed is not None:
+            state.groundspeed[slot] = groundspeed
+        now = time.monotonic()
+        state.updated[slot] = now
+        if not self.state_subscriptions:
+            return
+        # read back once for all subscribers, NaN (unknown) as None
+        sample = (now,) + tuple(
+            None if value != value else value
+            for value in (
+                state.lat.item(slot),
+                state.lon.item(slot),
+                state.alt.item(slot),
+                state.heading.item(slot),
+                state.groundspeed.item(slot),
+            )
+        )
+        for subscription in self.state_subscriptions:
+            subscription.offer(self, sample)
 
     async def initialize_state(self) -> None:
+        await self._update_state_from_telemetry()
+
+    async def _update_state_from_telemetry(self) -> None:
         pos = await self.get_one_position()
         heading = await self.get_one_heading()
         self.set_state(
@@ -66,6 +219,7 @@ class Drone(object):
             lon=pos.longitude_deg if pos else None,
             alt=pos.absolute_altitude_m if pos else None,
             heading=heading,
+            groundspeed=self.get_latest_groundspeed(),
         )
 
     def get_state_update_rate(self) -> float | None:
@@ -87,29 +241,34 @@ class Drone(object):
 
     async def _periodic_state_update(self) -> None:
         while True:
-            pos = await self.get_one_position()
-            heading = await self.get_one_heading()
-            self.set_state(
-                lat=pos.latitude_deg if pos else None,
-                lon=pos.longitude_deg if pos else None,
-                alt=pos.absolute_altitude_m if pos else None,
-                heading=heading,
-            )
+            await self._update_state_from_telemetry()
             await asyncio.sleep(self._state_update_rate)
 
+    # Latest samples are served by the telemetry hub; these only wait if no
+    # sample has arrived yet since connecting
     async def get_one_position(self) -> Position:
-        if self.mavsdk_system is None:
+        if self.telemetry is None:
             return None
 
-        async for pos in self.mavsdk_system.telemetry.position():
-            return pos
+        sample = await self.telemetry.wait_latest("position")
+        return sample.value
 
     async def get_one_heading(self) -> float:
-        if self.mavsdk_system is None:
+        if self.telemetry is None:
             return None
 
-        async for heading in self.mavsdk_system.telemetry.heading():
-            return heading.heading_deg
+        sample = await self.telemetry.wait_latest("heading")
+        return sample.value.heading_deg
+
+    def get_latest_groundspeed(self) -> float | None:
+        # Velocity is optional for display, so never wait for a first sample
+        if self.telemetry is None:
+            return None
+
+        velocity = self.telemetry.latest_value("velocity_ned")
+        if velocity is None:
+            return None
+        return math.hypot(velocity.north_m_s, velocity.east_m_s)
 
     async def get_fixedwing_metrics(self) -> dict:
         if self.mavsdk_system is None:
@@ -122,5 +281,5 @@ class Drone(object):
     async def disconnect(self) -> None:
         # It seems there is no explicit disconnect method so we'll let the system be garbage collected
         if self.mavsdk_system is not None:
-            self.mavsdk_system = None
+            self.set_mavsdk_system(None)
         self.set_status(DroneStatus.DISCONNECTED)
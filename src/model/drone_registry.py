@@ -0,0 +1,135 @@
+from typing import Dict, Iterator, List
+
+from model.drone import UNREGISTERED_STATE, Drone, DroneStatus
+from model.swarm_state import StateArrays, SwarmState
+
+
+class DroneRegistry(object):
+    """Drones indexed by id, role and status.
+
+    Every drone gets a stable index when it is added: its slot in the registry's
+    SwarmState. The index, and the gRPC port leased from it (base_port + index), stay
+    the same until that drone is removed. Freed indexes are reused lowest first, so
+    the index says nothing about when a drone was added; registration_sequence() does.
+    Role and status indexes are kept current through the drones' own change callbacks.
+    """
+
+    def __init__(self, base_port: int = 50051):
+        # as seen at https://discuss.px4.io/t/mavsdk-multiple-drones-problem/44693/2
+        # port 50051 is just a starting port so that each System instance uses a
+        # different port to avoid conflicts
+        self.base_port = base_port
+        self._drones: Dict[str, Drone] = {}
+        self._index_by_id: Dict[str, int] = {}
+        self._sequence_by_id: Dict[str, int] = {}  # drone_id -> order of registration
+        self._next_sequence = 0
+        self.state = SwarmState()
+        # role/status -> {drone_id: drone}; dicts keep insertion order and O(1) removal
+        self._by_role: Dict[str, Dict[str, Drone]] = {}
+        self._by_status: Dict[DroneStatus, Dict[str, Drone]] = {}
+        self._role_by_id: Dict[str, str] = {}
+        self._status_by_id: Dict[str, DroneStatus] = {}
+
+    def __len__(self) -> int:
+        return len(self._drones)
+
+    def __contains__(self, drone_id: str) -> bool:
+        return drone_id in self._drones
+
+    def __iter__(self) -> Iterator[Drone]:
+        return iter(self._drones.values())
+
+    def add(self, drone: Drone) -> bool:
+        if drone.drone_id in self._drones:
+            return False
+        self._drones[drone.drone_id] = drone
+        self._index_by_id[drone.drone_id] = drone.move_to_state(self.state)
+        self._sequence_by_id[drone.drone_id] = self._next_sequence
+        self._next_sequence += 1
+
+        self._index_role(drone, drone.role)
+        self._index_status(drone, drone.status)
+        drone.add_role_change_callback(self._drone_role_changed)
+        drone.add_status_change_callback(self._drone_status_changed)
+        return True
+
+    def remove(self, drone_id: str) -> Drone | None:
+        drone = self._drones.pop(drone_id, None)
+        if drone is None:
+            return None
+        drone.remove_role_change_callback(self._drone_role_changed)
+        drone.remove_status_change_callback(self._drone_status_changed)
+        self._unindex_role(drone)
+        self._unindex_status(drone)
+        del self._index_by_id[drone_id]
+        del self._sequence_by_id[drone_id]
+        drone.move_to_state(UNREGISTERED_STATE)
+        return drone
+
+    def get(self, drone_id: str) -> Drone | None:
+        return self._drones.get(drone_id)
+
+    def all(self) -> List[Drone]:
+        return list(self._drones.values())
+
+    def ids(self) -> List[str]:
+        return list(self._drones.keys())
+
+    def by_role(self, role: str) -> List[Drone]:
+        return list(self._by_role.get(role, {}).values())
+
+    def by_status(self, status: DroneStatus) -> List[Drone]:
+        return list(self._by_status.get(status, {}).values())
+
+    def count_by_status(self, status: DroneStatus) -> int:
+        return len(self._by_status.get(status, {}))
+
+    def arrays(self) -> StateArrays:
+        """Zero-copy views of every drone's state, indexed by index_of(drone)."""
+        return self.state.arrays()
+
+    def drones_by_index(self) -> List[Drone | None]:
+        # aligned with arrays(); None for free indexes
+        drones = [None] * len(self.arrays().status)
+        for drone_id, index in self._index_by_id.items():
+            drones[index] = self._drones[drone_id]
+        return drones
+
+    def index_of(self, drone: Drone) -> int:
+        return self._index_by_id.get(drone.drone_id, -1)
+
+    def registration_sequence(self, drone: Drone) -> int:
+        # grows with every add(), so a later registered drone has a higher one
+        return self._sequence_by_id.get(drone.drone_id, -1)
+
+    def port_of(self, drone: Drone) -> int:
+        index = self.index_of(drone)
+        if index < 0:
+            raise KeyError(f"Drone {drone.drone_id} is not registered")
+        return self.base_port + index
+
+    def _drone_role_changed(self, drone: Drone, new_role: str) -> None:
+        self._unindex_role(drone)
+        self._index_role(drone, new_role)
+
+    def _drone_status_changed(self, drone: Drone, new_status: DroneStatus) -> None:
+        self._unindex_status(drone)
+        self._index_status(drone, new_status)
+
+    def _index_role(self, drone: Drone, role: str) -> None:
+        self._role_by_id[drone.drone_id] = role
+        self._by_role.setdefault(role, {})[drone.drone_id] = drone
+
+    def _unindex_role(self, drone: Drone) -> None:
+        role = self._role_by_id.pop(drone.drone_id, None)
+        if role is not None:
+            self._by_role[role].pop(drone.drone_id, None)
+
+    def _index_status(self, drone: Drone, status: DroneStatus) -> None:
+        self._status_by_id[drone.drone_id] = status
+        self._by_status.setdefault(status, {})[drone.drone_id] = drone
+
+    def _unindex_status(self, drone: Drone) -> None:
+        status = self._status_by_id.pop(drone.drone_id, None)
+        if status is not None:
+            self._by_status[status].pop(drone.drone_id, None)
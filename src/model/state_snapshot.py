@@ -0,0 +1,79 @@
+from collections import deque
+from typing import Dict, List
+
+from model.drone import Drone, DroneStatus
+
+
+class DroneSnapshot(object):
+    """Copy of the drone fields the GUI displays, taken on the controller thread.
+
+    Has the same attribute names as Drone, so GUI callbacks can take either.
+    """
+
+    __slots__ = (
+        "drone_id",
+        "role",
+        "status",
+        "lat",
+        "lon",
+        "alt",
+        "heading",
+        "groundspeed",
+    )
+
+    def __init__(self, drone: Drone):
+        self.drone_id = drone.drone_id
+        self.role = drone.role
+        self.status = drone.status
+        self.lat = drone.lat
+        self.lon = drone.lon
+        self.alt = drone.alt
+        self.heading = drone.heading
+        self.groundspeed = drone.groundspeed
+
+
+class SnapshotBuffer(object):
+    """Hands the latest state of each drone from the controller thread to the GUI thread.
+
+    The controller side only stores a snapshot per drone and queues its id if not
+    queued yet; the GUI side drains the queued ids once per frame. Each step is a
+    single dict, set or deque operation, which the GIL makes atomic, so neither side
+    takes a lock and the buffer never holds more than one entry per drone however far
+    the GUI falls behind.
+    """
+
+    def __init__(self):
+        self._latest: Dict[str, DroneSnapshot] = {}
+        self._queued = set()
+        self._queue = deque()
+        self.snapshots_written = 0
+
+    def attach(self, drone: Drone) -> None:
+        drone.add_state_change_callback(self.write)
+        drone.add_status_change_callback(self._write_status)
+        self.write(drone)
+
+    def detach(self, drone: Drone) -> None:
+        drone.remove_state_change_callback(self.write)
+        drone.remove_status_change_callback(self._write_status)
+
+    def write(self, drone: Drone) -> None:
+        # controller thread; store before queueing so a drain always sees this snapshot
+        self._latest[drone.drone_id] = DroneSnapshot(drone)
+        self.snapshots_written += 1
+        if drone.drone_id not in self._queued:
+            self._queued.add(drone.drone_id)
+            self._queue.append(drone.drone_id)
+
+    def _write_status(self, drone: Drone, new_status: DroneStatus) -> None:
+        self.write(drone)
+
+    def drain(self) -> List[DroneSnapshot]:
+        """GUI thread: the latest snapshot of every drone written since the last drain."""
+        snapshots = []
+        for _ in range(len(self._queue)):
+            drone_id = self._queue.popleft()
+            # un-queue before reading, so a write racing with this drain re-queues
+            self._queued.discard(drone_id)
+            snapshots.append(self._latest[drone_id])
+        return snapshots
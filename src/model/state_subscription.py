@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+from utils.geo_tools import heading_difference_deg, latlon_to_local_m
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SubscriptionStats:
+    delivered: int = 0  # callback calls; one per batch for batched subscriptions
+    skipped: int = 0  # updates filtered out by the interval or thresholds
+    errors: int = 0
+    dispatch_sec_total: float = 0.0
+    dispatch_sec_max: float = 0.0
+
+    @property
+    def mean_dispatch_sec(self) -> float:
+        return self.dispatch_sec_total / self.delivered if self.delivered else 0.0
+
+
+class StateSubscription(object):
+    """A state change subscriber with its own delivery options.
+
+    An update of a drone is delivered if at least min_interval_sec passed since the
+    last delivery for that drone and the drone has moved past at least one of the
+    thresholds that are set (> 0) since the state last delivered. With no thresholds
+    set any change counts, so by default every update that changes something is
+    delivered and repeats are not. An update held back only by the interval is
+    delivered once the interval is over, unless a newer one replaces it, so the
+    last state a drone settles in always reaches the subscriber.
+
+    The callback takes the drone, or with batched a list of every drone that passed
+    the filter since the last batch, delivered at most every min_interval_sec (the
+    interval then applies to the batch, not per drone). One subscription may be
+    added to many drones. Exceptions raised by the callback are logged and counted
+    in stats, never propagated to the telemetry loop.
+    """
+
+    def __init__(
+        self,
+        callback_fn: Callable,
+        min_interval_sec: float = 0.0,
+        min_distance_m: float = 0.0,
+        min_altitude_change_m: float = 0.0,
+        min_heading_change_deg: float = 0.0,
+        min_speed_change_m_s: float = 0.0,
+        batched: bool = False,
+        name: str | None = None,
+    ):
+        self.callback_fn = callback_fn
+        self.min_interval_sec = min_interval_sec
+        self.min_distance_m = min_distance_m
+        self.min_altitude_change_m = min_altitude_change_m
+        self.min_heading_change_deg = min_heading_change_deg
+        self.min_speed_change_m_s = min_speed_change_m_s
+        self.batched = batched
+        self._has_thresholds = (
+            min_distance_m > 0.0
+            or min_altitude_change_m > 0.0
+            or min_heading_change_deg > 0.0
+            or min_speed_change_m_s > 0.0
+        )
+        self.name = name if name is not None else getattr(callback_fn, "__qualname__", "state")
+        self.stats = SubscriptionStats()
+        # drone_id -> (time, lat, lon, alt, heading, groundspeed) last delivered
+        self._delivered: Dict[str, Tuple] = {}
+        self._pending = {}  # drone_id -> drone waiting for the next batch
+        # drone_id -> (drone, state) held back by min_interval_sec, and its timer
+        self._trailing: Dict[str, Tuple] = {}
+        self._trailing_handles: Dict[str, asyncio.TimerHandle] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._last_flush = -math.inf
+
+    def offer(self, drone, state: Tuple | None = None) -> None:
+        """Called by Drone.set_state; delivers or drops the update.
+
+        state is (time.monotonic(), lat, lon, alt, heading, groundspeed) of the update,
+        read from the drone if not given.
+        """
+        if state is None:
+            state = (time.monotonic(), drone.lat, drone.lon, drone.alt, drone.heading)
+            state += (drone.groundspeed,)
+        now = state[0]
+        last = self._delivered.get(drone.drone_id)
+        if last is not None:
+            if not self._changed(last, state):
+                self.stats.skipped += 1
+                # the subscriber already has this state, nothing left to catch up on
+                self._cancel_trailing(drone.drone_id)
+                return
+            if not self.batched and now - last[0] < self.min_interval_sec:
+                self.stats.skipped += 1
+                self._defer(drone, state, last[0] + self.min_interval_sec - now)
+                return
+        self._cancel_trailing(drone.drone_id)
+        self._delivered[drone.drone_id] = state
+        if not self.batched:
+            self._dispatch(drone)
+            return
+        self._pending[drone.drone_id] = drone
+        if self._flush_handle is None:
+            self._schedule_flush(now)
+
+    def forget(self, drone) -> None:
+        self._delivered.pop(drone.drone_id, None)
+        self._pending.pop(drone.drone_id, None)
+        self._cancel_trailing(drone.drone_id)
+
+    def cancel(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending.clear()
+        for drone_id in list(self._trailing_handles):
+            self._cancel_trailing(drone_id)
+
+    def flush(self) -> None:
+        """Deliver the pending batch now."""
+        self._flush_handle = None
+        if not self._pending:
+            return
+        drones = list(self._pending.values())
+        self._pending.clear()
+        self._last_flush = time.monotonic()
+        self._dispatch(drones)
+
+    def _changed(self, last: Tuple, state: Tuple) -> bool:
+        _, lat0, lon0, alt0, heading0, speed0 = last
+        _, lat, lon, alt, heading, speed = state
+        if not self._has_thresholds:
+            return last[1:] != state[1:]
+        if 0.0 < self.min_distance_m <= _moved_m(lat0, lon0, lat, lon):
+            return True
+        if 0.0 < self.min_altitude_change_m <= _delta(alt0, alt):
+            return True
+        if self.min_heading_change_deg > 0.0 and heading is not None and heading0 is not None:
+            # shortest way round, so 359 -> 1 is a 2 degree change
+            if heading_difference_deg(heading, heading0) >= self.min_heading_change_deg:
+                return True
+        return 0.0 < self.min_speed_change_m_s <= _delta(speed0, speed)
+
+    def _defer(self, drone, state: Tuple, delay: float) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no event loop to tick on (e.g. a blocking replay), drop it as before
+        # keep only the latest held back state; one timer per drone
+        self._trailing[drone.drone_id] = (drone, state)
+        if drone.drone_id in self._trailing_handles:
+            return
+        self._trailing_handles[drone.drone_id] = loop.call_later(
+            max(0.0, delay), self._deliver_trailing, drone.drone_id
+        )
+
+    def _deliver_trailing(self, drone_id: str) -> None:
+        self._trailing_handles.pop(drone_id, None)
+        trailing = self._trailing.pop(drone_id, None)
+        if trailing is None:
+            return
+        drone, state = trailing
+        # the interval runs from now, when the state is actually delivered
+        self._delivered[drone_id] = (time.monotonic(),) + state[1:]
+        self._dispatch(drone)
+
+    def _cancel_trailing(self, drone_id: str) -> None:
+        self._trailing.pop(drone_id, None)
+        handle = self._trailing_handles.pop(drone_id, None)
+        if handle is not None:
+            handle.cancel()
+
+    def _schedule_flush(self, now: float) -> None:
+        delay = max(0.0, self._last_flush + self.min_interval_sec - now)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # no event loop to tick on (e.g. a blocking replay), deliver right away
+            self.flush()
+            return
+        self._flush_handle = loop.call_later(delay, self.flush)
+
+    def _dispatch(self, arg) -> None:
+        start = time.perf_counter()
+        try:
+            self.callback_fn(arg)
+        except Exception:
+            self.stats.errors += 1
+            # log the first failure in full, then only every 100th
+            if self.stats.errors == 1 or self.stats.errors % 100 == 0:
+                logger.exception(
+                    f"State subscriber {self.name} failed ({self.stats.errors} errors)"
+                )
+        elapsed = time.perf_counter() - start
+        self.stats.delivered += 1
+        self.stats.dispatch_sec_total += elapsed
+        if elapsed > self.stats.dispatch_sec_max:
+            self.stats.dispatch_sec_max = elapsed
+
+
+def _moved_m(lat0, lon0, lat, lon) -> float:
+    if None in (lat0, lon0, lat, lon):
+        return 0.0 if (lat0, lon0) == (lat, lon) else math.inf
+    return math.hypot(*latlon_to_local_m(lat, lon, lat0, lon0))
+
+
+def _delta(old: float | None, new: float | None) -> float:
+    if old is None or new is None:
+        return 0.0 if old is new else math.inf
+    return abs(new - old)
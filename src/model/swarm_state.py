@@ -0,0 +1,95 @@
+import heapq
+from typing import List, NamedTuple
+
+import numpy as np
+
+# status codes are DroneStatus values; 0 marks a free slot
+FREE_SLOT = 0
+
+
+class StateArrays(NamedTuple):
+    """Read-only views of a SwarmState, one element per slot up to the highest in use.
+
+    The views share memory with the store, so they see later updates without
+    copying, until the store grows; take a new view after adding drones. Slots
+    that are free have status FREE_SLOT; unknown values are NaN.
+    """
+
+    lat: np.ndarray
+    lon: np.ndarray
+    alt: np.ndarray
+    heading: np.ndarray
+    groundspeed: np.ndarray
+    status: np.ndarray
+    updated: np.ndarray  # time.monotonic() of the last set_state, NaN if never
+
+    @property
+    def active(self) -> np.ndarray:
+        return self.status != FREE_SLOT
+
+
+class SwarmState(object):
+    """State of a swarm as NumPy arrays indexed by drone slot.
+
+    Drones are views into one slot each, so swarm-wide calculations run on whole
+    arrays instead of looping over Drone objects. A slot costs 49 bytes. Freed slots
+    are reused lowest first, which keeps the arrays dense.
+    """
+
+    FIELDS = ("lat", "lon", "alt", "heading", "groundspeed", "updated")
+
+    def __init__(self, capacity: int = 64):
+        capacity = max(1, capacity)
+        for name in self.FIELDS:
+            setattr(self, name, np.full(capacity, np.nan))
+        self.status = np.zeros(capacity, dtype=np.int8)
+        self._free_slots: List[int] = []  # min-heap of released slots
+        self._next_slot = 0
+
+    def __len__(self) -> int:
+        return self._next_slot - len(self._free_slots)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.status)
+
+    def allocate(self, status_code: int) -> int:
+        if self._free_slots:
+            slot = heapq.heappop(self._free_slots)
+        else:
+            slot = self._next_slot
+            self._next_slot += 1
+            if slot >= self.capacity:
+                self._grow(2 * self.capacity)
+        self.status[slot] = status_code
+        return slot
+
+    def release(self, slot: int) -> None:
+        for name in self.FIELDS:
+            getattr(self, name)[slot] = np.nan
+        self.status[slot] = FREE_SLOT
+        heapq.heappush(self._free_slots, slot)
+
+    def copy_slot(self, slot: int, other: "SwarmState", other_slot: int) -> None:
+        """Copy one drone's state into other_slot of another store."""
+        for name in self.FIELDS:
+            getattr(other, name)[other_slot] = getattr(self, name)[slot]
+        other.status[other_slot] = self.status[slot]
+
+    def arrays(self) -> StateArrays:
+        """Zero-copy read-only views of every field, see StateArrays."""
+        views = []
+        for name in self.FIELDS[:5] + ("status", "updated"):
+            view = getattr(self, name)[: self._next_slot]
+            view.flags.writeable = False
+            views.append(view)
+        return StateArrays(*views)
+
+    def _grow(self, capacity: int) -> None:
+        for name in self.FIELDS:
+            grown = np.full(capacity, np.nan)
+            grown[: self.capacity] = getattr(self, name)
+            setattr(self, name, grown)
+        status = np.zeros(capacity, dtype=np.int8)
+        status[: self.capacity] = self.status
+        self.status = status
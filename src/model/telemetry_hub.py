@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable
+
+from mavsdk import System as MAVSDKSystem
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetrySample(object):
+    """The latest value received on a telemetry stream and when it arrived."""
+
+    __slots__ = ("value", "timestamp")
+
+    def __init__(self, value: Any, timestamp: float):
+        self.value = value
+        # time.monotonic() at the moment the sample was received
+        self.timestamp: float = timestamp
+
+    def age(self, now: float | None = None) -> float:
+        now = now if now is not None else time.monotonic()
+        return now - self.timestamp
+
+
+class TelemetryHub(object):
+    """Long-lived telemetry subscriptions for one MAVSDK System.
+
+    Each stream (e.g. "position", "heading") is subscribed to exactly once and the
+    latest sample is kept together with its arrival time, so reads are served from
+    memory instead of opening a new gRPC stream against mavsdk_server every time.
+    """
+
+    DEFAULT_STREAMS = ("position", "heading", "velocity_ned")
+
+    def __init__(
+        self,
+        mavsdk_system: MAVSDKSystem,
+        streams: Iterable[str] = DEFAULT_STREAMS,
+        resubscribe_delay_sec: float = 1.0,
+    ):
+        self.mavsdk_system: MAVSDKSystem = mavsdk_system
+        self.streams = tuple(streams)
+        self.resubscribe_delay_sec = resubscribe_delay_sec
+        self._latest: Dict[str, TelemetrySample] = {}
+        self.sample_counts: Dict[str, int] = {}  # samples received per stream
+        self.started_at: float | None = None  # time.monotonic() of start()
+        self._first_sample_events: Dict[str, asyncio.Event] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._sample_listeners = []
+        self._waiters = []  # (predicate, future) pairs, see wait_until()
+
+    def is_running(self) -> bool:
+        return len(self._tasks) > 0
+
+    def start(self) -> None:
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        for name in self.streams:
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._consume(name))
+
+    def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    def add_sample_listener(self, listener_fn: Callable[[str, TelemetrySample], None]):
+        # listener_fn(stream_name, sample) is called for every received sample
+        self._sample_listeners.append(listener_fn)
+
+    def remove_sample_listener(self, listener_fn) -> None:
+        if listener_fn in self._sample_listeners:
+            self._sample_listeners.remove(listener_fn)
+
+    def latest(self, name: str) -> TelemetrySample | None:
+        return self._latest.get(name)
+
+    def latest_value(self, name: str) -> Any:
+        sample = self._latest.get(name)
+        return sample.value if sample is not None else None
+
+    async def wait_latest(
+        self, name: str, timeout: float | None = None
+    ) -> TelemetrySample:
+        """Return the latest sample, waiting for the first one if none arrived yet."""
+        sample = self._latest.get(name)
+        if sample is not None:
+            return sample
+        if name not in self._first_sample_events:
+            self._first_sample_events[name] = asyncio.Event()
+        await asyncio.wait_for(self._first_sample_events[name].wait(), timeout)
+        return self._latest[name]
+
+    async def wait_until(
+        self,
+        predicate: Callable[["TelemetryHub"], bool],
+        timeout: float | None = None,
+    ) -> float:
+        """Wait for the first telemetry sample after which predicate(hub) is true.
+
+        The predicate is evaluated as samples arrive instead of on a timer, so any
+        number of concurrent waiters share the hub's subscriptions. Returns the
+        monotonic timestamp of the satisfying sample; raises TimeoutError.
+        """
+        if predicate(self):
+            return time.monotonic()
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (predicate, future)
+        self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    async def _consume(self, name: str) -> None:
+        stream_fn = getattr(self.mavsdk_system.telemetry, name)
+        while True:
+            try:
+                async for value in stream_fn():
+                    self._publish(name, value)
+                logger.warning(f"Telemetry stream '{name}' ended, resubscribing")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Telemetry stream '{name}' failed: {e}")
+            await asyncio.sleep(self.resubscribe_delay_sec)
+
+    def _publish(self, name: str, value: Any) -> None:
+        sample = TelemetrySample(value, time.monotonic())
+        self._latest[name] = sample
+        self.sample_counts[name] = self.sample_counts.get(name, 0) + 1
+
+        first_sample_event = self._first_sample_events.get(name)
+        if first_sample_event is not None and not first_sample_event.is_set():
+            first_sample_event.set()
+
+        if self._waiters:
+            self._resolve_waiters(sample)
+
+        for listener in tuple(self._sample_listeners):
+            try:
+                listener(name, sample)
+            except Exception:
+                # a broken listener must not tear down the subscription
+                logger.exception(f"Telemetry listener failed on '{name}' sample")
+
+    def _resolve_waiters(self, sample: TelemetrySample) -> None:
+        for waiter in tuple(self._waiters):
+            predicate, future = waiter
+            if future.done():
+                continue
+            try:
+                if predicate(self):
+                    future.set_result(sample.timestamp)
+                    self._waiters.remove(waiter)
+            except Exception as e:
+                future.set_exception(e)
+                self._waiters.remove(waiter)
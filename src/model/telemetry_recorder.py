@@ -0,0 +1,360 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from model.drone import Drone, DroneStatus
+
+logger = logging.getLogger(__name__)
+
+# (name, dtype) of every recorded column
+COLUMNS = (
+    ("t", "f8"),  # unix time, seconds
+    ("lat", "f8"),
+    ("lon", "f8"),
+    ("alt", "f4"),
+    ("heading", "f4"),
+    ("status", "u1"),  # DroneStatus.value, 0 if unknown
+)
+MANIFEST_FILE = "manifest.json"
+
+
+def _chunk_path(root: Path, drone_slot: int, chunk_no: int, column: str) -> Path:
+    return root / f"{drone_slot:05d}" / f"{chunk_no:06d}.{column}"
+
+
+class TelemetrySeries(object):
+    """Recorded columns of one drone, as NumPy arrays (views where possible)."""
+
+    __slots__ = [name for name, _ in COLUMNS]
+
+    def __init__(self, **columns):
+        for name, _ in COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+
+class _OpenChunk(object):
+    def __init__(self, root: Path, drone_slot: int, chunk_no: int, capacity: int):
+        self.drone_slot = drone_slot
+        self.chunk_no = chunk_no
+        self.capacity = capacity
+        self.rows = 0
+        self.columns = {}
+        os.makedirs(root / f"{drone_slot:05d}", exist_ok=True)
+        for name, dtype in COLUMNS:
+            self.columns[name] = np.memmap(
+                _chunk_path(root, drone_slot, chunk_no, name),
+                dtype=dtype,
+                mode="w+",
+                shape=(capacity,),
+            )
+
+    def manifest_entry(self) -> dict:
+        t = self.columns["t"]
+        return {
+            "chunk": self.chunk_no,
+            "capacity": self.capacity,
+            "rows": self.rows,
+            "t_min": float(t[0]) if self.rows else None,
+            "t_max": float(t[self.rows - 1]) if self.rows else None,
+        }
+
+    def flush(self) -> None:
+        for column in self.columns.values():
+            column.flush()
+
+    def close(self) -> None:
+        self.flush()
+        # drop the mappings so a finished chunk no longer counts against memory
+        self.columns.clear()
+
+
+class TelemetryRecorder(object):
+    """Records (t, lat, lon, alt, heading, status) of every drone to disk.
+
+    Rows are appended to per-drone, per-column memory-mapped chunk files of a fixed
+    number of rows. record() only appends to an in-memory queue; a background thread
+    writes the queue to disk, so the asyncio/Qt loop never waits on I/O. Finished
+    chunks are unmapped, so memory use does not grow with the length of a session.
+    Read recordings back with TelemetryRecording.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        chunk_rows: int = 4096,
+        flush_interval_sec: float = 0.5,
+        max_pending_rows: int = 1_000_000,
+    ):
+        self.root = Path(directory)
+        self.chunk_rows = chunk_rows
+        self.flush_interval_sec = flush_interval_sec
+        self.max_pending_rows = max_pending_rows
+        self.dropped_rows = 0
+        os.makedirs(self.root, exist_ok=True)
+
+        self._slots: Dict[str, int] = {}  # drone_id -> slot (directory) number
+        self._chunks: Dict[str, List[dict]] = {}  # drone_id -> closed chunk entries
+        self._open_chunks: Dict[str, _OpenChunk] = {}
+        # deque append/popleft are atomic, so the loop and writer thread need no lock
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._flushed = threading.Condition()
+        self._flush_requests = 0
+        self._flushes_done = 0
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="telemetry-recorder", daemon=True
+        )
+        self._writer.start()
+
+    def attach(self, drone: Drone) -> None:
+        drone.add_state_change_callback(self.record)
+        drone.add_status_change_callback(self._record_status)
+
+    def detach(self, drone: Drone) -> None:
+        drone.remove_state_change_callback(self.record)
+        drone.remove_status_change_callback(self._record_status)
+
+    def attach_all(self, drones: Iterable[Drone]) -> None:
+        for drone in drones:
+            self.attach(drone)
+
+    def record(self, drone: Drone) -> None:
+        if len(self._pending) >= self.max_pending_rows:
+            self.dropped_rows += 1
+            return
+        self._pending.append(
+            (
+                drone.drone_id,
+                (
+                    time.time(),
+                    _or_nan(drone.lat),
+                    _or_nan(drone.lon),
+                    _or_nan(drone.alt),
+                    _or_nan(drone.heading),
+                    drone.status.value if drone.status is not None else 0,
+                ),
+            )
+        )
+
+    def _record_status(self, drone: Drone, new_status: DroneStatus) -> None:
+        self.record(drone)
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until everything recorded so far is on disk and in the manifest."""
+        with self._flushed:
+            self._flush_requests += 1
+            target = self._flush_requests
+            self._wake.set()
+            self._flushed.wait_for(lambda: self._flushes_done >= target, timeout)
+
+    def close(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+        self._writer.join()
+
+    def _writer_loop(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval_sec)
+            self._wake.clear()
+            with self._flushed:
+                flush_requests = self._flush_requests
+            stopping = self._stopping.is_set()
+
+            try:
+                self._drain()
+                if stopping or flush_requests > self._flushes_done:
+                    for chunk in self._open_chunks.values():
+                        chunk.flush()
+                    self._write_manifest()
+            except Exception:
+                logger.exception("Telemetry recorder failed to write")
+
+            with self._flushed:
+                self._flushes_done = flush_requests
+                self._flushed.notify_all()
+            if stopping:
+                for chunk in self._open_chunks.values():
+                    chunk.close()
+                return
+
+    def _drain(self) -> None:
+        rows_by_drone: Dict[str, list] = {}
+        while True:
+            try:
+                drone_id, row = self._pending.popleft()
+            except IndexError:
+                break
+            rows_by_drone.setdefault(drone_id, []).append(row)
+
+        manifest_dirty = False
+        for drone_id, rows in rows_by_drone.items():
+            manifest_dirty |= self._write_rows(drone_id, rows)
+        if manifest_dirty:
+            self._write_manifest()
+
+    def _write_rows(self, drone_id: str, rows: list) -> bool:
+        # returns True if a chunk was finished while writing
+        columns = list(zip(*rows))
+        written = 0
+        chunk_finished = False
+        while written < len(rows):
+            chunk = self._open_chunk(drone_id)
+            count = min(len(rows) - written, chunk.capacity - chunk.rows)
+            for (name, _), values in zip(COLUMNS, columns):
+                chunk.columns[name][chunk.rows : chunk.rows + count] = values[
+                    written : written + count
+                ]
+            chunk.rows += count
+            written += count
+            if chunk.rows == chunk.capacity:
+                self._chunks[drone_id].append(chunk.manifest_entry())
+                chunk.close()
+                del self._open_chunks[drone_id]
+                chunk_finished = True
+        return chunk_finished
+
+    def _open_chunk(self, drone_id: str) -> _OpenChunk:
+        chunk = self._open_chunks.get(drone_id)
+        if chunk is None:
+            if drone_id not in self._slots:
+                self._slots[drone_id] = len(self._slots)
+                self._chunks[drone_id] = []
+            chunk = _OpenChunk(
+                self.root,
+                self._slots[drone_id],
+                len(self._chunks[drone_id]),
+                self.chunk_rows,
+            )
+            self._open_chunks[drone_id] = chunk
+        return chunk
+
+    def _write_manifest(self) -> None:
+        # the open chunk's entry is rewritten each time with its current row count
+        drones = {}
+        for drone_id, slot in self._slots.items():
+            chunks = list(self._chunks[drone_id])
+            open_chunk = self._open_chunks.get(drone_id)
+            if open_chunk is not None and open_chunk.rows:
+                chunks.append(open_chunk.manifest_entry())
+            drones[drone_id] = {"slot": slot, "chunks": chunks}
+        manifest = {"columns": [list(c) for c in COLUMNS], "drones": drones}
+        tmp_path = self.root / (MANIFEST_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.root / MANIFEST_FILE)
+
+
+class TelemetryRecording(object):
+    """Read-only access to a directory written by TelemetryRecorder."""
+
+    def __init__(self, directory: str):
+        self.root = Path(directory)
+        self.reload()
+
+    def reload(self) -> None:
+        # re-read the manifest, e.g. to see rows flushed by a live recorder
+        with open(self.root / MANIFEST_FILE) as f:
+            self.manifest = json.load(f)
+        self._memmaps = {}
+
+    def drone_ids(self) -> List[str]:
+        return list(self.manifest["drones"].keys())
+
+    def time_range(self) -> tuple:
+        t_mins, t_maxs = [], []
+        for drone in self.manifest["drones"].values():
+            for chunk in drone["chunks"]:
+                t_mins.append(chunk["t_min"])
+                t_maxs.append(chunk["t_max"])
+        if not t_mins:
+            return None, None
+        return min(t_mins), max(t_maxs)
+
+    def query(
+        self,
+        t_start: float | None = None,
+        t_end: float | None = None,
+        drone_ids: Iterable[str] | None = None,
+        max_points: int | None = None,
+    ) -> Dict[str, TelemetrySeries]:
+        """Rows with t_start <= t <= t_end for the given drones (default all).
+
+        max_points downsamples each drone's series by striding. Results are views
+        into the memory-mapped files when the range falls inside one chunk; ranges
+        spanning several chunks are concatenated into new arrays.
+        """
+        drone_ids = list(drone_ids) if drone_ids is not None else self.drone_ids()
+        result = {}
+        for drone_id in drone_ids:
+            entry = self.manifest["drones"].get(drone_id)
+            if entry is None:
+                continue
+            segments = []
+            for chunk in entry["chunks"]:
+                if not chunk["rows"]:
+                    continue
+                if t_start is not None and chunk["t_max"] < t_start:
+                    continue
+                if t_end is not None and chunk["t_min"] > t_end:
+                    continue
+                segments.append(self._slice_chunk(entry["slot"], chunk, t_start, t_end))
+            result[drone_id] = self._join(segments, max_points)
+        return result
+
+    def _slice_chunk(self, slot: int, chunk: dict, t_start, t_end) -> dict:
+        t = self._column(slot, chunk, "t")
+        # rows are appended in time order, so the time index is a binary search
+        lo = 0 if t_start is None else int(np.searchsorted(t, t_start, side="left"))
+        hi = chunk["rows"] if t_end is None else int(
+            np.searchsorted(t, t_end, side="right")
+        )
+        return {name: self._column(slot, chunk, name)[lo:hi] for name, _ in COLUMNS}
+
+    def _column(self, slot: int, chunk: dict, name: str) -> np.ndarray:
+        key = (slot, chunk["chunk"], name)
+        column = self._memmaps.get(key)
+        if column is None:
+            dtype = dict(COLUMNS)[name]
+            column = np.memmap(
+                _chunk_path(self.root, slot, chunk["chunk"], name),
+                dtype=dtype,
+                mode="r",
+                shape=(chunk["capacity"],),
+            )
+            self._memmaps[key] = column
+        return column[: chunk["rows"]]
+
+    @staticmethod
+    def _join(segments: List[dict], max_points: int | None) -> TelemetrySeries:
+        total = sum(len(s["t"]) for s in segments)
+        step = 1
+        if max_points is not None and max_points > 0 and total > max_points:
+            step = math.ceil(total / max_points)
+
+        if len(segments) == 1:
+            return TelemetrySeries(**{k: v[::step] for k, v in segments[0].items()})
+
+        columns = {}
+        for name, dtype in COLUMNS:
+            if segments:
+                joined = np.concatenate([s[name] for s in segments])
+                columns[name] = joined[::step]
+            else:
+                columns[name] = np.empty(0, dtype=dtype)
+        return TelemetrySeries(**columns)
+
+
+def _or_nan(value: float | None) -> float:
+    return value if value is not None else math.nan
@@ -0,0 +1,268 @@
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Iterable, List
+
+import numpy as np
+
+from model.drone import Drone, DroneStatus
+from model.telemetry_recorder import TelemetryRecording
+
+REPLAY_ROLE = "REPLAY"
+
+
+class ReplayTrace(object):
+    """Time-ordered telemetry events of many drones, stored column-wise.
+
+    t is in seconds from the start of the trace. status holds DroneStatus values,
+    0 where the event carries no status.
+    """
+
+    def __init__(
+        self,
+        drone_ids: List[str],
+        t: np.ndarray,
+        drone_index: np.ndarray,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        alt: np.ndarray,
+        heading: np.ndarray,
+        status: np.ndarray,
+    ):
+        self.drone_ids = drone_ids
+        self.t = t
+        self.drone_index = drone_index
+        self.lat = lat
+        self.lon = lon
+        self.alt = alt
+        self.heading = heading
+        self.status = status
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    @property
+    def duration_sec(self) -> float:
+        return float(self.t[-1]) if len(self.t) else 0.0
+
+    @classmethod
+    def from_recording(
+        cls,
+        recording: TelemetryRecording,
+        t_start: float | None = None,
+        t_end: float | None = None,
+        drone_ids: Iterable[str] | None = None,
+    ) -> "ReplayTrace":
+        series = recording.query(t_start, t_end, drone_ids)
+        ids = [drone_id for drone_id, s in series.items() if len(s)]
+        if not ids:
+            return cls._empty([])
+
+        columns = {
+            name: np.concatenate([getattr(series[i], name) for i in ids])
+            for name in ("t", "lat", "lon", "alt", "heading", "status")
+        }
+        drone_index = np.concatenate(
+            [np.full(len(series[i]), n, dtype=np.int32) for n, i in enumerate(ids)]
+        )
+        # merge the per-drone series into one timeline; stable keeps each drone's order
+        order = np.argsort(columns["t"], kind="stable")
+        t = columns["t"][order]
+        return cls(
+            ids,
+            t - t[0],
+            drone_index[order],
+            columns["lat"][order],
+            columns["lon"][order],
+            columns["alt"][order].astype(np.float64),
+            columns["heading"][order].astype(np.float64),
+            columns["status"][order],
+        )
+
+    @classmethod
+    def synthetic(
+        cls,
+        drone_count: int,
+        duration_sec: float = 60.0,
+        rate_hz: float = 10.0,
+        center_lat: float = 32.0617,
+        center_lon: float = 118.7795,
+        radius_m: float = 80.0,
+        seed: int = 0,
+    ) -> "ReplayTrace":
+        """Drones flying circles around a center point.
+
+        Each drone reports at rate_hz with a random phase. Drones take off
+        (AIRBORNE) with their first event and report LANDED with their last one.
+        """
+        rng = random.Random(seed)
+        drone_ids = [f"replay{i:04d}" for i in range(drone_count)]
+        samples = max(2, int(duration_sec * rate_hz))
+        step = 1.0 / rate_hz
+
+        t_rows, index_rows, lat_rows, lon_rows, alt_rows, heading_rows = (
+            [], [], [], [], [], []
+        )
+        meters_per_deg_lat = 111_320.0
+        meters_per_deg_lon = meters_per_deg_lat * math.cos(math.radians(center_lat))
+        for n in range(drone_count):
+            offset = rng.uniform(0.0, step)
+            radius = rng.uniform(0.2, 1.0) * radius_m
+            phase = rng.uniform(0.0, 2 * math.pi)
+            angular_speed = rng.uniform(5.0, 15.0) / radius  # 5-15 m/s along the circle
+            t = offset + step * np.arange(samples)
+            angle = phase + angular_speed * t
+            t_rows.append(t)
+            index_rows.append(np.full(samples, n, dtype=np.int32))
+            lat_rows.append(center_lat + radius * np.sin(angle) / meters_per_deg_lat)
+            lon_rows.append(center_lon + radius * np.cos(angle) / meters_per_deg_lon)
+            alt_rows.append(np.full(samples, rng.uniform(15.0, 40.0)))
+            # counter-clockwise circle: heading is the tangent direction
+            heading_rows.append(np.degrees(-angle) % 360.0)
+
+        t = np.concatenate(t_rows) if t_rows else np.empty(0)
+        status = np.zeros(len(t), dtype=np.uint8)
+        first = np.arange(drone_count) * samples
+        status[first] = DroneStatus.AIRBORNE.value
+        status[first + samples - 1] = DroneStatus.LANDED.value
+
+        order = np.argsort(t, kind="stable")
+        return cls(
+            drone_ids,
+            t[order],
+            np.concatenate(index_rows)[order] if index_rows else np.empty(0, np.int32),
+            np.concatenate(lat_rows)[order] if lat_rows else np.empty(0),
+            np.concatenate(lon_rows)[order] if lon_rows else np.empty(0),
+            np.concatenate(alt_rows)[order] if alt_rows else np.empty(0),
+            np.concatenate(heading_rows)[order] if heading_rows else np.empty(0),
+            status[order],
+        )
+
+    @classmethod
+    def _empty(cls, drone_ids: List[str]) -> "ReplayTrace":
+        empty = np.empty(0)
+        return cls(
+            drone_ids,
+            empty,
+            np.empty(0, np.int32),
+            empty,
+            empty,
+            empty,
+            empty,
+            np.empty(0, np.uint8),
+        )
+
+
+@dataclass
+class ReplayStats:
+    events: int = 0
+    trace_time_sec: float = 0.0
+    wall_time_sec: float = 0.0
+
+    @property
+    def events_per_sec(self) -> float:
+        return self.events / self.wall_time_sec if self.wall_time_sec > 0 else 0.0
+
+    @property
+    def speed(self) -> float:
+        # achieved trace seconds per wall second
+        return self.trace_time_sec / self.wall_time_sec if self.wall_time_sec > 0 else 0.0
+
+
+class TelemetryReplay(object):
+    """Feeds a ReplayTrace through Drone.set_state / set_status.
+
+    Drones are looked up in the controller by id; missing ones are created with
+    role REPLAY and added, so every widget listening to the controller sees them.
+    The replay itself does not keep time: callers advance it either to a trace time
+    (advance_to) or by a number of events (advance), which lets a plain loop
+    (run_blocking) or a Qt timer drive it.
+    """
+
+    def __init__(self, trace: ReplayTrace, controller=None):
+        self.trace = trace
+        self.drones: List[Drone] = []
+        for drone_id in trace.drone_ids:
+            drone = controller.get_drone_by_id(drone_id) if controller else None
+            if drone is None:
+                drone = Drone(drone_id=drone_id, connection_url="", role=REPLAY_ROLE)
+                if controller is not None:
+                    controller.add_drone(drone)
+            self.drones.append(drone)
+        self._statuses = {status.value: status for status in DroneStatus}
+        self.cursor = 0
+
+    @property
+    def done(self) -> bool:
+        return self.cursor >= len(self.trace)
+
+    @property
+    def trace_time_sec(self) -> float:
+        return float(self.trace.t[self.cursor - 1]) if self.cursor else 0.0
+
+    def reset(self) -> None:
+        self.cursor = 0
+
+    def advance_to(self, trace_time_sec: float) -> int:
+        """Apply every event up to trace_time_sec; returns the number applied."""
+        end = int(np.searchsorted(self.trace.t, trace_time_sec, side="right"))
+        return self._apply(end)
+
+    def advance(self, max_events: int) -> int:
+        return self._apply(min(len(self.trace), self.cursor + max_events))
+
+    def run_blocking(self, speed: float | None = 1.0) -> ReplayStats:
+        """Replay the rest of the trace without an event loop.
+
+        speed is the trace-time multiplier; None replays as fast as possible.
+        """
+        start_cursor = self.cursor
+        start_trace_time = self.trace_time_sec
+        start = time.perf_counter()
+        if speed is None:
+            self._apply(len(self.trace))
+        else:
+            while not self.done:
+                next_t = float(self.trace.t[self.cursor])
+                delay = start + (next_t - start_trace_time) / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elapsed = time.perf_counter() - start
+                self.advance_to(start_trace_time + elapsed * speed)
+        return ReplayStats(
+            events=self.cursor - start_cursor,
+            trace_time_sec=self.trace_time_sec - start_trace_time,
+            wall_time_sec=time.perf_counter() - start,
+        )
+
+    def _apply(self, end: int) -> int:
+        start = self.cursor
+        if end <= start:
+            return 0
+        trace = self.trace
+        drones = self.drones
+        statuses = self._statuses
+        # tolist() once per batch is much cheaper than indexing NumPy scalars per event
+        rows = zip(
+            trace.drone_index[start:end].tolist(),
+            trace.lat[start:end].tolist(),
+            trace.lon[start:end].tolist(),
+            trace.alt[start:end].tolist(),
+            trace.heading[start:end].tolist(),
+            trace.status[start:end].tolist(),
+        )
+        for index, lat, lon, alt, heading, status in rows:
+            drone = drones[index]
+            if status:
+                new_status = statuses.get(status)
+                if new_status is not None and new_status != drone.status:
+                    drone.set_status(new_status)
+            drone.set_state(
+                lat=None if math.isnan(lat) else lat,
+                lon=None if math.isnan(lon) else lon,
+                alt=None if math.isnan(alt) else alt,
+                heading=None if math.isnan(heading) else heading,
+            )
+        self.cursor = end
+        return end - start
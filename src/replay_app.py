@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Replay recorded or synthetic telemetry through the controller and GUI.
+
+No PX4 or MAVSDK is needed: events go through Drone.set_state / set_status, so the
+MapWidget and DroneListWidget update paths run exactly as with live telemetry.
+Prints a JSON line with the number of events processed per second.
+
+Usage (from src/):
+    python3 replay_app.py --recording DIR [--speed 4 | --fast]
+    python3 replay_app.py --synthetic 500 --duration 30 --rate 10 --fast --offscreen
+    python3 replay_app.py --synthetic 1000 --fast --no-gui --profile replay.pstats
+"""
+
+import argparse
+import cProfile
+import json
+import logging
+import os
+import sys
+import time
+
+from controller.swarm_controller import SwarmController
+from model.telemetry_recorder import TelemetryRecording
+from model.telemetry_replay import ReplayStats, ReplayTrace, TelemetryReplay
+from utils.file_utils import resolve_file_path
+
+DEFAULT_SCENARIO_FILE = "assets/demo_scenario.json"
+# events applied per timer tick in --fast mode, before yielding to the Qt loop
+FAST_BATCH_EVENTS = 2000
+PACED_TICK_MS = 5
+
+
+def run_qt(replay: TelemetryReplay, controller, speed: float | None, show: bool) -> ReplayStats:
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+
+    from gui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    window = MainWindow(controller)
+    if show:
+        window.show()
+
+    start_cursor = replay.cursor
+    start = time.perf_counter()
+    finished = [None]
+    timer = QTimer()
+
+    def tick():
+        if speed is None:
+            replay.advance(FAST_BATCH_EVENTS)
+        else:
+            replay.advance_to((time.perf_counter() - start) * speed)
+        if replay.done:
+            timer.stop()
+            finished[0] = time.perf_counter()
+            # let the coalesced map/table refreshes for the last events run
+            QTimer.singleShot(300, app.quit)
+
+    timer.timeout.connect(tick)
+    timer.start(0 if speed is None else PACED_TICK_MS)
+    app.exec()
+
+    stats = ReplayStats(
+        events=replay.cursor - start_cursor,
+        trace_time_sec=replay.trace_time_sec,
+        wall_time_sec=(finished[0] or time.perf_counter()) - start,
+    )
+    window.close()
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--recording", help="directory written by TelemetryRecorder")
+    source.add_argument("--synthetic", type=int, metavar="DRONES")
+    parser.add_argument("--duration", type=float, default=60.0, help="synthetic trace length (s)")
+    parser.add_argument("--rate", type=float, default=10.0, help="synthetic rate per drone (Hz)")
+    parser.add_argument("--speed", type=float, default=1.0, help="trace-time multiplier")
+    parser.add_argument("--fast", action="store_true", help="replay as fast as possible")
+    parser.add_argument("--offscreen", action="store_true", help="use the offscreen Qt platform")
+    parser.add_argument("--no-gui", action="store_true", help="replay without Qt at all")
+    parser.add_argument("--profile", metavar="FILE", help="write cProfile stats to FILE")
+    parser.add_argument("--scenario", default=DEFAULT_SCENARIO_FILE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.offscreen:
+        os.environ["QT_QPA_PLATFORM"] = "offscreen"
+
+    if args.recording:
+        trace = ReplayTrace.from_recording(TelemetryRecording(args.recording))
+    else:
+        trace = ReplayTrace.synthetic(args.synthetic, args.duration, args.rate)
+
+    controller = SwarmController(resolve_file_path(args.scenario))
+    replay = TelemetryReplay(trace, controller)
+    speed = None if args.fast else args.speed
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    if args.no_gui:
+        stats = replay.run_blocking(speed)
+    else:
+        stats = run_qt(replay, controller, speed, show=True)
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+
+    print(
+        json.dumps(
+            {
+                "drones": len(trace.drone_ids),
+                "events": stats.events,
+                "trace_time_sec": round(stats.trace_time_sec, 3),
+                "wall_time_sec": round(stats.wall_time_sec, 3),
+                "events_per_sec": round(stats.events_per_sec, 1),
+                "speed": round(stats.speed, 2),
+                "gui": not args.no_gui,
+            }
+        ),
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
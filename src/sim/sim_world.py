@@ -0,0 +1,301 @@
+import asyncio
+import logging
+import math
+import time
+from enum import Enum, auto
+from typing import Dict, List
+
+from utils.geo_tools import heading_delta_deg, latlon_to_local_m, offset_latlon
+
+logger = logging.getLogger(__name__)
+
+
+class FlightMode(Enum):
+    DISARMED = auto()
+    ARMED = auto()  # armed on the ground
+    TAKEOFF = auto()
+    HOLD = auto()
+    GOTO = auto()
+    ORBIT = auto()
+    RETURN_TO_LAUNCH = auto()
+    LAND = auto()
+    MISSION = auto()
+
+
+class SimVehicle(object):
+    """Point-mass multicopter state in a local east/north/up frame around home.
+
+    Horizontal and vertical motion are rate- and acceleration-limited and slow down
+    before the target, yaw turns at a fixed rate, which is close enough to PX4
+    position control for exercising missions and the GUI.
+    """
+
+    def __init__(
+        self,
+        vehicle_id: str,
+        home_lat: float,
+        home_lon: float,
+        home_alt: float = 0.0,
+        max_speed_m_s: float = 12.0,
+        max_accel_m_s2: float = 3.0,
+        climb_rate_m_s: float = 3.0,
+        descent_rate_m_s: float = 1.5,
+        yaw_rate_deg_s: float = 60.0,
+    ):
+        self.vehicle_id = vehicle_id
+        self.home_lat = home_lat
+        self.home_lon = home_lon
+        self.home_alt = home_alt
+        self.max_speed_m_s = max_speed_m_s
+        self.max_accel_m_s2 = max_accel_m_s2
+        self.climb_rate_m_s = climb_rate_m_s
+        self.descent_rate_m_s = descent_rate_m_s
+        self.yaw_rate_deg_s = yaw_rate_deg_s
+        self.takeoff_altitude_m = 2.5  # relative to home, PX4 default
+        self.return_altitude_m = 30.0
+
+        self.mode = FlightMode.DISARMED
+        self.east_m = 0.0
+        self.north_m = 0.0
+        self.up_m = 0.0  # relative to home
+        self.v_east = 0.0
+        self.v_north = 0.0
+        self.v_up = 0.0
+        self.yaw_deg = 0.0
+        self.speed_m_s = 5.0  # current cruise speed, see set_current_speed
+        self.target = None  # (east, north, up, yaw or None) for GOTO/TAKEOFF/RTL/LAND
+        self.orbit = None  # (center east, center north, up, radius, velocity)
+        # (east, north, up, yaw or None, hold seconds, speed or None) per mission item
+        self.mission_items: List[tuple] = []
+        self.mission_current = 0
+        self.return_after_mission = False
+        self._hold_remaining_sec: float | None = None
+
+    @property
+    def armed(self) -> bool:
+        return self.mode != FlightMode.DISARMED
+
+    @property
+    def in_air(self) -> bool:
+        return self.up_m > 0.1
+
+    def latlon(self) -> tuple:
+        return offset_latlon(self.home_lat, self.home_lon, self.east_m, self.north_m)
+
+    def to_local(self, lat: float, lon: float) -> tuple:
+        return latlon_to_local_m(lat, lon, self.home_lat, self.home_lon)
+
+    def step(self, dt: float) -> None:
+        mode = self.mode
+        if mode in (FlightMode.DISARMED, FlightMode.ARMED):
+            self.v_east = self.v_north = self.v_up = 0.0
+            return
+        if mode == FlightMode.HOLD:
+            self._fly_to(self.east_m, self.north_m, self.up_m, None, dt)
+            return
+        if mode == FlightMode.ORBIT:
+            self._orbit(dt)
+            return
+        if mode == FlightMode.MISSION:
+            self._mission_step(dt)
+            return
+
+        east, north, up, yaw = self.target
+        arrived = self._fly_to(east, north, up, yaw, dt)
+        if not arrived:
+            return
+        if mode == FlightMode.RETURN_TO_LAUNCH:
+            self.mode = FlightMode.LAND
+            self.target = (0.0, 0.0, 0.0, None)
+        elif mode == FlightMode.LAND:
+            # PX4 disarms automatically after landing
+            self.up_m = 0.0
+            self.mode = FlightMode.DISARMED
+            self.target = None
+        else:
+            self.mode = FlightMode.HOLD
+
+    def _fly_to(self, east, north, up, yaw, dt) -> bool:
+        # returns True once position (and yaw, if given) are reached
+        d_east = east - self.east_m
+        d_north = north - self.north_m
+        distance = math.hypot(d_east, d_north)
+        # slow down so the vehicle can stop at the target
+        speed = min(self.speed_m_s, math.sqrt(2.0 * self.max_accel_m_s2 * distance))
+        if distance > 1e-6:
+            want_east = d_east / distance * speed
+            want_north = d_north / distance * speed
+        else:
+            want_east = want_north = 0.0
+        max_dv = self.max_accel_m_s2 * dt
+        self.v_east += _clamp(want_east - self.v_east, max_dv)
+        self.v_north += _clamp(want_north - self.v_north, max_dv)
+        # never overshoot the target within one step
+        if math.hypot(self.v_east, self.v_north) * dt >= distance:
+            self.east_m, self.north_m = east, north
+            self.v_east = self.v_north = 0.0
+        else:
+            self.east_m += self.v_east * dt
+            self.north_m += self.v_north * dt
+
+        self._move_vertical(up, dt)
+
+        if yaw is None and distance > 1.0:
+            yaw = math.degrees(math.atan2(d_east, d_north)) % 360.0
+        yaw_reached = yaw is None or self._turn_to(yaw, dt)
+        return (
+            self.east_m == east and self.north_m == north and self.up_m == up and yaw_reached
+        )
+
+    def start_mission(self) -> None:
+        self.mode = FlightMode.MISSION
+        self._hold_remaining_sec = None
+
+    def _mission_step(self, dt: float) -> None:
+        if self.mission_current >= len(self.mission_items):
+            self._finish_mission()
+            return
+        east, north, up, yaw, hold_sec, speed = self.mission_items[self.mission_current]
+        if self._hold_remaining_sec is None:
+            if speed is not None:
+                self.speed_m_s = min(speed, self.max_speed_m_s)
+            if self._fly_to(east, north, up, yaw, dt):
+                self._hold_remaining_sec = hold_sec
+        else:
+            self._fly_to(east, north, up, yaw, dt)
+            self._hold_remaining_sec -= dt
+        if self._hold_remaining_sec is not None and self._hold_remaining_sec <= 0:
+            self._hold_remaining_sec = None
+            self.mission_current += 1
+            if self.mission_current >= len(self.mission_items):
+                self._finish_mission()
+
+    def _finish_mission(self) -> None:
+        if self.return_after_mission:
+            self.mode = FlightMode.RETURN_TO_LAUNCH
+            self.target = (0.0, 0.0, max(self.up_m, self.return_altitude_m), None)
+        else:
+            self.mode = FlightMode.HOLD
+
+    def _move_vertical(self, up: float, dt: float) -> None:
+        d_up = up - self.up_m
+        rate = self.climb_rate_m_s if d_up > 0 else self.descent_rate_m_s
+        rate = min(rate, math.sqrt(2.0 * self.max_accel_m_s2 * abs(d_up)))
+        self.v_up = math.copysign(rate, d_up)
+        if abs(self.v_up) * dt >= abs(d_up):
+            self.up_m = up
+            self.v_up = 0.0
+        else:
+            self.up_m += self.v_up * dt
+
+    def _turn_to(self, yaw: float, dt: float) -> bool:
+        diff = heading_delta_deg(yaw, self.yaw_deg)
+        max_turn = self.yaw_rate_deg_s * dt
+        if abs(diff) <= max_turn:
+            self.yaw_deg = yaw % 360.0
+            return True
+        self.yaw_deg = (self.yaw_deg + math.copysign(max_turn, diff)) % 360.0
+        return False
+
+    def _orbit(self, dt: float) -> None:
+        center_east, center_north, up, radius, velocity = self.orbit
+        d_east = self.east_m - center_east
+        d_north = self.north_m - center_north
+        distance = math.hypot(d_east, d_north)
+        if abs(distance - radius) > 1.0:
+            # first fly to the closest point of the circle
+            if distance < 1e-6:
+                d_east, distance = radius, radius
+            scale = radius / distance
+            self._fly_to(
+                center_east + d_east * scale, center_north + d_north * scale, up, None, dt
+            )
+            return
+        # clockwise around the center, nose along the tangent
+        angle = math.atan2(d_north, d_east) - velocity * dt / radius
+        self.east_m = center_east + radius * math.cos(angle)
+        self.north_m = center_north + radius * math.sin(angle)
+        self.v_east = velocity * math.sin(angle)
+        self.v_north = -velocity * math.cos(angle)
+        self._move_vertical(up, dt)
+        self._turn_to(math.degrees(math.atan2(self.v_east, self.v_north)) % 360.0, dt)
+
+
+class SimWorld(object):
+    """Steps every simulated vehicle from one asyncio task at rate_hz.
+
+    Telemetry streams wait on tick(period) instead of sleeping on their own timers,
+    so a few hundred vehicles cost one timer wakeup per step rather than one per
+    stream per sample.
+    """
+
+    def __init__(self, rate_hz: float = 20.0):
+        self.rate_hz = rate_hz
+        self.vehicles: Dict[str, SimVehicle] = {}
+        self.step_count = 0
+        self.step_time_sec = 0.0  # wall time of the last step, for load testing
+        self._task: asyncio.Task | None = None
+        self._tick_waiters: Dict[int, asyncio.Future] = {}  # every n steps -> future
+
+    def add_vehicle(self, vehicle: SimVehicle) -> SimVehicle:
+        self.vehicles[vehicle.vehicle_id] = vehicle
+        return vehicle
+
+    def remove_vehicle(self, vehicle_id: str) -> None:
+        self.vehicles.pop(vehicle_id, None)
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        # needs a running event loop; safe to call repeatedly
+        if not self.is_running():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def tick(self, period_sec: float) -> asyncio.Future:
+        """Future resolved at the next step that is a multiple of period_sec."""
+        every = max(1, round(period_sec * self.rate_hz))
+        future = self._tick_waiters.get(every)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._tick_waiters[every] = future
+        return future
+
+    def step(self, dt: float) -> None:
+        start = time.perf_counter()
+        for vehicle in self.vehicles.values():
+            vehicle.step(dt)
+        self.step_count += 1
+        self.step_time_sec = time.perf_counter() - start
+
+        due: List[asyncio.Future] = []
+        for every in list(self._tick_waiters):
+            if self.step_count % every == 0:
+                due.append(self._tick_waiters.pop(every))
+        for future in due:
+            if not future.done():
+                future.set_result(None)
+
+    async def _run(self) -> None:
+        period = 1.0 / self.rate_hz
+        next_step = time.monotonic()
+        while True:
+            now = time.monotonic()
+            try:
+                self.step(period)
+            except Exception:
+                logger.exception("Simulation step failed")
+            next_step += period
+            if next_step < now:
+                # running behind: drop the missed steps instead of bursting
+                next_step = now + period
+            await asyncio.sleep(next_step - time.monotonic())
+
+
+def _clamp(value: float, limit: float) -> float:
+    return max(-limit, min(limit, value))
@@ -0,0 +1,313 @@
+import math
+from typing import Dict
+
+from mavsdk.action import ActionError, ActionResult
+from mavsdk.core import ConnectionState
+from mavsdk.mission import MissionError, MissionProgress, MissionResult
+from mavsdk.telemetry import (
+    FixedwingMetrics,
+    Heading,
+    Health,
+    Position,
+    VelocityNed,
+)
+
+from sim.sim_world import FlightMode, SimVehicle, SimWorld
+
+# PX4 default stream rates (Hz) for the streams the controller subscribes to
+DEFAULT_RATES_HZ = {
+    "position": 10.0,  # heading comes from the same GLOBAL_POSITION_INT message
+    "velocity_ned": 10.0,
+    "health": 1.0,
+    "in_air": 1.0,
+    "armed": 1.0,
+    "fixedwing_metrics": 5.0,
+    "connection_state": 1.0,
+    "mission_progress": 10.0,  # checked at this rate, yielded only on change
+}
+
+
+class SimulatedSystem(object):
+    """Stand-in for mavsdk.System backed by a SimVehicle in a SimWorld.
+
+    Implements the parts of the System API the controller and missions use: connect(),
+    core.connection_state(), the action and mission calls and the telemetry streams.
+    Values are the regular mavsdk telemetry/core types, so consumers cannot tell the
+    difference.
+    """
+
+    def __init__(self, world: SimWorld, vehicle: SimVehicle):
+        self.world = world
+        self.vehicle = vehicle
+        self.connected = False
+        self.rates_hz: Dict[str, float] = dict(DEFAULT_RATES_HZ)
+        self.core = _SimCore(self)
+        self.action = _SimAction(self)
+        self.telemetry = _SimTelemetry(self)
+        self.mission = _SimMission(self)
+
+    async def connect(self, system_address: str | None = None) -> None:
+        # system_address is ignored: the vehicle lives in this process
+        self.world.start()
+        self.connected = True
+
+    async def stream(self, rate_name: str, make_value):
+        while True:
+            yield make_value()
+            await self.world.tick(1.0 / self.rates_hz[rate_name])
+
+
+class _SimCore(object):
+    def __init__(self, system: SimulatedSystem):
+        self._system = system
+
+    def connection_state(self):
+        return self._system.stream(
+            "connection_state", lambda: ConnectionState(self._system.connected)
+        )
+
+
+class _SimTelemetry(object):
+    def __init__(self, system: SimulatedSystem):
+        self._system = system
+        self._vehicle = system.vehicle
+
+    def position(self):
+        return self._system.stream("position", self._position)
+
+    def heading(self):
+        return self._system.stream("position", lambda: Heading(self._vehicle.yaw_deg))
+
+    def velocity_ned(self):
+        vehicle = self._vehicle
+        return self._system.stream(
+            "velocity_ned",
+            lambda: VelocityNed(vehicle.v_north, vehicle.v_east, -vehicle.v_up),
+        )
+
+    def health(self):
+        return self._system.stream(
+            "health", lambda: Health(True, True, True, True, True, True, True)
+        )
+
+    def armed(self):
+        return self._system.stream("armed", lambda: self._vehicle.armed)
+
+    def in_air(self):
+        return self._system.stream("in_air", lambda: self._vehicle.in_air)
+
+    def fixedwing_metrics(self):
+        return self._system.stream("fixedwing_metrics", self._fixedwing_metrics)
+
+    async def set_rate_position(self, rate_hz: float) -> None:
+        self._system.rates_hz["position"] = rate_hz
+
+    async def set_rate_velocity_ned(self, rate_hz: float) -> None:
+        self._system.rates_hz["velocity_ned"] = rate_hz
+
+    async def set_rate_health(self, rate_hz: float) -> None:
+        self._system.rates_hz["health"] = rate_hz
+
+    async def set_rate_in_air(self, rate_hz: float) -> None:
+        self._system.rates_hz["in_air"] = rate_hz
+
+    async def set_rate_fixedwing_metrics(self, rate_hz: float) -> None:
+        self._system.rates_hz["fixedwing_metrics"] = rate_hz
+
+    def _position(self) -> Position:
+        vehicle = self._vehicle
+        lat, lon = vehicle.latlon()
+        return Position(lat, lon, vehicle.home_alt + vehicle.up_m, vehicle.up_m)
+
+    def _fixedwing_metrics(self) -> FixedwingMetrics:
+        vehicle = self._vehicle
+        groundspeed = math.hypot(vehicle.v_east, vehicle.v_north)
+        return FixedwingMetrics(
+            groundspeed,
+            50.0 if vehicle.in_air else 0.0,
+            vehicle.v_up,
+            groundspeed,
+            vehicle.yaw_deg,
+            vehicle.home_alt + vehicle.up_m,
+        )
+
+
+class _SimMission(object):
+    def __init__(self, system: SimulatedSystem):
+        self._system = system
+        self._vehicle = system.vehicle
+
+    async def upload_mission(self, mission_plan) -> None:
+        vehicle = self._vehicle
+        items = []
+        for item in mission_plan.mission_items:
+            east, north = vehicle.to_local(item.latitude_deg, item.longitude_deg)
+            items.append(
+                (
+                    east,
+                    north,
+                    item.relative_altitude_m,
+                    None if math.isnan(item.yaw_deg) else item.yaw_deg,
+                    0.0 if math.isnan(item.loiter_time_s) else item.loiter_time_s,
+                    None if math.isnan(item.speed_m_s) else item.speed_m_s,
+                )
+            )
+        vehicle.mission_items = items
+        vehicle.mission_current = 0
+
+    async def clear_mission(self) -> None:
+        self._vehicle.mission_items = []
+        self._vehicle.mission_current = 0
+
+    async def start_mission(self) -> None:
+        vehicle = self._vehicle
+        if not vehicle.mission_items:
+            raise MissionError(
+                MissionResult(MissionResult.Result.NO_MISSION_AVAILABLE, "No mission"),
+                "start_mission",
+            )
+        if not vehicle.armed:
+            raise MissionError(
+                MissionResult(MissionResult.Result.DENIED, "vehicle is not armed"),
+                "start_mission",
+            )
+        vehicle.start_mission()
+
+    async def pause_mission(self) -> None:
+        if self._vehicle.mode == FlightMode.MISSION:
+            self._vehicle.mode = FlightMode.HOLD
+
+    async def set_current_mission_item(self, index: int) -> None:
+        self._vehicle.mission_current = index
+
+    async def set_return_to_launch_after_mission(self, enable: bool) -> None:
+        self._vehicle.return_after_mission = enable
+
+    async def is_mission_finished(self) -> bool:
+        vehicle = self._vehicle
+        return vehicle.mission_current >= len(vehicle.mission_items)
+
+    async def mission_progress(self):
+        vehicle = self._vehicle
+        last = None
+        async for progress in self._system.stream(
+            "mission_progress",
+            lambda: (vehicle.mission_current, len(vehicle.mission_items)),
+        ):
+            if progress != last:
+                last = progress
+                yield MissionProgress(*progress)
+
+
+class _SimAction(object):
+    def __init__(self, system: SimulatedSystem):
+        self._system = system
+        self._vehicle = system.vehicle
+
+    async def arm(self) -> None:
+        self._check_connected("arm")
+        if self._vehicle.mode == FlightMode.DISARMED:
+            self._vehicle.mode = FlightMode.ARMED
+
+    async def disarm(self) -> None:
+        self._check_connected("disarm")
+        if self._vehicle.in_air:
+            _deny("disarm", "vehicle is in the air")
+        self._vehicle.mode = FlightMode.DISARMED
+
+    async def takeoff(self) -> None:
+        vehicle = self._check_armed("takeoff")
+        vehicle.mode = FlightMode.TAKEOFF
+        vehicle.target = (
+            vehicle.east_m,
+            vehicle.north_m,
+            max(vehicle.up_m, vehicle.takeoff_altitude_m),
+            None,
+        )
+
+    async def land(self) -> None:
+        vehicle = self._check_armed("land")
+        vehicle.mode = FlightMode.LAND
+        vehicle.target = (vehicle.east_m, vehicle.north_m, 0.0, None)
+
+    async def hold(self) -> None:
+        vehicle = self._check_armed("hold")
+        if vehicle.in_air:
+            vehicle.mode = FlightMode.HOLD
+
+    async def goto_location(
+        self,
+        latitude_deg: float,
+        longitude_deg: float,
+        absolute_altitude_m: float,
+        yaw_deg: float,
+    ) -> None:
+        vehicle = self._check_in_air("goto_location")
+        east, north = vehicle.to_local(latitude_deg, longitude_deg)
+        vehicle.mode = FlightMode.GOTO
+        vehicle.target = (
+            east,
+            north,
+            absolute_altitude_m - vehicle.home_alt,
+            None if math.isnan(yaw_deg) else yaw_deg,
+        )
+
+    async def do_orbit(
+        self,
+        radius_m: float,
+        velocity_ms: float,
+        yaw_behavior,
+        latitude_deg: float,
+        longitude_deg: float,
+        absolute_altitude_m: float,
+    ) -> None:
+        # only the "front tangent to circle" yaw behavior is simulated
+        vehicle = self._check_in_air("do_orbit")
+        east, north = vehicle.to_local(latitude_deg, longitude_deg)
+        up = vehicle.up_m
+        if not math.isnan(absolute_altitude_m):
+            up = absolute_altitude_m - vehicle.home_alt
+        vehicle.mode = FlightMode.ORBIT
+        vehicle.orbit = (east, north, up, radius_m, velocity_ms)
+
+    async def return_to_launch(self) -> None:
+        vehicle = self._check_in_air("return_to_launch")
+        vehicle.mode = FlightMode.RETURN_TO_LAUNCH
+        vehicle.target = (0.0, 0.0, max(vehicle.up_m, vehicle.return_altitude_m), None)
+
+    async def set_current_speed(self, speed_m_s: float) -> None:
+        self._check_connected("set_current_speed")
+        vehicle = self._vehicle
+        vehicle.speed_m_s = min(speed_m_s, vehicle.max_speed_m_s)
+
+    async def set_takeoff_altitude(self, altitude: float) -> None:
+        self._vehicle.takeoff_altitude_m = altitude
+
+    async def get_takeoff_altitude(self) -> float:
+        return self._vehicle.takeoff_altitude_m
+
+    async def set_return_to_launch_altitude(self, relative_altitude_m: float) -> None:
+        self._vehicle.return_altitude_m = relative_altitude_m
+
+    def _check_connected(self, origin: str) -> SimVehicle:
+        if not self._system.connected:
+            raise ActionError(
+                ActionResult(ActionResult.Result.NO_SYSTEM, "Not connected"), origin
+            )
+        return self._vehicle
+
+    def _check_armed(self, origin: str) -> SimVehicle:
+        vehicle = self._check_connected(origin)
+        if not vehicle.armed:
+            _deny(origin, "vehicle is not armed")
+        return vehicle
+
+    def _check_in_air(self, origin: str) -> SimVehicle:
+        vehicle = self._check_armed(origin)
+        if not vehicle.in_air and vehicle.mode != FlightMode.TAKEOFF:
+            _deny(origin, "vehicle is not in the air")
+        return vehicle
+
+
+def _deny(origin: str, reason: str) -> None:
+    raise ActionError(ActionResult(ActionResult.Result.COMMAND_DENIED, reason), origin)
@@ -2,11 +2,17 @@
 """Run the Swarm Demo Controller GUI prototype.
 
 Usage:
-    python3 swarm_controller.py [optional-scenario-file]
-
+    python3 swarm_controller_app.py [optional-scenario-file] [--backend mavsdk|sim]
+        [--threaded] [--metrics-port PORT] [--stats] [--trace FILE]
+
+With --backend sim the drones are simulated in-process, no PX4 or Gazebo needed.
+With --threaded the controller runs on its own thread, so telemetry keeps flowing
+while the GUI is busy drawing. --metrics-port serves performance metrics at
+http://127.0.0.1:PORT/metrics and --stats shows them in a panel (View menu).
+--trace writes a Chrome trace of the mission to FILE on exit, for Perfetto.
 """
 
-import sys
+import argparse
 
 from controller.swarm_controller import SwarmController
 from gui.main_window import run
@@ -16,13 +22,29 @@ from utils.file_utils import resolve_file_path
 if __name__ == "__main__":
     DEFAULT_SCENARIO_FILE = "assets/demo_scenario.json"
 
-    # Use provided image path if given, otherwise try the bundled assets/demo_map.png
-    scenario_spec_path = sys.argv[1] if len(sys.argv) > 1 else None
-
-    if scenario_spec_path is None:
-        scenario_spec_path = DEFAULT_SCENARIO_FILE
-
-    scenario_spec_path = resolve_file_path(scenario_spec_path)
-
-    controller: SwarmController = SwarmController(scenario_spec_path)
-    run(controller)
+    parser = argparse.ArgumentParser(description="Swarm Demo Controller")
+    # Use provided scenario if given, otherwise the bundled assets/demo_scenario.json
+    parser.add_argument("scenario", nargs="?", default=DEFAULT_SCENARIO_FILE)
+    parser.add_argument("--backend", choices=["mavsdk", "sim"], default=None)
+    parser.add_argument(
+        "--threaded", action="store_true", help="run the controller on its own thread"
+    )
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics here")
+    parser.add_argument("--stats", action="store_true", help="show the statistics panel")
+    parser.add_argument("--trace", metavar="FILE", help="write a Chrome trace here on exit")
+    args = parser.parse_args()
+
+    scenario_spec_path = resolve_file_path(args.scenario)
+
+    controller: SwarmController = SwarmController(
+        scenario_spec_path, backend=args.backend
+    )
+    if args.metrics_port is not None or args.stats:
+        controller.enable_metrics(port=args.metrics_port)
+    if args.trace:
+        controller.enable_tracing()
+    try:
+        run(controller, threaded=args.threaded, show_stats=args.stats)
+    finally:
+        if args.trace:
+            controller.write_trace(args.trace)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Run the swarm demo without the GUI, e.g. on a companion computer or in CI.
+
+Loads a scenario, connects the drones and runs deploy_swarm on a plain asyncio loop.
+Progress is logged to stdout (or --log-file). Qt is never imported.
+
+Usage (from src/):
+    python3 swarm_headless_app.py [optional-scenario-file] [--backend mavsdk|sim]
+        [--uvloop] [--connect-only] [--status-interval 5] [--log-file FILE]
+        [--metrics-port PORT] [--trace FILE]
+
+--trace writes the mission steps, MAVSDK calls and telemetry reads of the run as a
+Chrome trace to FILE, to be opened in Perfetto (ui.perfetto.dev).
+
+Exits with status 1 if a drone fails to connect or the mission fails.
+"""
+
+import argparse
+import asyncio
+import logging
+import resource
+import signal
+import sys
+import time
+
+from controller.swarm_controller import SwarmController
+from model.drone import Drone, DroneStatus
+from utils.file_utils import resolve_file_path
+
+DEFAULT_SCENARIO_FILE = "assets/demo_scenario.json"
+
+logger = logging.getLogger("swarm_headless")
+
+
+def log_status_change(drone: Drone, new_status: DroneStatus) -> None:
+    logger.info(f"{drone.drone_id}: {new_status.name}")
+
+
+def log_swarm_summary(controller: SwarmController) -> None:
+    for drone in controller.get_all_drones():
+        mission_status = controller.demo_controller.get_drone_status(drone)
+        position = (
+            f"lat={drone.lat:.6f} lon={drone.lon:.6f} alt={drone.alt:.1f}"
+            if drone.lat is not None and drone.lon is not None and drone.alt is not None
+            else "no position"
+        )
+        logger.info(
+            f"  {drone.drone_id:<24} {drone.status.name:<12} "
+            f"{mission_status.name if mission_status else '-':<24} {position}"
+        )
+
+
+async def report_progress(controller: SwarmController, interval_sec: float) -> None:
+    while True:
+        await asyncio.sleep(interval_sec)
+        log_swarm_summary(controller)
+
+
+async def run(controller: SwarmController, args) -> int:
+    # Ctrl-C cancels the run so drones are still disconnected cleanly
+    main_task = asyncio.current_task()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGINT, main_task.cancel)
+
+    for drone in controller.get_all_drones():
+        drone.add_status_change_callback(log_status_change)
+    if controller.metrics is not None:
+        controller.metrics.start_loop_monitor()
+    progress_task = None
+    if args.status_interval > 0:
+        progress_task = asyncio.create_task(report_progress(controller, args.status_interval))
+
+    try:
+        report = await controller.connect_all_drones()
+        if report.failed:
+            return 1
+        if args.connect_only:
+            return 0
+        start = time.monotonic()
+        await controller.deploy_swarm()
+        logger.info(f"Swarm deployed in {time.monotonic() - start:.1f} s")
+        return 0
+    except asyncio.CancelledError:
+        logger.warning("Interrupted")
+        return 1
+    except Exception:
+        logger.exception("Mission failed")
+        return 1
+    finally:
+        if progress_task is not None:
+            progress_task.cancel()
+        log_swarm_summary(controller)
+        for name, stats in controller.state_subscription_stats().items():
+            logger.info(
+                f"State subscriber {name}: {stats.delivered} delivered, {stats.skipped} "
+                f"skipped, {stats.errors} errors, "
+                f"{stats.mean_dispatch_sec * 1e6:.1f} us mean dispatch"
+            )
+        if controller.metrics is not None:
+            for name, value in controller.metrics.summary():
+                logger.info(f"{name}: {value}")
+            controller.metrics.stop()
+        if args.trace:
+            controller.write_trace(args.trace)
+        for drone in controller.get_all_drones():
+            await drone.disconnect()
+        if controller.mavsdk_server_pool is not None:
+            await controller.mavsdk_server_pool.shutdown()
+        if controller.sim_world is not None:
+            controller.sim_world.stop()
+
+
+def main() -> None:
+    started = time.perf_counter()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenario", nargs="?", default=DEFAULT_SCENARIO_FILE)
+    parser.add_argument("--backend", choices=["mavsdk", "sim"], default=None)
+    parser.add_argument("--uvloop", action="store_true", help="use uvloop if installed")
+    parser.add_argument("--connect-only", action="store_true", help="connect, then exit")
+    parser.add_argument(
+        "--status-interval", type=float, default=5.0, help="seconds between summaries, 0 = off"
+    )
+    parser.add_argument("--log-file", help="log here instead of stdout")
+    parser.add_argument("--log-level", default="INFO")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics here")
+    parser.add_argument("--trace", metavar="FILE", help="write a Chrome trace here on exit")
+    args = parser.parse_args()
+
+    # the controller modules configure logging on import, so replace their setup
+    handler = (
+        logging.FileHandler(args.log_file) if args.log_file else logging.StreamHandler(sys.stdout)
+    )
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        handlers=[handler],
+        force=True,
+    )
+
+    if args.uvloop:
+        try:
+            import uvloop
+
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            logger.warning("uvloop is not installed, using the default asyncio loop")
+
+    controller = SwarmController(resolve_file_path(args.scenario), backend=args.backend)
+    if args.metrics_port is not None:
+        controller.enable_metrics(port=args.metrics_port)
+    if args.trace:
+        controller.enable_tracing()
+    logger.info(
+        f"Loaded {len(controller.get_all_drones())} drones in "
+        f"{time.perf_counter() - started:.2f} s "
+        f"({'simulated' if controller.sim_world is not None else 'mavsdk'} backend)"
+    )
+
+    exit_code = asyncio.run(run(controller, args))
+
+    # ru_maxrss is in kilobytes on Linux
+    logger.info(
+        f"Finished in {time.perf_counter() - started:.1f} s, peak RSS "
+        f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024} MB"
+    )
+    if "PySide6" in sys.modules:
+        logger.warning("PySide6 was imported by the headless runner")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
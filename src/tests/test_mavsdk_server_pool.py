@@ -0,0 +1,54 @@
+import asyncio
+
+from controller import mavsdk_server_pool
+from controller.mavsdk_server_pool import MavsdkServerPool
+from model.drone import Drone, DroneStatus
+
+
+class _FakeProcess(object):
+    def __init__(self):
+        self.pid = 0
+        self.returncode = None
+
+    def kill(self):
+        self.returncode = -9
+
+    async def wait(self):
+        return self.returncode
+
+
+async def _start_process(*args, **kwargs):
+    return _FakeProcess()
+
+
+async def _ready_later(handle):
+    await asyncio.sleep(0.05)
+
+
+def test_acquires_beyond_max_servers_wait_for_a_disconnect(monkeypatch):
+    monkeypatch.setattr(mavsdk_server_pool.asyncio, "create_subprocess_exec", _start_process)
+
+    async def run():
+        pool = MavsdkServerPool(max_servers=2)
+        pool._wait_ready = _ready_later
+        drones = [Drone(f"drone{i}", f"udp://:{14540 + i}") for i in range(4)]
+        for drone in drones:
+            drone.set_status(DroneStatus.CONNECTING)
+        acquires = [asyncio.ensure_future(pool.acquire(drone)) for drone in drones]
+
+        done, pending = await asyncio.wait(acquires, timeout=0.5)
+        assert len(done) == 2 and len(pending) == 2
+        first = [task.result() for task in done]
+        assert all(handle.process.returncode is None for handle in first)
+        assert pool.server_count() == 2
+
+        for handle in first:
+            handle.drone.set_status(DroneStatus.DISCONNECTED)
+        second = await asyncio.wait_for(asyncio.gather(*pending), 1.0)
+        assert {handle.drone.drone_id for handle in second} == {
+            d.drone_id for d in drones
+        } - {handle.drone.drone_id for handle in first}
+        assert all(handle.process.returncode is not None for handle in first)
+        assert pool.server_count() == 2
+
+    asyncio.run(run())
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from controller.swarm_sync import StatusBoard
+
+
+def test_wait_any_returns_the_first_drone_at_status():
+    async def run():
+        board = StatusBoard()
+        waiting = asyncio.ensure_future(board.wait_any(["a", "b"], "IN_AIR", 1.0))
+        await asyncio.sleep(0)
+        board.set("b", "IN_AIR")
+        return await waiting
+
+    assert asyncio.run(run()) == "b"
+
+
+def test_wait_any_times_out_with_asyncio_timeout_error():
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(StatusBoard().wait_any(["a"], "IN_AIR", 0.01))
+
+
+def test_wait_any_without_drones_raises_value_error():
+    with pytest.raises(ValueError):
+        asyncio.run(StatusBoard().wait_any([], "IN_AIR", 0.01))
+
+
+def test_wait_any_raises_the_error_of_a_failed_wait():
+    async def run():
+        board = StatusBoard()
+
+        async def fail(drone, status, timeout_sec=None, include_past=False):
+            raise RuntimeError("telemetry lost")
+
+        board.wait_for = fail
+        await board.wait_any(["a"], "IN_AIR", 1.0)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
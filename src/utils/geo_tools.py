@@ -1,3 +1,5 @@
+import math
+
 import numpy as np
 
 
@@ -44,7 +46,8 @@ def img_x_y_to_latlon(
     return lat, lon
 
 
-# NB: This function expects the image-to-latlon transformation (it takes care of inverting it)
+# NB: This function expects the image-to-latlon transformation (it takes care of inverting it).
+# It inverts the matrix on every call; use GeoTransform when mapping repeatedly.
 def latlon_to_img_x_y(affine_transformation_matrix: np.array, lat: float, lon: float):
     """Map (lat, lon) → image coordinates (x, y) using inverse of M"""
     inverse_affine_transformation_matrix: np.array = np.linalg.inv(
@@ -53,3 +56,100 @@ def latlon_to_img_x_y(affine_transformation_matrix: np.array, lat: float, lon: f
     vec = np.array([lat, lon, 1])
     x, y, _ = inverse_affine_transformation_matrix @ vec
     return x, y
+
+
+class GeoTransform(object):
+    """Affine mapping between map image pixels and lat/lon, built once per scenario.
+
+    The image -> lat/lon matrix and its inverse are both computed up front. The scalar
+    methods work on plain Python floats (no per-call array allocation) and the batch
+    methods map N points at once from NumPy arrays.
+    """
+
+    def __init__(self, affine_transformation_matrix: np.array = None):
+        if affine_transformation_matrix is None:
+            affine_transformation_matrix = default_affine_transform()
+        self.matrix: np.array = np.asarray(affine_transformation_matrix, dtype=float)
+        self.inverse_matrix: np.array = np.linalg.inv(self.matrix)
+
+        # Coefficients unpacked to floats for the scalar paths
+        (self._a, self._b, self._c), (self._d, self._e, self._f) = self.matrix[
+            :2
+        ].tolist()
+        (self._ia, self._ib, self._ic), (self._id, self._ie, self._if) = (
+            self.inverse_matrix[:2].tolist()
+        )
+
+    @classmethod
+    def from_point_pairs(cls, pt_pairs) -> "GeoTransform":
+        """pt_pairs: list of 3 (x, y, lat, lon) tuples, as in the scenario spec"""
+        return cls(compute_affine_transform(pt_pairs))
+
+    def img_x_y_to_latlon(self, image_x: float, image_y: float):
+        """Map image coordinates (x, y) → (lat, lon)"""
+        lat = self._a * image_x + self._b * image_y + self._c
+        lon = self._d * image_x + self._e * image_y + self._f
+        return lat, lon
+
+    def latlon_to_img_x_y(self, lat: float, lon: float):
+        """Map (lat, lon) → image coordinates (x, y)"""
+        x = self._ia * lat + self._ib * lon + self._ic
+        y = self._id * lat + self._ie * lon + self._if
+        return x, y
+
+    def img_x_y_to_latlon_batch(self, image_xs, image_ys):
+        """Map arrays of image coordinates → (lats, lons) arrays"""
+        image_xs = np.asarray(image_xs, dtype=float)
+        image_ys = np.asarray(image_ys, dtype=float)
+        lats = self._a * image_xs + self._b * image_ys + self._c
+        lons = self._d * image_xs + self._e * image_ys + self._f
+        return lats, lons
+
+    def latlon_to_img_x_y_batch(self, lats, lons):
+        """Map arrays of lat/lon → (xs, ys) image coordinate arrays"""
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        xs = self._ia * lats + self._ib * lons + self._ic
+        ys = self._id * lats + self._ie * lons + self._if
+        return xs, ys
+
+
+EARTH_RADIUS_M = 6_378_137.0
+
+
+def latlon_to_local_m_batch(lats, lons, origin_lat: float, origin_lon: float):
+    """Map arrays of lat/lon → (east, north) metres from the origin.
+
+    Flat-earth approximation, accurate to well under a metre over the few km a
+    swarm covers.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    east = np.radians(lons - origin_lon) * (EARTH_RADIUS_M * np.cos(np.radians(origin_lat)))
+    north = np.radians(lats - origin_lat) * EARTH_RADIUS_M
+    return east, north
+
+
+def latlon_to_local_m(lat: float, lon: float, origin_lat: float, origin_lon: float):
+    """Scalar latlon_to_local_m_batch: (east, north) metres from the origin."""
+    east = math.radians(lon - origin_lon) * EARTH_RADIUS_M * math.cos(math.radians(origin_lat))
+    north = math.radians(lat - origin_lat) * EARTH_RADIUS_M
+    return east, north
+
+
+def offset_latlon(lat: float, lon: float, east_m: float, north_m: float) -> tuple:
+    """Inverse of latlon_to_local_m: (lat, lon) east_m/north_m metres from lat/lon."""
+    return (
+        lat + math.degrees(north_m / EARTH_RADIUS_M),
+        lon + math.degrees(east_m / (EARTH_RADIUS_M * math.cos(math.radians(lat)))),
+    )
+
+
+def heading_delta_deg(to_deg: float, from_deg: float) -> float:
+    """Signed shortest turn from from_deg to to_deg, in [-180, 180); positive is clockwise."""
+    return (to_deg - from_deg + 180.0) % 360.0 - 180.0
+
+
+def heading_difference_deg(a_deg: float, b_deg: float) -> float:
+    """Smallest angle between two headings, in [0, 180]; 359 and 1 are 2 apart."""
+    return abs(heading_delta_deg(a_deg, b_deg))
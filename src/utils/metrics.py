@@ -0,0 +1,309 @@
+import asyncio
+import bisect
+import logging
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# seconds; suits everything from callback dispatch to connection phases
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Counter(object):
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Gauge(Counter):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Histogram(object):
+    """Observations counted per bucket upper bound, as Prometheus histograms are."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last counts values above all bounds
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        # upper bound of the bucket holding the q-quantile, inf if above all buckets
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+
+class MetricFamily(object):
+    """A named metric with one child (Counter, Gauge or Histogram) per label values.
+
+    Hot paths should keep the child from labels() instead of looking it up per call.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.kind = kind  # "counter", "gauge" or "histogram"
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        self.children: Dict[Tuple[str, ...], Counter | Gauge | Histogram] = {}
+
+    def labels(self, *values) -> Counter | Gauge | Histogram:
+        key = tuple(str(value) for value in values)
+        child = self.children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {key}")
+            if self.kind == "histogram":
+                child = Histogram(self.buckets)
+            elif self.kind == "gauge":
+                child = Gauge()
+            else:
+                child = Counter()
+            self.children[key] = child
+        return child
+
+    def render(self, lines: List[str]) -> None:
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        # copy, children may be added by another thread while rendering
+        for key, child in list(self.children.items()):
+            labels = ",".join(
+                f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)
+            )
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{_braces(labels)} {_number(child.value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(child.buckets + (math.inf,), child.counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_braces(labels + ',' + le if labels else le)} "
+                    f"{cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_braces(labels)} {_number(child.sum)}")
+            lines.append(f"{self.name}_count{_braces(labels)} {child.count}")
+
+
+class MetricsRegistry(object):
+    """Metric families plus collectors that build families when scraped.
+
+    Collectors are for values that already exist elsewhere (e.g. telemetry sample
+    times), so they cost nothing until someone reads the metrics.
+    """
+
+    def __init__(self):
+        self.families: Dict[str, MetricFamily] = {}
+        self.collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def counter(self, name: str, help_text: str, labelnames=()) -> MetricFamily:
+        return self._family(name, "counter", help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames=()) -> MetricFamily:
+        return self._family(name, "gauge", help_text, labelnames)
+
+    def histogram(
+        self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> MetricFamily:
+        return self._family(name, "histogram", help_text, labelnames, buckets)
+
+    def add_collector(self, collector_fn: Callable[[], Iterable[MetricFamily]]) -> None:
+        self.collectors.append(collector_fn)
+
+    def collect(self) -> List[MetricFamily]:
+        families = list(self.families.values())
+        for collector in self.collectors:
+            try:
+                families.extend(collector())
+            except Exception:
+                # a failing collector must not take the other metrics down with it
+                logger.exception(f"Metrics collector {collector} failed")
+        return families
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for family in self.collect():
+            family.render(lines)
+        lines.append("")
+        return "\n".join(lines)
+
+    def _family(self, name, kind, help_text, labelnames, buckets=DEFAULT_BUCKETS):
+        family = self.families.get(name)
+        if family is None:
+            family = MetricFamily(name, kind, help_text, labelnames, buckets)
+            self.families[name] = family
+        return family
+
+
+class MetricsServer(object):
+    """Serves a registry at http://host:port/metrics from a thread of its own.
+
+    Being off the event loop, it still answers while the loop is stalled, which
+    is when the loop lag numbers are wanted most. port=0 picks a free port.
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(f"{self.address_string()} {format % args}")
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-http", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Serving metrics at http://{self.host}:{self.port}/metrics")
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+
+class LoopLagMonitor(object):
+    """Measures how late an event loop runs a sleep of interval_sec.
+
+    Works on any asyncio loop, QtAsyncio's included; start() must be called from
+    the loop to be measured.
+    """
+
+    def __init__(self, histogram: Histogram, interval_sec: float = 0.25):
+        self.histogram = histogram
+        self.interval_sec = interval_sec
+        self.last_lag_sec = 0.0
+        self.max_lag_sec = 0.0
+        self._task: asyncio.Task | None = None
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.is_running():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        # the task's loop may be another thread's; cancel it from there
+        loop = task.get_loop()
+        if loop is _running_loop():
+            task.cancel()
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(task.cancel)
+
+    async def _run(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval_sec)
+            lag = max(0.0, time.monotonic() - start - self.interval_sec)
+            self.last_lag_sec = lag
+            if lag > self.max_lag_sec:
+                self.max_lag_sec = lag
+            self.histogram.observe(lag)
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _braces(labels: str) -> str:
+    return "{" + labels + "}" if labels else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value == int(value) and abs(value) < 1e15 else repr(value)
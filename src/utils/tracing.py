@@ -0,0 +1,213 @@
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class Tracer(object):
+    """Records spans into a ring buffer and exports them as Chrome trace-event JSON.
+
+    A span is one tuple appended to a bounded deque, so recording costs about a
+    microsecond and memory stays at capacity spans; the oldest are dropped. The
+    JSON opens in Perfetto (ui.perfetto.dev) or chrome://tracing, one track per
+    drone (or thread, for spans without a drone).
+    """
+
+    def __init__(self, capacity: int = 100_000):
+        self.capacity = capacity
+        # (name, category, track, start_ns, end_ns, args)
+        self.spans = deque(maxlen=capacity)
+        self.recorded = 0
+        self.origin_ns = time.perf_counter_ns()
+
+    @property
+    def dropped(self) -> int:
+        return self.recorded - len(self.spans)
+
+    def span(self, name: str, category: str = "", track: str | None = None, **args) -> "Span":
+        return Span(self, name, category, track, args)
+
+    def record(
+        self,
+        name: str,
+        category: str,
+        track: str | None,
+        start_ns: int,
+        end_ns: int,
+        args: Dict[str, Any] | None = None,
+    ) -> None:
+        # start_ns and end_ns are time.perf_counter_ns() values
+        if track is None:
+            track = threading.current_thread().name
+        self.spans.append((name, category, track, start_ns, end_ns, args))
+        self.recorded += 1
+
+    def clear(self) -> None:
+        self.spans.clear()
+        self.recorded = 0
+
+    def to_chrome_trace(self) -> dict:
+        pid = os.getpid()
+        tids: Dict[str, int] = {}
+        events = []
+        for name, category, track, start_ns, end_ns, args in list(self.spans):
+            tid = tids.get(track)
+            if tid is None:
+                tid = tids[track] = len(tids) + 1
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start_ns - self.origin_ns) / 1000.0,
+                "dur": (end_ns - start_ns) / 1000.0,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        for track, tid in tids.items():
+            events.append(
+                {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": track}}
+            )
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"recorded": self.recorded, "dropped": self.dropped},
+        }
+
+    def write_chrome_trace(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+        logger.info(
+            f"Wrote {len(self.spans)} trace spans to {path}"
+            + (f" ({self.dropped} older ones dropped)" if self.dropped else "")
+        )
+
+
+class Span(object):
+    """A with-block recorded as one span; may enclose awaits."""
+
+    __slots__ = ("tracer", "name", "category", "track", "args", "start_ns")
+
+    def __init__(self, tracer: Tracer, name, category, track, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.track = track
+        self.args = args
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(
+            self.name,
+            self.category,
+            self.track,
+            self.start_ns,
+            time.perf_counter_ns(),
+            self.args,
+        )
+
+
+class _NullSpan(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+_tracer: Tracer | None = None
+
+
+def enable(capacity: int = 100_000) -> Tracer:
+    """Start recording spans process-wide; returns the running tracer if any."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(capacity)
+    return _tracer
+
+
+def disable() -> Tracer | None:
+    """Stop recording; returns the tracer so its spans can still be written."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Tracer | None:
+    return _tracer
+
+
+def span(name: str, category: str = "", track: str | None = None, **args):
+    """A span of the enabled tracer, or a shared no-op when tracing is off."""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return Span(tracer, name, category, track, args)
+
+
+class TracedSystem(object):
+    """Wraps a MAVSDK System (or SimulatedSystem) so plugin calls are traced.
+
+    Every coroutine method of a plugin, e.g. action.goto_location, becomes a span
+    named after it on the drone's track, tagged with args_fn(). Streams and other
+    attributes pass through untouched.
+    """
+
+    def __init__(self, system, track: str, args_fn: Callable[[], dict] | None = None):
+        self._system = system
+        self._track = track
+        self._args_fn = args_fn
+        self._plugins: Dict[str, _TracedPlugin] = {}
+
+    @property
+    def wrapped(self):
+        return self._system
+
+    def __getattr__(self, name: str):
+        plugin = self._plugins.get(name)
+        if plugin is not None:
+            return plugin
+        value = getattr(self._system, name)
+        if name.startswith("_") or callable(value):
+            return value
+        plugin = self._plugins[name] = _TracedPlugin(value, name, self._track, self._args_fn)
+        return plugin
+
+
+class _TracedPlugin(object):
+    def __init__(self, plugin, plugin_name: str, track: str, args_fn):
+        self._plugin = plugin
+        self._plugin_name = plugin_name
+        self._track = track
+        self._args_fn = args_fn
+
+    def __getattr__(self, name: str):
+        value = getattr(self._plugin, name)
+        if not inspect.iscoroutinefunction(value):
+            return value
+        span_name = f"{self._plugin_name}.{name}"
+        track, args_fn = self._track, self._args_fn
+
+        async def traced(*args, **kwargs):
+            if _tracer is None:
+                return await value(*args, **kwargs)
+            with span(span_name, "mavsdk", track, **(args_fn() if args_fn else {})):
+                return await value(*args, **kwargs)
+
+        # cached on the instance, so __getattr__ only runs on the first call
+        setattr(self, name, traced)
+        return traced